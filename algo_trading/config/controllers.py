@@ -1,6 +1,6 @@
 from enum import Enum
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import Any, List, Dict
 
 
 class ColumnController(Enum):
@@ -45,6 +45,20 @@ class ColumnController(Enum):
             cls.volume.value: "BIGINT",
         }
 
+    @classmethod
+    def df_dtypes(cls) -> Dict:
+        # Pandas dtypes of the non date db_columns(). Volume is a nullable
+        # int so every chunk of a streamed read has the same dtypes,
+        # NULLs or not.
+        return {
+            cls.open.value: "float64",
+            cls.high.value: "float64",
+            cls.low.value: "float64",
+            cls.close.value: "float64",
+            cls.adj_close.value: "float64",
+            cls.volume.value: "Int64",
+        }
+
     @classmethod
     def sma_calculations(cls) -> Dict:
         return {
@@ -76,10 +90,19 @@ class StockStatusController(str, Enum):
 class DBHandlerController(str, Enum):
     fake = "fake"
     postgres = "postgres"
+    postgres_prices = "postgres_prices"
+
+
+class BulkLoadController(str, Enum):
+    insert = "insert"
+    copy = "copy"
 
 
 class DataHandlerController(str, Enum):
     yahoo_finance = "yahoo_finance"
+    local_csv = "local_csv"
+    parquet = "parquet"
+    synthetic = "synthetic"
 
 
 class KeyValueController(str, Enum):
@@ -115,6 +138,18 @@ class Config(BaseModel):
     kv_repo: str
     obj_store_repo: str
 
+    # Extra kwargs for the data repo (base_url, requests_per_second, ...)
+    # and how many tickers to pull at once.
+    data_repo_info: Dict = {}
+    data_pull_workers: int = 8
+
+    # ttl (seconds) and max_mb for the raw data response cache.
+    response_cache: Dict = {}
+
+    # Worker pool and tickers per chunk for the orchestrate task graph.
+    dag_workers: int = 8
+    dag_chunk_size: int = 100
+
 
 class StrategyInfo(BaseModel):
 
@@ -125,3 +160,23 @@ class StrategyInfo(BaseModel):
     macd_last_cross_up: str = "1900-01-01"
     macd_last_cross_down: str = "1900-01-02"
     macd_last_status: StockStatusController = StockStatusController.sell
+
+
+class IndicatorState(BaseModel):
+    """Everything needed to advance a ticker's indicators by one bar
+    without going back to the price history. See
+    Calculator.init_indicator_state() and advance_indicator_state().
+    """
+
+    # Date of the last bar folded into the state.
+    date: str
+    # Last closes, as many as the longest SMA window.
+    closes: List[float]
+    # Running sum of the last n closes for each SMA column.
+    sma_sums: Dict[str, float]
+    # Raw EMA recurrence values and the number of values fed to them,
+    # for the EMA columns and the signal line.
+    emas: Dict[str, float]
+    ema_obs: Dict[str, int]
+    # Indicator values for the last two bars, oldest first.
+    rows: List[Dict[str, Any]]
@@ -0,0 +1,280 @@
+import json
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import boto3
+import redis
+import sqlalchemy as sa
+from botocore.config import Config
+from sqlalchemy.engine import Engine
+
+
+class ConnectionRegistry:
+    def __init__(
+        self,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_recycle: int = 1800,
+        pre_ping: bool = True,
+        health_check_interval: float = 30.0,
+        redis_max_connections: int = 0,
+    ) -> None:
+        """Process wide cache of the engines and clients the repository
+        handlers connect through, keyed by (kind, connection info). The
+        handlers themselves stay cheap and per caller, since they carry
+        the caller's logger and state like pubsub subscriptions, but
+        every handler built with the same info shares one pool.
+
+        Args:
+            pool_size (int, optional): SQL connections kept open per pool.
+                Defaults to 5.
+            max_overflow (int, optional): Extra SQL connections allowed under
+                load. Defaults to 10.
+            pool_recycle (int, optional): Seconds before a SQL connection is
+                replaced. Defaults to 1800.
+            pre_ping (bool, optional): Test SQL connections on checkout.
+                Defaults to True.
+            health_check_interval (float, optional): Seconds between health
+                checks of a cached connection, 0 to check on every get.
+                Defaults to 30.0.
+            redis_max_connections (int, optional): Connections per Redis pool.
+                Callers wait for a free one when it is full. Defaults to 0,
+                uncapped.
+        """
+        self.configure(
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_recycle=pool_recycle,
+            pre_ping=pre_ping,
+            health_check_interval=health_check_interval,
+            redis_max_connections=redis_max_connections,
+        )
+        self._connections: Dict[Tuple[str, Hashable], Dict[str, Any]] = {}
+        self._lock = Lock()
+
+    def configure(
+        self,
+        pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+        pool_recycle: Optional[int] = None,
+        pre_ping: Optional[bool] = None,
+        health_check_interval: Optional[float] = None,
+        redis_max_connections: Optional[int] = None,
+    ) -> None:
+        """Updates the pool settings. Only connections created after the
+        call use them, so configure before building handlers. Arguments
+        left as None keep their current value, see __init__.
+        """
+        settings = {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_recycle": pool_recycle,
+            "pre_ping": pre_ping,
+            "health_check_interval": health_check_interval,
+            "redis_max_connections": redis_max_connections,
+        }
+        for name, value in settings.items():
+            if value is not None:
+                setattr(self, name, value)
+
+    @staticmethod
+    def _key(info: Any) -> Hashable:
+        return json.dumps(info, sort_keys=True, default=str)
+
+    def get(
+        self,
+        kind: str,
+        info: Any,
+        factory: Callable[[], Any],
+        health_check: Optional[Callable[[Any], None]] = None,
+        close: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """Returns the connection cached for (kind, info), creating it
+        with factory on first use. When health_check is given it runs at
+        most every health_check_interval seconds, and a connection that
+        fails it is closed and replaced. Checks and factory calls run
+        outside the registry lock, so a slow server only delays the
+        caller that connects to or checks it, while other callers keep
+        getting their cached connections.
+
+        Args:
+            kind (str): Type of connection, e.g. "sql".
+            info (Any): JSON serializable connection info.
+            factory (Callable[[], Any]): Creates the connection.
+            health_check (Optional[Callable[[Any], None]], optional): Raises if
+                the connection is unusable. Defaults to None.
+            close (Optional[Callable[[Any], None]], optional): Releases a
+                replaced connection. Defaults to None.
+
+        Returns:
+            Any: The shared connection.
+        """
+        key = (kind, self._key(info))
+        with self._lock:
+            entry = self._connections.get(key)
+            if entry is not None:
+                conn = entry["conn"]
+                if (
+                    health_check is None
+                    or entry["checking"]
+                    or monotonic() - entry["checked"] < self.health_check_interval
+                ):
+                    return conn
+                entry["checking"] = True
+
+        if entry is None:
+            return self._create(key, factory, close)
+
+        try:
+            health_check(conn)
+            healthy = True
+        except Exception:
+            healthy = False
+
+        try:
+            fresh = None if healthy else factory()
+        except Exception:
+            with self._lock:
+                entry["checking"] = False
+            raise
+
+        stale = None
+        with self._lock:
+            entry["checking"] = False
+            entry["checked"] = monotonic()
+            if fresh is not None:
+                if entry["conn"] is conn:
+                    stale, entry["conn"] = conn, fresh
+                else:
+                    stale = fresh
+            conn = entry["conn"]
+        if stale is not None:
+            self._close(close, stale)
+        return conn
+
+    def _create(
+        self,
+        key: Tuple[str, Hashable],
+        factory: Callable[[], Any],
+        close: Optional[Callable[[Any], None]],
+    ) -> Any:
+        """Creates and caches the connection for key. The factory runs
+        outside the lock, so a slow connect only delays its own callers,
+        and when two callers race the first one to finish wins and the
+        other's connection is closed.
+        """
+        conn = factory()
+        with self._lock:
+            entry = self._connections.get(key)
+            if entry is None:
+                self._connections[key] = {
+                    "conn": conn,
+                    "checked": monotonic(),
+                    "checking": False,
+                    "close": close,
+                }
+                return conn
+            winner = entry["conn"]
+        self._close(close, conn)
+        return winner
+
+    @staticmethod
+    def _close(close: Optional[Callable[[Any], None]], conn: Any) -> None:
+        if close is None:
+            return
+        try:
+            close(conn)
+        except Exception:
+            pass
+
+    def clear(self) -> None:
+        """Closes and forgets every cached connection, e.g. after a fork."""
+        with self._lock:
+            entries, self._connections = self._connections, {}
+        for entry in entries.values():
+            self._close(entry["close"], entry["conn"])
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def sql_engine(self, conn_str: str) -> Engine:
+        """Shared SQLAlchemy engine for conn_str.
+
+        Args:
+            conn_str (str): SQLAlchemy connection string.
+
+        Returns:
+            Engine: Pooled engine.
+        """
+
+        def factory() -> Engine:
+            kwargs = {"pool_pre_ping": self.pre_ping, "pool_recycle": self.pool_recycle}
+            if not conn_str.startswith("sqlite"):
+                kwargs.update(pool_size=self.pool_size, max_overflow=self.max_overflow)
+            return sa.create_engine(conn_str, **kwargs)
+
+        def health_check(engine: Engine) -> None:
+            with engine.connect() as conn:
+                conn.execute(sa.text("SELECT 1"))
+
+        return self.get(
+            "sql", conn_str, factory, health_check, lambda engine: engine.dispose()
+        )
+
+    def redis_client(self, redis_info: Dict) -> redis.Redis:
+        """Shared Redis client, and so connection pool, for redis_info.
+
+        Args:
+            redis_info (Dict): Keyword arguments of redis.Redis.
+
+        Returns:
+            redis.Redis: Pooled client.
+        """
+
+        def factory() -> redis.Redis:
+            kwargs = {
+                "health_check_interval": int(self.health_check_interval),
+                **redis_info,
+            }
+            if self.redis_max_connections:
+                pool = redis.BlockingConnectionPool(
+                    max_connections=self.redis_max_connections, **kwargs
+                )
+                return redis.Redis(connection_pool=pool)
+            return redis.Redis(**kwargs)
+
+        return self.get(
+            "redis",
+            redis_info,
+            factory,
+            lambda client: client.ping(),
+            lambda client: client.connection_pool.disconnect(),
+        )
+
+    def s3_client(self, s3_info: Dict) -> Any:
+        """Shared boto3 S3 client for s3_info. boto3 clients are thread
+        safe and pool their own HTTP connections, so there is nothing to
+        health check. Requests past the pool size open short lived extra
+        connections rather than fail.
+
+        Args:
+            s3_info (Dict): Keyword arguments of boto3.client("s3", ...).
+
+        Returns:
+            boto3.client: S3 client.
+        """
+        return self.get(
+            "s3",
+            s3_info,
+            lambda: boto3.client(
+                "s3",
+                config=Config(max_pool_connections=self.pool_size + self.max_overflow),
+                **s3_info,
+            ),
+        )
+
+
+# One registry per process, so every handler built with the same
+# connection info shares its engine or client.
+CONNECTIONS = ConnectionRegistry()
@@ -1,19 +1,32 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import gzip
+import io
+import os
+import re
 import time
 import sys
+import zlib
 from logging import Logger
+from http.client import HTTPException
 from typing import Dict, Optional
-from urllib.error import HTTPError
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse
+from urllib.request import urlopen
 import ssl
 from pydantic import validate_arguments
 
+import numpy as np
 import pandas as pd
 from pydantic import validate_arguments
 from dateutil.parser import parse
+from pandas.errors import EmptyDataError, ParserError
 
 from algo_trading.config.controllers import DataHandlerController
 from algo_trading.logger.controllers import LogConfig
 from algo_trading.logger.default_logger import get_child_logger
+from algo_trading.utils.instrumentation import instrument
 
 
 ssl._create_default_https_context = ssl._create_unverified_context
@@ -31,7 +44,123 @@ class AbstractDataRepository(ABC):
         pass
 
 
+class HostRateLimiter:
+    """Spaces out requests to the same host, across every thread and
+    repository instance in the process.
+    """
+
+    _lock = Lock()
+    _next_slot: Dict[str, float] = {}
+
+    @classmethod
+    def wait(cls, host: str, requests_per_second: float) -> None:
+        """Blocks until the host's next request slot.
+
+        Args:
+            host (str): Host being requested.
+            requests_per_second (float): Max request rate for the host.
+                                         0 or less disables limiting.
+        """
+        if requests_per_second <= 0:
+            return
+        with cls._lock:
+            now = time.monotonic()
+            slot = max(now, cls._next_slot.get(host, now))
+            cls._next_slot[host] = slot + 1 / requests_per_second
+        time.sleep(slot - now)
+
+
+class ResponseCache:
+    def __init__(self, cache_info: Dict) -> None:
+        """On-disk cache of raw provider responses, gzipped, one file
+        per request. Entries expire after ttl seconds and the least
+        recently used are evicted once the directory passes max_mb.
+        In offline mode every entry is served regardless of age.
+
+        Args:
+            cache_info (Dict): cache_dir (str), and optionally ttl (float,
+                               defaults to 12 hours), max_mb (float, defaults
+                               to 512) and offline (bool, defaults to False).
+        """
+        self.cache_dir = cache_info["cache_dir"]
+        self.ttl = float(cache_info.get("ttl", 12 * 60 * 60))
+        self.max_bytes = float(cache_info.get("max_mb", 512)) * 1024 * 1024
+        self.offline = bool(cache_info.get("offline", False))
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # Eviction walks the whole directory, so only one thread does it.
+    _evict_lock = Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.csv.gz")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Gets a cached response.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Optional[bytes]: Raw response, None if missing or expired.
+        """
+        path = self._path(key)
+        try:
+            age = time.time() - os.path.getmtime(path)
+            if not self.offline and age > self.ttl:
+                return None
+            with gzip.open(path, "rb") as f:
+                data = f.read()
+        except (OSError, EOFError):
+            return None
+        # Bump the access time so eviction drops the least recently used.
+        # Another thread may have evicted the file since the read.
+        try:
+            os.utime(path, (time.time(), os.path.getmtime(path)))
+        except OSError:
+            pass
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        """Writes a response to the cache, then evicts down to max_mb.
+
+        Args:
+            key (str): Cache key.
+            data (bytes): Raw response.
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        with ResponseCache._evict_lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".csv.gz"):
+                    stat = entry.stat()
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
 class YahooFinanceDataRepository(AbstractDataRepository):
+
+    # Status codes worth retrying, anything else (like a 404 for
+    # an unknown ticker) fails straight away.
+    retry_codes = {429, 500, 502, 503, 504}
+    # Network failures are retried like the codes above. HTTPException
+    # covers responses cut off mid body.
+    retry_errors = (URLError, TimeoutError, ConnectionError, HTTPException)
+
     def __init__(
         self,
         ticker: str,
@@ -39,6 +168,12 @@ class YahooFinanceDataRepository(AbstractDataRepository):
         end_date: str,
         log_info: LogConfig,
         interval: str = "1d",
+        base_url: str = "https://query1.finance.yahoo.com",
+        requests_per_second: float = 2.0,
+        retries: int = 3,
+        backoff: float = 1.0,
+        cache_info: Optional[Dict] = None,
+        timeout: float = 30.0,
     ) -> None:
         """Data Repository that hits the Yahoo Finance API endpoint
         to get raw price data and return it as a pandas DF.
@@ -49,12 +184,28 @@ class YahooFinanceDataRepository(AbstractDataRepository):
             end_date (str): Get data up until this point (not including).
             log_info (LogConfig): Info to create a log.
             interval (str, optional): Interval of datapoints. Defaults to "1d".
+            base_url (str, optional): API host. Defaults to "https://query1.finance.yahoo.com".
+            requests_per_second (float, optional): Rate limit for the host. Defaults to 2.0.
+            retries (int, optional): Retries on a retryable HTTPError or network
+                                     error. Defaults to 3.
+            backoff (float, optional): Seconds to wait before the first retry,
+                                       doubled after each one. Defaults to 1.0.
+            cache_info (Optional[Dict], optional): ResponseCache info to cache raw
+                                                   responses on disk. Defaults to None.
+            timeout (float, optional): Seconds to wait on the connection before
+                                       giving up on an attempt. Defaults to 30.0.
         """
         self.ticker = ticker
         self.start_date = start_date
         self.end_date = end_date
         self.log_info = log_info
         self.interval = interval
+        self.base_url = base_url.rstrip("/")
+        self.requests_per_second = requests_per_second
+        self.retries = retries
+        self.backoff = backoff
+        self.cache_info = cache_info
+        self.timeout = timeout
 
     @property
     def log(self) -> Logger:
@@ -80,25 +231,327 @@ class YahooFinanceDataRepository(AbstractDataRepository):
     @property
     def query_string(self) -> str:
         return (
-            f"https://query1.finance.yahoo.com/v7/finance/download/{self.ticker}"
+            f"{self.base_url}/v7/finance/download/{self.ticker}"
             + f"?period1={self.start_period_tuple}&period2={self.end_period_tuple}"
             + f"&interval={self.interval}&events=history&includeAdjustedClose=true"
         )
 
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        try:
+            return self._cache
+        except AttributeError:
+            self._cache = ResponseCache(self.cache_info) if self.cache_info else None
+            return self._cache
+
+    @property
+    def cache_key(self) -> str:
+        return (
+            f"{self.ticker}_{self.start_period_tuple}_"
+            + f"{self.end_period_tuple}_{self.interval}"
+        )
+
     def get_stock_data(self) -> Optional[pd.DataFrame]:
+        if self.cache is not None:
+            cached = self.cache.get(self.cache_key)
+            if cached is not None:
+                self.log.info(f"Serving {self.ticker} from the response cache.")
+                return pd.read_csv(io.BytesIO(cached))
+            if self.cache.offline:
+                self.log.error(
+                    f"No cached response for {self.ticker} ({self.cache_key}) "
+                    + "and the response cache is offline."
+                )
+                return pd.DataFrame()
+
+        host = urlparse(self.base_url).netloc
+        for attempt in range(self.retries + 1):
+            HostRateLimiter.wait(host, self.requests_per_second)
+            try:
+                with urlopen(self.query_string, timeout=self.timeout) as response:
+                    raw = response.read()
+            except HTTPError as e:
+                if e.code not in self.retry_codes or attempt == self.retries:
+                    break
+                reason = e.code
+            except self.retry_errors as e:
+                if attempt == self.retries:
+                    break
+                reason = repr(e)
+            else:
+                try:
+                    data = pd.read_csv(io.BytesIO(raw))
+                except (EmptyDataError, ParserError) as e:
+                    self.log.error(f"Could not parse the {self.ticker} response: {e}")
+                    break
+                # Only cache responses that parsed.
+                if self.cache is not None:
+                    self.cache.set(self.cache_key, raw)
+                return data
+
+            wait = self.backoff * 2 ** attempt
+            self.log.warning(
+                f"Got {reason} pulling {self.ticker}, retrying in {wait}s."
+            )
+            time.sleep(wait)
+
+        self.log.error(
+            f"\nFailed to pull data for {self.ticker} for dates: "
+            + f"{self.start_date} to {self.end_date}.\n"
+        )
+        return pd.DataFrame()
+
+
+# Raw column names every handler returns, matching the Yahoo download
+# so clean_df() works on any of them.
+RAW_COLUMNS = ["Date", "Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+
+class LocalFileDataRepository(AbstractDataRepository):
+    def __init__(
+        self,
+        ticker: str,
+        start_date: str,
+        end_date: str,
+        log_info: LogConfig,
+        data_dir: str,
+        interval: str = "1d",
+        file_name: Optional[str] = None,
+    ) -> None:
+        """Base for Data Repositories reading a directory holding one
+        file per ticker. Files use the raw Yahoo columns, or their
+        snake case versions. Subclasses implement _read().
+
+        Args:
+            ticker (str): Ticker to fetch data.
+            start_date (str): Get data starting here, or "max".
+            end_date (str): Get data up until this point (not including).
+            log_info (LogConfig): Info to create a log.
+            data_dir (str): Directory holding the files.
+            interval (str, optional): Unused, files hold a single interval.
+                                      Defaults to "1d".
+            file_name (Optional[str], optional): File name template formatted with
+                                                 ticker. Defaults to "{ticker}" plus
+                                                 the handler's extension.
+        """
+        self.ticker = ticker
+        self.start_date = start_date
+        self.end_date = end_date
+        self.log_info = log_info
+        self.data_dir = data_dir
+        self.interval = interval
+        self.file_name = file_name or f"{{ticker}}{self.extension}"
+
+    extension = ""
+
+    @property
+    def log(self) -> Logger:
         try:
-            return pd.read_csv(self.query_string)
-        except HTTPError:
-            self.log.error(
-                f"\nFailed to pull data for {self.ticker} for dates: "
-                + f"{self.start_date} to {self.end_date}.\n"
+            return self._log
+        except AttributeError:
+            self._log = get_child_logger(
+                self.log_info.log_name, self.__class__.__name__
             )
+            return self._log
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.data_dir, self.file_name.format(ticker=self.ticker))
+
+    @abstractmethod
+    def _read(self, path: str) -> pd.DataFrame:
+        pass
+
+    def get_stock_data(self) -> pd.DataFrame:
+        try:
+            df = self._read(self.path)
+        except FileNotFoundError:
+            self.log.error(f"\nNo data file for {self.ticker} at {self.path}.\n")
             return pd.DataFrame()
 
+        date_col = next(c for c in df.columns if c.lower() == "date")
+        dates = pd.to_datetime(df[date_col])
+        mask = dates < parse(self.end_date)
+        if self.start_date != "max":
+            mask &= dates >= parse(self.start_date)
+        return df[mask].reset_index(drop=True)
+
+
+class LocalCSVDataRepository(LocalFileDataRepository):
+    extension = ".csv"
+
+    def _read(self, path: str) -> pd.DataFrame:
+        return pd.read_csv(path)
+
+
+class ParquetDataRepository(LocalFileDataRepository):
+    extension = ".parquet"
+
+    def _read(self, path: str) -> pd.DataFrame:
+        return pd.read_parquet(path)
+
+
+class SyntheticDataRepository(AbstractDataRepository):
+
+    # Regular session bars for the intraday intervals.
+    session_open = "09:30"
+    session_minutes = 390
+    intraday_minutes = {"m": 1, "h": 60}
+
+    def __init__(
+        self,
+        ticker: str,
+        start_date: str,
+        end_date: str,
+        log_info: LogConfig,
+        interval: str = "1d",
+        seed: int = 0,
+        origin: str = "2000-01-03",
+        start_price: float = 100.0,
+        mu: float = 0.08,
+        sigma: float = 0.3,
+    ) -> None:
+        """Data Repository generating prices from a geometric Brownian
+        motion, for load tests and benchmarks without the network.
+
+        Daily closes are walked from origin with a generator seeded by
+        (seed, ticker), so a ticker has the same history whatever range
+        is asked for and incremental pulls line up with earlier ones.
+        Intraday bars are a Brownian bridge between each day's open and
+        close, seeded by (seed, ticker, day).
+
+        Args:
+            ticker (str): Ticker to fetch data.
+            start_date (str): Get data starting here, or "max" for origin.
+            end_date (str): Get data up until this point (not including).
+            log_info (LogConfig): Info to create a log.
+            interval (str, optional): "1d", or minutes/hours like "5m" or "1h".
+                                      Defaults to "1d".
+            seed (int, optional): Seed shared by every ticker. Defaults to 0.
+            origin (str, optional): First trading day of every series.
+                                    Defaults to "2000-01-03".
+            start_price (float, optional): Close on origin. Defaults to 100.0.
+            mu (float, optional): Annual drift. Defaults to 0.08.
+            sigma (float, optional): Annual volatility. Defaults to 0.3.
+        """
+        self.ticker = ticker
+        self.start_date = start_date
+        self.end_date = end_date
+        self.log_info = log_info
+        self.interval = interval
+        self.seed = seed
+        self.origin = origin
+        self.start_price = start_price
+        self.mu = mu
+        self.sigma = sigma
+
+    @property
+    def ticker_seed(self) -> int:
+        # crc32 rather than hash(), which is salted per process.
+        return zlib.crc32(self.ticker.encode())
+
+    @property
+    def bar_minutes(self) -> Optional[int]:
+        if self.interval == "1d":
+            return None
+        match = re.fullmatch(r"(\d+)([mh])", self.interval)
+        if match is None:
+            raise ValueError(f"Unsupported interval {self.interval}.")
+        return int(match.group(1)) * self.intraday_minutes[match.group(2)]
+
+    def _daily(self) -> pd.DataFrame:
+        days = pd.bdate_range(self.origin, parse(self.end_date), inclusive="left")
+        dt = 1 / 252
+        vol = self.sigma * np.sqrt(dt)
+
+        # One row of draws per day keeps every day's values independent
+        # of how many days are generated.
+        rng = np.random.default_rng([self.seed, self.ticker_seed])
+        z = rng.standard_normal((len(days), 5))
+
+        log_close = np.cumsum((self.mu - self.sigma ** 2 / 2) * dt + vol * z[:, 0])
+        close = self.start_price * np.exp(log_close)
+        prev_close = np.concatenate([[self.start_price], close[:-1]])
+        open_ = prev_close * np.exp(0.2 * vol * z[:, 1])
+        high = np.maximum(open_, close) * np.exp(0.5 * vol * np.abs(z[:, 2]))
+        low = np.minimum(open_, close) * np.exp(-0.5 * vol * np.abs(z[:, 3]))
+        volume = np.exp(15 + 0.5 * z[:, 4]).astype(np.int64)
+
+        return pd.DataFrame(
+            {
+                "Date": days,
+                "Open": open_,
+                "High": high,
+                "Low": low,
+                "Close": close,
+                "Adj Close": close,
+                "Volume": volume,
+            }
+        )
+
+    def _intraday(self, daily: pd.DataFrame, bar_minutes: int) -> pd.DataFrame:
+        bars = max(self.session_minutes // bar_minutes, 1)
+        offsets = pd.to_timedelta(self.session_open + ":00") + pd.to_timedelta(
+            np.arange(bars) * bar_minutes, unit="m"
+        )
+        t = np.arange(1, bars + 1) / bars
+        vol = self.sigma * np.sqrt(1 / 252 / bars)
+
+        frames = []
+        for day in daily.itertuples(index=False):
+            rng = np.random.default_rng(
+                [self.seed, self.ticker_seed, day.Date.toordinal()]
+            )
+            z = rng.standard_normal((bars, 3))
+            walk = np.cumsum(vol * z[:, 0])
+            # Pin the walk to the day's open and close.
+            log_path = (
+                np.log(day.Open)
+                + walk
+                - t * walk[-1]
+                + t * np.log(day.Close / day.Open)
+            )
+            close = np.exp(log_path)
+            open_ = np.concatenate([[day.Open], close[:-1]])
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "Date": day.Date + offsets,
+                        "Open": open_,
+                        "High": np.maximum(open_, close)
+                        * np.exp(0.5 * vol * np.abs(z[:, 1])),
+                        "Low": np.minimum(open_, close)
+                        * np.exp(-0.5 * vol * np.abs(z[:, 2])),
+                        "Close": close,
+                        "Adj Close": close,
+                        "Volume": np.full(bars, day.Volume // bars, dtype=np.int64),
+                    }
+                )
+            )
+        if not frames:
+            return pd.DataFrame(columns=RAW_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def get_stock_data(self) -> pd.DataFrame:
+        df = self._daily()
+        if self.start_date != "max":
+            df = df[df["Date"] >= parse(self.start_date)].reset_index(drop=True)
+
+        bar_minutes = self.bar_minutes
+        if bar_minutes is None:
+            df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
+        else:
+            df = self._intraday(df, bar_minutes)
+            df["Date"] = pd.to_datetime(df["Date"]).dt.strftime("%Y-%m-%d %H:%M:%S")
+        return df[RAW_COLUMNS]
+
 
 class DataRepository:
     _data_handlers = {
         DataHandlerController.yahoo_finance: YahooFinanceDataRepository,
+        DataHandlerController.local_csv: LocalCSVDataRepository,
+        DataHandlerController.parquet: ParquetDataRepository,
+        DataHandlerController.synthetic: SyntheticDataRepository,
     }
 
     @validate_arguments(config=dict(arbitrary_types_allowed=True))
@@ -116,4 +569,34 @@ class DataRepository:
 
     @property
     def handler(self) -> AbstractDataRepository:
-        return DataRepository._data_handlers[self.data_handler](**self.data_info)
+        handler = DataRepository._data_handlers[self.data_handler](**self.data_info)
+        return instrument(handler, self.data_info.get("log_info"))
+
+
+def get_stock_data_many(
+    data_infos: Dict[str, Dict],
+    data_handler: DataHandlerController,
+    max_workers: int = 8,
+) -> Dict[str, pd.DataFrame]:
+    """Gets price data for several tickers concurrently on a thread pool.
+    Pulls are network bound, so threads overlap the latency, and the
+    repositories rate limit per host themselves.
+
+    Args:
+        data_infos (Dict[str, Dict]): DataRepository data_info, keyed by ticker.
+        data_handler (DataHandlerController): Type of handler to use.
+        max_workers (int, optional): Concurrent pulls. Defaults to 8.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Price data keyed by ticker, in the
+                                 same order as data_infos.
+    """
+    if not data_infos:
+        return dict()
+
+    def _pull(data_info: Dict) -> pd.DataFrame:
+        return DataRepository(data_info, data_handler).handler.get_stock_data()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_pull, data_infos.values())
+        return dict(zip(data_infos.keys(), results))
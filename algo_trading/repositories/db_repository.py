@@ -1,15 +1,34 @@
-from typing import Dict, List, Union
+from typing import Dict, Iterator, List, Optional, Union
 from abc import ABC, abstractmethod, abstractproperty
+from datetime import timedelta
 from logging import Logger
+from threading import Lock
+import io
+import os
+import tempfile
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
 import sqlalchemy as sa
-from sqlalchemy.engine.base import Engine
+from sqlalchemy.engine.base import Connection, Engine
 from pydantic import validate_arguments
 
 from algo_trading.logger.controllers import LogConfig
 from algo_trading.logger.default_logger import get_child_logger
-from algo_trading.config.controllers import ColumnController, DBHandlerController
-from algo_trading.utils.utils import dt_to_str, str_to_dt, read_sql_to_df
+from algo_trading.config.controllers import (
+    BulkLoadController,
+    ColumnController,
+    DBHandlerController,
+)
+from algo_trading.utils.utils import (
+    dt_to_str,
+    str_to_dt,
+    read_sql_to_df,
+    iter_sql_to_df,
+)
+from algo_trading.utils.instrumentation import instrument
+from algo_trading.repositories.connection_registry import CONNECTIONS
 
 
 class AbstractQuery(ABC):
@@ -101,6 +120,140 @@ class PostgresQuery(AbstractQuery):
     def get_current_tickers(self) -> str:
         return "SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = 'public';"
 
+    @property
+    def get_most_recent_dates(self) -> str:
+        # One per ticker, joined with UNION ALL.
+        return "SELECT '{ticker}' AS ticker, MAX({date_col}) AS {date_col} FROM {table}"
+
+    @property
+    def get_days_back_many(self) -> str:
+        # One per ticker, joined with UNION ALL.
+        return "(SELECT '{ticker}' AS ticker, * FROM {table} ORDER BY {date_col} DESC LIMIT {days_back})"
+
+    @property
+    def copy_from_stdin(self) -> str:
+        return "COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv);"
+
+    @property
+    def create_staging_table(self) -> str:
+        return (
+            "CREATE UNLOGGED TABLE {staging_table} (LIKE {table} INCLUDING DEFAULTS);"
+        )
+
+    @property
+    def delete_staged_dates(self) -> str:
+        return "DELETE FROM {table} USING {staging_table} WHERE {table}.{date_col} = {staging_table}.{date_col};"
+
+    @property
+    def insert_from_staging(self) -> str:
+        return "INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging_table};"
+
+    @property
+    def drop_table(self) -> str:
+        return "DROP TABLE IF EXISTS {table};"
+
+
+class PostgresPricesQuery(PostgresQuery):
+    """Queries for the single table layout, where every ticker lives
+    in one prices table keyed by (ticker, date) and the tickers table
+    registers the tickers being tracked. {columns} is always the
+    explicit price column list so reads look like the per ticker tables.
+    """
+
+    @property
+    def create_tickers_table(self) -> str:
+        return "CREATE TABLE IF NOT EXISTS tickers (ticker TEXT PRIMARY KEY, added_on DATE NOT NULL DEFAULT CURRENT_DATE);"
+
+    @property
+    def create_table(self) -> str:
+        return """
+            CREATE TABLE IF NOT EXISTS prices (
+                ticker TEXT NOT NULL REFERENCES tickers (ticker),
+                {ddl_str},
+                PRIMARY KEY (ticker, {date_col})
+            );
+            """
+
+    @property
+    def create_date_index(self) -> str:
+        return "CREATE INDEX IF NOT EXISTS prices_date_idx ON prices ({date_col});"
+
+    @property
+    def register_tickers(self) -> str:
+        return "INSERT INTO tickers (ticker) VALUES {values} ON CONFLICT (ticker) DO NOTHING;"
+
+    @property
+    def get_current_tickers(self) -> str:
+        return "SELECT ticker FROM tickers;"
+
+    @property
+    def copy_legacy_table(self) -> str:
+        return """
+            INSERT INTO prices (ticker, {columns})
+            SELECT '{ticker}', {columns} FROM {table} WHERE TRUE
+            ON CONFLICT (ticker, {date_col}) DO NOTHING;
+            """
+
+    @property
+    def get_most_recent_date(self) -> str:
+        return "SELECT MAX({date_col}) FROM prices WHERE ticker = '{ticker}';"
+
+    @property
+    def get_days_back(self) -> str:
+        return """
+            SELECT temp.*
+            FROM (
+                SELECT {columns} FROM prices WHERE ticker = '{ticker}'
+                ORDER BY {date_col} DESC LIMIT {days_back}
+            ) AS temp
+            ORDER BY {date_col} ASC;
+            """
+
+    @property
+    def get_most_recent_dates(self) -> str:
+        return "SELECT ticker, MAX({date_col}) AS {date_col} FROM prices WHERE ticker IN ({tickers}) GROUP BY ticker;"
+
+    @property
+    def get_days_back_many(self) -> str:
+        return """
+            SELECT ticker, {columns}
+            FROM (
+                SELECT ticker, {columns},
+                    ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY {date_col} DESC) AS rn
+                FROM prices WHERE ticker IN ({tickers})
+            ) AS temp
+            WHERE rn <= {days_back}
+            ORDER BY ticker, {date_col} ASC;
+            """
+
+    @property
+    def get_since_date(self) -> str:
+        return "SELECT {columns} FROM prices WHERE ticker = '{ticker}' AND {date_col} >= '{since_date}' ORDER BY {date_col} ASC;"
+
+    @property
+    def get_until_date(self) -> str:
+        return "SELECT {columns} FROM prices WHERE ticker = '{ticker}' AND {date_col} <= '{until_date}' ORDER BY {date_col} ASC;"
+
+    @property
+    def get_dates_between(self) -> str:
+        return "SELECT {columns} FROM prices WHERE ticker = '{ticker}' AND {date_col} BETWEEN '{start_date}' AND '{end_date}' ORDER BY {date_col} ASC;"
+
+    @property
+    def get_all(self) -> str:
+        return "SELECT {columns} FROM prices WHERE ticker = '{ticker}' ORDER BY {date_col} ASC;"
+
+    @property
+    def get_row_num(self) -> str:
+        return "SELECT ROW_NUMBER() OVER (ORDER BY {date_col}) AS ROW_NUM, {date_col} FROM prices WHERE ticker = '{ticker}' ORDER BY {date_col} ASC;"
+
+    @property
+    def delete_staged_dates(self) -> str:
+        return """
+            DELETE FROM {table} USING {staging_table}
+            WHERE {table}.ticker = {staging_table}.ticker
+            AND {table}.{date_col} = {staging_table}.{date_col};
+            """
+
 
 class AbstractDBRepository(ABC):
     """Abstract repository to define common methods that
@@ -125,6 +278,18 @@ class AbstractDBRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_most_recent_date(self, ticker: str) -> str:
+        """Gets the latest date stored for the ticker.
+
+        Args:
+            ticker (str): Ticker to fetch data.
+
+        Returns:
+            str: Most recent date as a string.
+        """
+        pass
+
     @abstractmethod
     def get_days_back(self, ticker: str, days_back: int) -> pd.DataFrame:
         """Gets days_back rows of price data in ASCENDING order by date.
@@ -138,6 +303,36 @@ class AbstractDBRepository(ABC):
         """
         pass
 
+    def get_most_recent_dates(self, tickers: List[str]) -> Dict[str, str]:
+        """Gets the latest date stored for each ticker. Defaults to one
+        get_most_recent_date() call per ticker, repos that can do it in
+        a single round trip should override it.
+
+        Args:
+            tickers (List[str]): Tickers to fetch data.
+
+        Returns:
+            Dict[str, str]: Most recent date as a string, keyed by ticker.
+        """
+        return {ticker: self.get_most_recent_date(ticker) for ticker in tickers}
+
+    def get_days_back_many(
+        self, tickers: List[str], days_back: int
+    ) -> Dict[str, pd.DataFrame]:
+        """Gets days_back rows of price data for each ticker. Defaults
+        to one get_days_back() call per ticker, repos that can do it in
+        a single round trip should override it.
+
+        Args:
+            tickers (List[str]): Tickers to fetch data.
+            days_back (int): Last n rows to fetch.
+
+        Returns:
+            Dict[str, pd.DataFrame]: Price data in ASCENDING order by date,
+                                     keyed by ticker.
+        """
+        return {ticker: self.get_days_back(ticker, days_back) for ticker in tickers}
+
     @abstractmethod
     def get_since_date(self, ticker: str, date: str) -> pd.DataFrame:
         """Gets data since the given date for the ticker. Returns
@@ -210,6 +405,44 @@ class AbstractDBRepository(ABC):
         """
         pass
 
+    def iter_all(self, ticker: str, chunk_size: int = 50_000) -> Iterator[pd.DataFrame]:
+        """Streams all data for the ticker in chunks, so it can be
+        processed without holding the whole history. Repositories
+        that can read incrementally override this, the default slices
+        get_all().
+
+        Args:
+            ticker (str): Ticker to fetch data.
+            chunk_size (int, optional): Rows per chunk. Defaults to 50_000.
+
+        Yields:
+            pd.DataFrame: Price data in ASCENDING order by date.
+        """
+        yield from self._chunks(self.get_all(ticker), chunk_size)
+
+    def iter_dates_between(
+        self, ticker: str, start_date: str, end_date: str, chunk_size: int = 50_000
+    ) -> Iterator[pd.DataFrame]:
+        """get_dates_between() streamed in chunks, see iter_all().
+
+        Args:
+            ticker (str): Ticker to fetch data.
+            start_date (str): Start date.
+            end_date (str): End date.
+            chunk_size (int, optional): Rows per chunk. Defaults to 50_000.
+
+        Yields:
+            pd.DataFrame: Price data in ASCENDING order by date.
+        """
+        yield from self._chunks(
+            self.get_dates_between(ticker, start_date, end_date), chunk_size
+        )
+
+    @staticmethod
+    def _chunks(data: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start : start + chunk_size].reset_index(drop=True)
+
 
 class FakeDBRepository(AbstractDBRepository):
     def __init__(
@@ -235,20 +468,49 @@ class FakeDBRepository(AbstractDBRepository):
         self.data: pd.DataFrame = self.db_info["data"]
         self.idx_iterator = self.db_info.get("idx_iterator", 0)
 
-    def _get_idx_from_date(self, date: str, default="max") -> int:
+    @property
+    def dates(self) -> np.ndarray:
+        """The date column as a datetime64 array, built once so date
+        lookups are a binary search rather than a scan of the column.
+
+        Raises:
+            ValueError: The data is not in ASCENDING order by date.
+        """
         try:
-            return self.data.index[
-                self.data[ColumnController.date.value] == str_to_dt(date)
-            ].tolist()[0]
-        except IndexError:
-            if default == "max":
-                return len(self.data) - 1
-            else:
-                return int(0)
+            return self._dates
+        except AttributeError:
+            dates = self.data[ColumnController.date.value].to_numpy(
+                dtype="datetime64[ns]"
+            )
+            if len(dates) > 1 and (dates[1:] < dates[:-1]).any():
+                raise ValueError("FakeDBRepository data must be sorted by date.")
+            self._dates = dates
+            return self._dates
+
+    def _get_idx_from_date(self, date: str, default="max") -> int:
+        target = np.datetime64(str_to_dt(date), "ns")
+        idx = int(np.searchsorted(self.dates, target, side="left"))
+        if idx < len(self.dates) and self.dates[idx] == target:
+            return idx
+        if default == "max":
+            return len(self.data) - 1
+        else:
+            return int(0)
+
+    def _rows(self, start: int, stop: int) -> pd.DataFrame:
+        # A shallow frame over the table's blocks with its own index,
+        # so no values are copied. Callers can add columns, but must
+        # not write values in place.
+        rows = self.data.iloc[start:stop].copy(deep=False)
+        rows.index = pd.RangeIndex(len(rows))
+        return rows
 
     def create_new_ticker_tables(self, tickers: List[str]) -> List:
         pass
 
+    def get_most_recent_date(self, ticker: str) -> str:
+        return dt_to_str(self.data[ColumnController.date.value].iloc[-1])
+
     def get_days_back(self, ticker: str, days_back: int) -> pd.DataFrame:
         if (self.idx_iterator - days_back) < 0:
             start_idx = 0
@@ -259,26 +521,45 @@ class FakeDBRepository(AbstractDBRepository):
         self.idx_iterator += 1
         return data
 
+    def get_most_recent_dates(self, tickers: List[str]) -> Dict[str, str]:
+        most_recent_date = self.get_most_recent_date(tickers[0]) if tickers else None
+        return {ticker: most_recent_date for ticker in tickers}
+
+    def get_days_back_many(
+        self, tickers: List[str], days_back: int
+    ) -> Dict[str, pd.DataFrame]:
+        # Every ticker shares the one DF, so the iterator only
+        # moves forward once per call.
+        if not tickers:
+            return dict()
+        data = self.get_days_back(tickers[0], days_back)
+        return {ticker: data.copy() for ticker in tickers}
+
     def get_since_date(self, ticker: str, date: str) -> pd.DataFrame:
         since_date_idx = self._get_idx_from_date(date, default="min")
-        return self.data.iloc[since_date_idx:].reset_index(drop=True)
+        return self._rows(since_date_idx, len(self.data))
 
     def get_until_date(self, ticker: str, date: str) -> pd.DataFrame:
         until_date_idx = self._get_idx_from_date(date)
-        return self.data.iloc[: (until_date_idx + 1)].reset_index(drop=True)
+        return self._rows(0, until_date_idx + 1)
 
     def get_dates_between(
         self, ticker: str, start_date: str, end_date: str
     ) -> pd.DataFrame:
         start_date_idx = self._get_idx_from_date(start_date, default="min")
         end_date_idx = self._get_idx_from_date(end_date)
-        return self.data.iloc[start_date_idx : (end_date_idx + 1)].reset_index(
-            drop=True
-        )
+        return self._rows(start_date_idx, end_date_idx + 1)
 
     def get_row_num(self, ticker: str) -> pd.DataFrame:
-        idx_df = self.data.reset_index()
-        return idx_df[["index", ColumnController.date.value]]
+        # Only the two columns, rather than resetting the whole table.
+        return pd.DataFrame(
+            {
+                "index": np.arange(len(self.data)),
+                ColumnController.date.value: self.data[
+                    ColumnController.date.value
+                ].to_numpy(),
+            }
+        )
 
     def get_all(self, ticker: str) -> pd.DataFrame:
         return self.data
@@ -322,7 +603,7 @@ class PostgresRepository(AbstractDBRepository):
         try:
             return self._db_engine
         except AttributeError:
-            self._db_engine = sa.create_engine(self.queries.sql_alchemy_conn_str)
+            self._db_engine = CONNECTIONS.sql_engine(self.queries.sql_alchemy_conn_str)
             return self._db_engine
 
     def _create_table(self, ticker: str) -> None:
@@ -347,9 +628,97 @@ class PostgresRepository(AbstractDBRepository):
             self._create_table(ticker)
         return new_tickers
 
-    def append_df_to_sql(self, ticker: str, df: pd.DataFrame) -> None:
-        self.log.info(f"Adding {len(df)} rows to {ticker}.")
-        df.to_sql(ticker, con=self.db_engine, if_exists="append", index=False)
+    @staticmethod
+    def _to_copy_buffer(df: pd.DataFrame) -> io.StringIO:
+        """Writes the DF as headerless CSV for COPY FROM STDIN. Integer
+        DB columns are cast to nullable ints so that floats like 100.0
+        (pandas upcasts ints when there are NaNs) load into BIGINT.
+
+        Args:
+            df (pd.DataFrame): Price data to load.
+
+        Returns:
+            io.StringIO: CSV buffer at position 0.
+        """
+        df = df.copy()
+        for col, db_type in ColumnController.db_columns().items():
+            if db_type == "BIGINT" and col in df.columns:
+                df[col] = pd.to_numeric(df[col]).round().astype("Int64")
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d")
+        buffer.seek(0)
+        return buffer
+
+    def _load_df(
+        self, conn: Connection, table: str, df: pd.DataFrame, method: BulkLoadController
+    ) -> None:
+        if method == BulkLoadController.copy:
+            query = self.queries.copy_from_stdin.format(
+                table=table, columns=", ".join(df.columns)
+            )
+            with conn.connection.cursor() as cursor:
+                cursor.copy_expert(query, self._to_copy_buffer(df))
+        else:
+            df.to_sql(table, con=conn, if_exists="append", index=False)
+
+    def append_df_to_sql(
+        self,
+        ticker: str,
+        df: pd.DataFrame,
+        method: BulkLoadController = BulkLoadController.copy,
+        upsert: bool = False,
+    ) -> None:
+        """Loads the DF into the ticker table in a single transaction.
+
+        With upsert, rows are loaded into an unlogged staging table first,
+        and any existing rows with the same date are replaced, so re-running
+        a load for the same dates is idempotent. The staging table is
+        created and dropped inside the transaction, so it never outlives
+        the load (and DataFrame.to_sql can see it, which it can't with
+        TEMP tables).
+
+        Args:
+            ticker (str): Ticker table to load.
+            df (pd.DataFrame): Price data with DB columns.
+            method (BulkLoadController, optional): COPY FROM STDIN or
+                DataFrame.to_sql INSERTs. Defaults to BulkLoadController.copy.
+            upsert (bool, optional): Replace rows with the same date.
+                Defaults to False.
+        """
+        self.log.info(f"Adding {len(df)} rows to {ticker} ({method.value}).")
+        self._bulk_load(ticker, f"{ticker}_staging", df, method, upsert)
+
+    def _bulk_load(
+        self,
+        table: str,
+        staging_table: str,
+        df: pd.DataFrame,
+        method: BulkLoadController,
+        upsert: bool,
+    ) -> None:
+        with self.db_engine.begin() as conn:
+            if not upsert:
+                self._load_df(conn, table, df, method)
+                return
+
+            columns = ", ".join(df.columns)
+            conn.execute(
+                self.queries.create_staging_table.format(
+                    staging_table=staging_table, table=table
+                )
+            )
+            self._load_df(conn, staging_table, df, method)
+            conn.execute(
+                self.queries.delete_staged_dates.format(
+                    table=table, staging_table=staging_table, date_col=self.date_col
+                )
+            )
+            conn.execute(
+                self.queries.insert_from_staging.format(
+                    table=table, staging_table=staging_table, columns=columns
+                )
+            )
+            conn.execute(self.queries.drop_table.format(table=staging_table))
 
     def get_most_recent_date(self, ticker: str) -> str:
         query = self.queries.get_most_recent_date.format(
@@ -365,6 +734,61 @@ class PostgresRepository(AbstractDBRepository):
         )
         return read_sql_to_df(query, self.db_engine)
 
+    def get_most_recent_dates(self, tickers: List[str]) -> Dict[str, str]:
+        if not tickers:
+            return dict()
+        query = " UNION ALL ".join(
+            [
+                self.queries.get_most_recent_dates.format(
+                    ticker=ticker, table=ticker, date_col=self.date_col
+                )
+                for ticker in tickers
+            ]
+        )
+        return self._dates_by_ticker(read_sql_to_df(query, self.db_engine))
+
+    def get_days_back_many(
+        self, tickers: List[str], days_back: int
+    ) -> Dict[str, pd.DataFrame]:
+        if not tickers:
+            return dict()
+        query = " UNION ALL ".join(
+            [
+                self.queries.get_days_back_many.format(
+                    ticker=ticker,
+                    table=ticker,
+                    date_col=self.date_col,
+                    days_back=days_back,
+                )
+                for ticker in tickers
+            ]
+        )
+        return self._split_by_ticker(read_sql_to_df(query, self.db_engine))
+
+    def _dates_by_ticker(self, df: pd.DataFrame) -> Dict[str, str]:
+        df = df.dropna(subset=[self.date_col])
+        return {
+            ticker: dt_to_str(date)
+            for ticker, date in zip(df["ticker"], df[self.date_col])
+        }
+
+    def _split_by_ticker(self, df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """Splits a long format frame with a ticker column into a frame
+        per ticker, each in ASCENDING order by date.
+
+        Args:
+            df (pd.DataFrame): Long format price data.
+
+        Returns:
+            Dict[str, pd.DataFrame]: Price data keyed by ticker.
+        """
+        return {
+            ticker: group.drop(columns="ticker")
+            .sort_values(self.date_col)
+            .reset_index(drop=True)
+            for ticker, group in df.groupby("ticker", sort=False)
+        }
+
     def get_since_date(self, ticker: str, date: str) -> pd.DataFrame:
         query = self.queries.get_since_date.format(
             table=ticker, date_col=self.date_col, since_date=date
@@ -396,11 +820,454 @@ class PostgresRepository(AbstractDBRepository):
         query = self.queries.get_all.format(table=ticker, date_col=self.date_col)
         return read_sql_to_df(query, self.db_engine)
 
+    # The streaming reads format the queries with the keys of both
+    # layouts, the table per ticker one and the single prices table,
+    # so they serve PostgresPricesRepository as well.
+    def _query_kwargs(self, ticker: str) -> Dict[str, str]:
+        return {
+            "table": ticker,
+            "ticker": ticker,
+            "columns": ", ".join(ColumnController.db_columns().keys()),
+            "date_col": self.date_col,
+        }
+
+    def iter_all(self, ticker: str, chunk_size: int = 50_000) -> Iterator[pd.DataFrame]:
+        query = self.queries.get_all.format(**self._query_kwargs(ticker))
+        return iter_sql_to_df(
+            query, self.db_engine, chunk_size, ColumnController.df_dtypes()
+        )
+
+    def iter_dates_between(
+        self, ticker: str, start_date: str, end_date: str, chunk_size: int = 50_000
+    ) -> Iterator[pd.DataFrame]:
+        query = self.queries.get_dates_between.format(
+            start_date=start_date, end_date=end_date, **self._query_kwargs(ticker)
+        )
+        return iter_sql_to_df(
+            query, self.db_engine, chunk_size, ColumnController.df_dtypes()
+        )
+
+
+class PostgresPricesRepository(PostgresRepository):
+
+    columns = ", ".join(ColumnController.db_columns().keys())
+
+    def __init__(self, db_info: Dict, log_info: LogConfig) -> None:
+        """DB Repository for the single table layout. Every ticker lives
+        in one prices table keyed by (ticker, date), so the catalog no
+        longer grows with the universe and cross ticker reads are a
+        single query. Tickers are tracked in a tickers table instead of
+        scanning INFORMATION_SCHEMA.
+
+        The table is indexed rather than partitioned since Postgres 10
+        (see docker-compose.yml) can't index partitioned tables. The
+        (ticker, date) primary key serves the per ticker reads.
+
+        Args:
+            db_info (Dict): DB connection information.
+        """
+        super().__init__(db_info, log_info)
+
+    @property
+    def queries(self) -> AbstractQuery:
+        try:
+            return self._queries
+        except AttributeError:
+            self._queries = PostgresPricesQuery(**self.db_info)
+        return self._queries
+
+    def _create_schema(self) -> None:
+        col_str = ", ".join(
+            [f"{k} {v}" for k, v in ColumnController.db_columns().items()]
+        )
+        with self.db_engine.begin() as conn:
+            conn.execute(self.queries.create_tickers_table)
+            conn.execute(
+                self.queries.create_table.format(
+                    ddl_str=col_str, date_col=self.date_col
+                )
+            )
+            conn.execute(self.queries.create_date_index.format(date_col=self.date_col))
+
+    def _register_tickers(self, tickers: List[str]) -> None:
+        if not tickers:
+            return
+        values = ", ".join([f"('{ticker}')" for ticker in tickers])
+        with self.db_engine.begin() as conn:
+            conn.execute(self.queries.register_tickers.format(values=values))
+
+    def create_new_ticker_tables(self, tickers: List[str]) -> List:
+        self._create_schema()
+        new_tickers = self._get_new_tickers(tickers)
+        self.log.info(f"Processing {len(new_tickers)} new ticker(s).")
+        self._register_tickers(new_tickers)
+        return new_tickers
+
+    def append_df_to_sql(
+        self,
+        ticker: str,
+        df: pd.DataFrame,
+        method: BulkLoadController = BulkLoadController.copy,
+        upsert: bool = False,
+    ) -> None:
+        self.log.info(f"Adding {len(df)} rows to prices for {ticker} ({method.value}).")
+        df = df.copy()
+        df.insert(0, "ticker", ticker)
+        self._bulk_load("prices", f"prices_staging_{ticker}", df, method, upsert)
+
+    def _get_legacy_tables(self) -> List[str]:
+        """Tables of the per ticker layout: every table other than prices
+        and tickers that has all the price columns. Anything else in the
+        schema is skipped rather than copied as a ticker.
+
+        Returns:
+            List[str]: Legacy ticker tables.
+        """
+        inspector = sa.inspect(self.db_engine)
+        required = set(ColumnController.db_columns())
+        legacy_tables = []
+        for table in inspector.get_table_names():
+            if table in ("prices", "tickers"):
+                continue
+            columns = {col["name"] for col in inspector.get_columns(table)}
+            if required <= columns:
+                legacy_tables.append(table)
+            else:
+                self.log.warning(f"Skipping {table}, it is not a ticker table.")
+        return legacy_tables
+
+    def migrate_from_legacy(
+        self, tickers: Optional[List[str]] = None
+    ) -> Dict[str, int]:
+        """Copies the per ticker tables into the prices table. Rows that
+        already exist are skipped, so the migration can be re-run. The
+        legacy tables are left in place.
+
+        Args:
+            tickers (Optional[List[str]], optional): Legacy tables to migrate.
+                Defaults to None, which migrates every table with the price
+                columns.
+
+        Returns:
+            Dict[str, int]: Number of rows inserted per ticker.
+        """
+        self._create_schema()
+        legacy_tables = self._get_legacy_tables()
+        if tickers is not None:
+            legacy_tables = [t for t in legacy_tables if t in tickers]
+
+        self._register_tickers(legacy_tables)
+        migrated = dict()
+        for ticker in legacy_tables:
+            query = self.queries.copy_legacy_table.format(
+                ticker=ticker,
+                table=ticker,
+                columns=self.columns,
+                date_col=self.date_col,
+            )
+            with self.db_engine.begin() as conn:
+                migrated[ticker] = conn.execute(query).rowcount
+            self.log.info(f"Migrated {migrated[ticker]} rows from {ticker}.")
+        return migrated
+
+    def get_most_recent_date(self, ticker: str) -> str:
+        query = self.queries.get_most_recent_date.format(
+            date_col=self.date_col, ticker=ticker
+        )
+        with self.db_engine.connect() as conn:
+            res = conn.execute(query)
+        return dt_to_str(res.fetchall()[0][0])
+
+    def get_days_back(self, ticker: str, days_back: int) -> pd.DataFrame:
+        query = self.queries.get_days_back.format(
+            ticker=ticker,
+            columns=self.columns,
+            date_col=self.date_col,
+            days_back=days_back,
+        )
+        return read_sql_to_df(query, self.db_engine)
+
+    def get_most_recent_dates(self, tickers: List[str]) -> Dict[str, str]:
+        if not tickers:
+            return dict()
+        query = self.queries.get_most_recent_dates.format(
+            tickers=", ".join([f"'{ticker}'" for ticker in tickers]),
+            date_col=self.date_col,
+        )
+        return self._dates_by_ticker(read_sql_to_df(query, self.db_engine))
+
+    def get_days_back_many(
+        self, tickers: List[str], days_back: int
+    ) -> Dict[str, pd.DataFrame]:
+        if not tickers:
+            return dict()
+        query = self.queries.get_days_back_many.format(
+            tickers=", ".join([f"'{ticker}'" for ticker in tickers]),
+            columns=self.columns,
+            date_col=self.date_col,
+            days_back=days_back,
+        )
+        return self._split_by_ticker(read_sql_to_df(query, self.db_engine))
+
+    def get_since_date(self, ticker: str, date: str) -> pd.DataFrame:
+        query = self.queries.get_since_date.format(
+            ticker=ticker, columns=self.columns, date_col=self.date_col, since_date=date
+        )
+        return read_sql_to_df(query, self.db_engine)
+
+    def get_until_date(self, ticker: str, date: str) -> pd.DataFrame:
+        query = self.queries.get_until_date.format(
+            ticker=ticker, columns=self.columns, date_col=self.date_col, until_date=date
+        )
+        return read_sql_to_df(query, self.db_engine)
+
+    def get_dates_between(
+        self, ticker: str, start_date: str, end_date: str
+    ) -> pd.DataFrame:
+        query = self.queries.get_dates_between.format(
+            ticker=ticker,
+            columns=self.columns,
+            date_col=self.date_col,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        return read_sql_to_df(query, self.db_engine)
+
+    def get_row_num(self, ticker: str) -> pd.DataFrame:
+        query = self.queries.get_row_num.format(ticker=ticker, date_col=self.date_col)
+        return read_sql_to_df(query, self.db_engine)
+
+    def get_all(self, ticker: str) -> pd.DataFrame:
+        query = self.queries.get_all.format(
+            ticker=ticker, columns=self.columns, date_col=self.date_col
+        )
+        return read_sql_to_df(query, self.db_engine)
+
+
+# Cache file path -> lock held while the file is loaded or rewritten.
+# Shared by every CachedDBRepository in the process, so two handlers
+# caching the same ticker never pull or write it at the same time.
+_CACHE_FILE_LOCKS: Dict[str, Lock] = {}
+_CACHE_FILE_LOCKS_LOCK = Lock()
+
+
+def _cache_file_lock(path: str) -> Lock:
+    path = os.path.abspath(path)
+    with _CACHE_FILE_LOCKS_LOCK:
+        return _CACHE_FILE_LOCKS.setdefault(path, Lock())
+
+
+class CachedDBRepository(AbstractDBRepository):
+
+    date_col = ColumnController.date.value
+
+    def __init__(
+        self, db_repo: AbstractDBRepository, cache_info: Dict, log_info: LogConfig
+    ) -> None:
+        """Read-through cache in front of another DB repository. The full
+        history of each ticker is kept as an uncompressed Arrow (Feather v2)
+        file in cache_info["cache_dir"], which is memory-mapped on read.
+
+        Every read first asks the backing repository for its most recent
+        date, and only rows newer than the cached max date are queried
+        and appended to the file. Reads are then sliced out of the cached
+        frame instead of going back to SQL.
+
+        Args:
+            db_repo (AbstractDBRepository): Repository holding the data.
+            cache_info (Dict): Contains cache_dir.
+            log_info (LogConfig): Info to create a log.
+        """
+        self.db_repo = db_repo
+        self.cache_info = cache_info
+        self.log_info = log_info
+
+        self.cache_dir = self.cache_info["cache_dir"]
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    @property
+    def log(self) -> Logger:
+        try:
+            return self._log
+        except AttributeError:
+            self._log = get_child_logger(
+                self.log_info.log_name, self.__class__.__name__
+            )
+            return self._log
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, f"{ticker}.arrow")
+
+    def _read_file(self, ticker: str) -> Optional[pd.DataFrame]:
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None
+        return feather.read_table(path, memory_map=True).to_pandas()
+
+    def _tmp_path(self, ticker: str) -> str:
+        # Writing to a unique temp file first so readers never see a
+        # partially written file and concurrent writers never share one.
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f"{ticker}.", suffix=".tmp", dir=self.cache_dir
+        )
+        os.close(fd)
+        return tmp_path
+
+    def _write_file(self, ticker: str, data: pd.DataFrame) -> None:
+        tmp_path = self._tmp_path(ticker)
+        try:
+            feather.write_feather(data, tmp_path, compression="uncompressed")
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, self._path(ticker))
+
+    def _stream_to_file(self, ticker: str) -> pd.DataFrame:
+        """Writes the full history to the cache file a chunk at a time
+        from iter_all(), so the pull never holds the whole history as
+        both a result set and a frame, then maps the file back in.
+
+        Args:
+            ticker (str): Ticker to cache.
+
+        Returns:
+            pd.DataFrame: Full price history in ASCENDING order by date.
+        """
+        tmp_path = self._tmp_path(ticker)
+        writer = None
+        try:
+            for chunk in self.db_repo.iter_all(ticker):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pa.ipc.new_file(tmp_path, table.schema)
+                writer.write_table(table)
+        except Exception:
+            # Never leave a partial file behind for the next pull.
+            if writer is not None:
+                writer.close()
+            os.remove(tmp_path)
+            raise
+
+        if writer is None:
+            os.remove(tmp_path)
+            # Nothing to stream, keep the columns of an empty read.
+            data = self.db_repo.get_all(ticker).reset_index(drop=True)
+            self._write_file(ticker, data)
+            return data
+        writer.close()
+        os.replace(tmp_path, self._path(ticker))
+        return self._read_file(ticker)
+
+    def _load(self, ticker: str, latest: Optional[str] = None) -> pd.DataFrame:
+        """Gets the cached history for the ticker, pulling anything
+        newer than the cached max date from the backing repository.
+
+        Args:
+            ticker (str): Ticker to fetch data.
+            latest (Optional[str], optional): Most recent date in the backing
+                repository, if already known. Defaults to None.
+
+        Returns:
+            pd.DataFrame: Full price history in ASCENDING order by date.
+        """
+        with _cache_file_lock(self._path(ticker)):
+            data = self._frames.get(ticker)
+            if data is None:
+                data = self._read_file(ticker)
+
+            if data is None or len(data) == 0:
+                self.log.info(f"Caching full history for {ticker}")
+                data = self._stream_to_file(ticker)
+            else:
+                cached_max = data[self.date_col].iloc[-1]
+                if latest is None:
+                    latest = self.db_repo.get_most_recent_date(ticker)
+                if str_to_dt(latest) > cached_max:
+                    new_rows = self.db_repo.get_since_date(
+                        ticker, dt_to_str(cached_max + timedelta(days=1))
+                    )
+                    new_rows = new_rows.loc[
+                        pd.to_datetime(new_rows[self.date_col]) > cached_max
+                    ]
+                    self.log.info(
+                        f"Appending {len(new_rows)} rows to the {ticker} cache"
+                    )
+                    data = pd.concat([data, new_rows], ignore_index=True)
+                    data[self.date_col] = pd.to_datetime(data[self.date_col])
+                    self._write_file(ticker, data)
+
+            self._frames[ticker] = data
+            return data
+
+    @staticmethod
+    def _slice(data: pd.DataFrame, mask: Union[pd.Series, slice]) -> pd.DataFrame:
+        # Callers add indicator columns in place, so never hand out
+        # the cached frame itself.
+        if isinstance(mask, slice):
+            return data.iloc[mask].reset_index(drop=True)
+        return data.loc[mask].reset_index(drop=True)
+
+    def create_new_ticker_tables(self, tickers: List[str]) -> List:
+        return self.db_repo.create_new_ticker_tables(tickers)
+
+    def get_most_recent_date(self, ticker: str) -> str:
+        return self.db_repo.get_most_recent_date(ticker)
+
+    def get_most_recent_dates(self, tickers: List[str]) -> Dict[str, str]:
+        return self.db_repo.get_most_recent_dates(tickers)
+
+    def get_days_back(self, ticker: str, days_back: int) -> pd.DataFrame:
+        data = self._load(ticker)
+        return self._slice(data, slice(max(len(data) - days_back, 0), None))
+
+    def get_days_back_many(
+        self, tickers: List[str], days_back: int
+    ) -> Dict[str, pd.DataFrame]:
+        # One batched freshness check instead of one per ticker.
+        latest = self.db_repo.get_most_recent_dates(tickers)
+        data = {ticker: self._load(ticker, latest.get(ticker)) for ticker in tickers}
+        return {
+            ticker: self._slice(df, slice(max(len(df) - days_back, 0), None))
+            for ticker, df in data.items()
+        }
+
+    def get_since_date(self, ticker: str, date: str) -> pd.DataFrame:
+        data = self._load(ticker)
+        return self._slice(data, data[self.date_col] >= str_to_dt(date))
+
+    def get_until_date(self, ticker: str, date: str) -> pd.DataFrame:
+        data = self._load(ticker)
+        return self._slice(data, data[self.date_col] <= str_to_dt(date))
+
+    def get_dates_between(
+        self, ticker: str, start_date: str, end_date: str
+    ) -> pd.DataFrame:
+        data = self._load(ticker)
+        dates = data[self.date_col]
+        return self._slice(
+            data, (dates >= str_to_dt(start_date)) & (dates <= str_to_dt(end_date))
+        )
+
+    def get_row_num(self, ticker: str) -> pd.DataFrame:
+        data = self._load(ticker)
+        return pd.DataFrame(
+            {
+                "row_num": np.arange(1, len(data) + 1),
+                self.date_col: data[self.date_col].to_numpy(),
+            }
+        )
+
+    def get_all(self, ticker: str) -> pd.DataFrame:
+        return self._slice(self._load(ticker), slice(None))
+
 
 class DBRepository:
     _db_handlers = {
         DBHandlerController.fake: FakeDBRepository,
         DBHandlerController.postgres: PostgresRepository,
+        DBHandlerController.postgres_prices: PostgresPricesRepository,
     }
 
     # For some reason, validate_arguments is casting the pandas DF used
@@ -412,6 +1279,7 @@ class DBRepository:
         db_info: Dict,
         db_handler: DBHandlerController,
         log_info: LogConfig,
+        cache_info: Optional[Dict] = None,
     ) -> None:
         """A wrapper class to provide a consistent interface to the
         different DBRepository types found in the _db_handlers class
@@ -420,11 +1288,19 @@ class DBRepository:
         Args:
             db_info (Union[Dict, pd.DataFrame]): Info to instantiate the DB object.
             db_handler (DBHandlerController): Type of DB repo to fetch.
+            cache_info (Optional[Dict], optional): If given, reads go through a
+                CachedDBRepository. Defaults to None.
         """
         self.db_info = db_info
         self.db_handler = db_handler
         self.log_info = log_info
+        self.cache_info = cache_info
 
     @property
     def handler(self) -> AbstractDBRepository:
-        return DBRepository._db_handlers[self.db_handler](self.db_info, self.log_info)
+        handler = DBRepository._db_handlers[self.db_handler](
+            self.db_info, self.log_info
+        )
+        if self.cache_info is not None:
+            handler = CachedDBRepository(handler, self.cache_info, self.log_info)
+        return instrument(handler, self.log_info)
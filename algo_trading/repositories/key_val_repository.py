@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod, abstractproperty
-from typing import Any, Dict, Union, Optional
+from contextlib import contextmanager
+from threading import Condition
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterator, List, Tuple, Union, Optional
 import redis
 import json
 from pydantic import validate_arguments
@@ -8,6 +11,8 @@ from logging import Logger
 from algo_trading.logger.default_logger import get_child_logger
 from algo_trading.logger.controllers import LogConfig
 from algo_trading.config.controllers import KeyValueController
+from algo_trading.utils.instrumentation import instrument
+from algo_trading.repositories.connection_registry import CONNECTIONS
 
 
 # things to add to redis
@@ -26,7 +31,7 @@ from algo_trading.config.controllers import KeyValueController
 
 class AbstractKeyValueRepository(ABC):
     @abstractmethod
-    def set(self, key: str, value: Union[str, Dict]) -> bool:
+    def set(self, key: str, value: Union[str, Dict], ex: Optional[int] = None) -> bool:
         """Set a key and value. The value can be either string or
         dict. If a dict, we json.dumps the value so it is stored as
         a string and can be json.loads in the application.
@@ -34,6 +39,8 @@ class AbstractKeyValueRepository(ABC):
         Args:
             key (str): Key to set
             value (Union[Dict[str, Any], str]): Value to set
+            ex (Optional[int], optional): Seconds until the key expires.
+                                          Defaults to None, never.
 
         Returns:
             bool: Returns True if the operation was successful, False if not.
@@ -53,8 +60,335 @@ class AbstractKeyValueRepository(ABC):
         """
         pass
 
+    def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Gets the values of several keys. Stores that can do it in
+        one round trip override this.
+
+        Args:
+            keys (List[str]): Keys to query.
+
+        Returns:
+            List[Optional[str]]: Values in the order of keys, None for
+                                 missing keys.
+        """
+        return [self.get(key) for key in keys]
+
+    def mset(self, mapping: Dict[str, Union[str, Dict]]) -> None:
+        """Sets several keys. Dict values are json.dumps'd like set().
+        Stores that can do it in one round trip override this.
+
+        Args:
+            mapping (Dict[str, Union[str, Dict]]): Values keyed by key.
+        """
+        for key, value in mapping.items():
+            self.set(key, value)
+
+    @abstractmethod
+    def hgetall(self, key: str) -> Dict[str, str]:
+        """Gets every field of a hash.
+
+        Args:
+            key (str): Key of the hash.
+
+        Returns:
+            Dict[str, str]: Values keyed by field, empty if the key does
+                            not exist.
+        """
+        pass
+
+    @abstractmethod
+    def hset(self, key: str, mapping: Dict[str, str]) -> None:
+        """Sets only the given fields of a hash.
+
+        Args:
+            key (str): Key of the hash.
+            mapping (Dict[str, str]): Values keyed by field.
+        """
+        pass
+
+    @abstractmethod
+    def hcompare_and_set(
+        self,
+        key: str,
+        expected: Dict[str, str],
+        updates: Dict[str, str],
+        defaults: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """Atomically sets the updates fields of a hash if every
+        expected field still holds its expected value.
+
+        Args:
+            key (str): Key of the hash.
+            expected (Dict[str, str]): Values the fields must hold.
+            updates (Dict[str, str]): Values to set.
+            defaults (Optional[Dict[str, str]], optional): Values that missing
+                fields compare as. Defaults to None, where a missing field never
+                matches.
+
+        Returns:
+            bool: True if the updates were set, False if a field had changed.
+        """
+        pass
+
+    def hgetall_many(self, keys: List[str]) -> List[Dict[str, str]]:
+        """hgetall() over several keys. Stores that can do it in one
+        round trip override this.
+
+        Args:
+            keys (List[str]): Keys of the hashes.
+
+        Returns:
+            List[Dict[str, str]]: Hashes in the order of keys.
+        """
+        return [self.hgetall(key) for key in keys]
+
+    def hset_many(self, mappings: Dict[str, Dict[str, str]]) -> None:
+        """hset() over several keys. Stores that can do it in one round
+        trip override this.
+
+        Args:
+            mappings (Dict[str, Dict[str, str]]): Fields to set keyed by key.
+        """
+        for key, mapping in mappings.items():
+            self.hset(key, mapping)
+
+    @abstractmethod
+    def scan(
+        self, cursor: int = 0, match: Optional[str] = None, count: int = 100
+    ) -> Tuple[int, List[str]]:
+        """Gets one page of keys without blocking the store the way
+        listing every key at once does. A page can hold more or fewer
+        than count keys, and is empty only at the end in general.
+
+        Args:
+            cursor (int, optional): Cursor returned by the previous page,
+                                    0 to start. Defaults to 0.
+            match (Optional[str], optional): Glob the keys must match.
+                                             Defaults to None.
+            count (int, optional): Hint of keys to look at. Defaults to 100.
+
+        Returns:
+            Tuple[int, List[str]]: Cursor of the next page, 0 when this
+                                   was the last one, and the keys.
+        """
+        pass
+
+    def scan_iter(self, match: Optional[str] = None, count: int = 100) -> Iterator[str]:
+        """Iterates over every key with scan(), a page at a time.
+
+        Args:
+            match (Optional[str], optional): Glob the keys must match.
+                                             Defaults to None.
+            count (int, optional): Hint of keys per page. Defaults to 100.
+
+        Yields:
+            str: Keys. Keys changed during the scan may be skipped or repeated.
+        """
+        cursor = 0
+        while True:
+            cursor, keys = self.scan(cursor, match, count)
+            yield from keys
+            if cursor == 0:
+                return
+
+    @abstractmethod
+    def sadd(self, key: str, members: List[str]) -> int:
+        """Adds members to a set, creating it if needed.
+
+        Args:
+            key (str): Key of the set.
+            members (List[str]): Members to add.
+
+        Returns:
+            int: Number of members that were not in the set yet.
+        """
+        pass
+
+    @abstractmethod
+    def smembers(self, key: str) -> List[str]:
+        """Gets every member of a set.
+
+        Args:
+            key (str): Key of the set.
+
+        Returns:
+            List[str]: Members, sorted. Empty if the key does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def lpush(self, key: str, values: List[str]) -> int:
+        """Pushes values onto the head of a list, creating it if needed.
+
+        Args:
+            key (str): Key of the list.
+            values (List[str]): Values to push.
+
+        Returns:
+            int: Length of the list after the push.
+        """
+        pass
+
+    @abstractmethod
+    def brpop(self, key: str, timeout: int = 0) -> Optional[str]:
+        """Pops a value from the tail of a list, waiting for one if the
+        list is empty. Each value is popped by exactly one caller, which
+        makes the list a work queue.
+
+        Args:
+            key (str): Key of the list.
+            timeout (int, optional): Seconds to wait, 0 for ever. Defaults to 0.
+
+        Returns:
+            Optional[str]: The value, or None if the wait timed out.
+        """
+        pass
+
+    @contextmanager
+    def pipeline(self) -> Iterator["KeyValuePipeline"]:
+        """Batches the reads and writes of a loop. Writes are buffered
+        and flushed with a single mset() when the block exits without
+        an exception.
+
+        Yields:
+            KeyValuePipeline: Repository to use inside the block.
+        """
+        pipe = KeyValuePipeline(self)
+        yield pipe
+        pipe.flush()
+
+
+class KeyValuePipeline(AbstractKeyValueRepository):
+    def __init__(self, repo: AbstractKeyValueRepository) -> None:
+        """Repository returned by pipeline(). Reads are served from the
+        buffered writes, then from values fetched by mget(), and only
+        then from the wrapped repository. It is not shared between
+        threads, so each thread should open its own pipeline.
+
+        Args:
+            repo (AbstractKeyValueRepository): Repository to read from
+                                               and flush to.
+        """
+        self.repo = repo
+        self.values: Dict[str, Optional[str]] = {}
+        self.pending: Dict[str, Union[str, Dict]] = {}
+        self.hashes: Dict[str, Dict[str, str]] = {}
+        self.pending_hashes: Dict[str, Dict[str, str]] = {}
+
+    def set(self, key: str, value: Union[str, Dict], ex: Optional[int] = None) -> None:
+        if ex is not None:
+            # mset() has no expiry, so these skip the buffer.
+            self.pending.pop(key, None)
+            self.values.pop(key, None)
+            self.repo.set(key, value, ex)
+            return
+        if isinstance(value, dict) or isinstance(value, list):
+            value = json.dumps(value)
+        self.pending[key] = value
+        self.values[key] = value
+
+    def get(self, key: str) -> Optional[str]:
+        if key not in self.values:
+            self.values[key] = self.repo.get(key)
+        return self.values[key]
+
+    def mget(self, keys: List[str]) -> List[Optional[str]]:
+        missing = [key for key in dict.fromkeys(keys) if key not in self.values]
+        if missing:
+            self.values.update(zip(missing, self.repo.mget(missing)))
+        return [self.values[key] for key in keys]
+
+    def mset(self, mapping: Dict[str, Union[str, Dict]]) -> None:
+        for key, value in mapping.items():
+            self.set(key, value)
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        return self.hgetall_many([key])[0]
+
+    def hgetall_many(self, keys: List[str]) -> List[Dict[str, str]]:
+        missing = [key for key in dict.fromkeys(keys) if key not in self.hashes]
+        if missing:
+            self.hashes.update(zip(missing, self.repo.hgetall_many(missing)))
+        return [
+            {**self.hashes[key], **self.pending_hashes.get(key, {})} for key in keys
+        ]
+
+    def hset(self, key: str, mapping: Dict[str, str]) -> None:
+        if mapping:
+            self.pending_hashes.setdefault(key, {}).update(mapping)
+
+    def hset_many(self, mappings: Dict[str, Dict[str, str]]) -> None:
+        for key, mapping in mappings.items():
+            self.hset(key, mapping)
+
+    def hcompare_and_set(
+        self,
+        key: str,
+        expected: Dict[str, str],
+        updates: Dict[str, str],
+        defaults: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        # Never buffered, the comparison has to see the store. Earlier
+        # writes to the hash go first so they are compared against.
+        if key in self.pending_hashes:
+            self.repo.hset(key, self.pending_hashes.pop(key))
+        swapped = self.repo.hcompare_and_set(key, expected, updates, defaults)
+        if swapped and key in self.hashes:
+            self.hashes[key].update(updates)
+        elif not swapped:
+            self.hashes.pop(key, None)
+        return swapped
+
+    # Scans, sets and lists go straight to the store, nothing is buffered.
+    def scan(
+        self, cursor: int = 0, match: Optional[str] = None, count: int = 100
+    ) -> Tuple[int, List[str]]:
+        return self.repo.scan(cursor, match, count)
+
+    def sadd(self, key: str, members: List[str]) -> int:
+        return self.repo.sadd(key, members)
+
+    def smembers(self, key: str) -> List[str]:
+        return self.repo.smembers(key)
+
+    def lpush(self, key: str, values: List[str]) -> int:
+        return self.repo.lpush(key, values)
+
+    def brpop(self, key: str, timeout: int = 0) -> Optional[str]:
+        return self.repo.brpop(key, timeout)
+
+    def flush(self) -> None:
+        if self.pending:
+            self.repo.mset(self.pending)
+            self.pending = {}
+        if self.pending_hashes:
+            self.repo.hset_many(self.pending_hashes)
+            self.pending_hashes = {}
+
 
 class RedisRepository(AbstractKeyValueRepository):
+
+    # KEYS[1]: hash. ARGV: number of expected fields, then a
+    # (field, expected, default) triple per expected field, then
+    # (field, value) pairs to set. An empty default means none.
+    _compare_and_set_script = """
+    local n = tonumber(ARGV[1])
+    for i = 0, n - 1 do
+        local field = ARGV[2 + i * 3]
+        local current = redis.call('HGET', KEYS[1], field)
+        if current == false and ARGV[4 + i * 3] ~= '' then
+            current = ARGV[4 + i * 3]
+        end
+        if current ~= ARGV[3 + i * 3] then
+            return 0
+        end
+    end
+    for i = 2 + n * 3, #ARGV, 2 do
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+    return 1
+    """
+
     def __init__(self, redis_info: Dict, log_info: LogConfig) -> None:
         self.redis_info = redis_info
         self.log_info = log_info
@@ -74,23 +408,121 @@ class RedisRepository(AbstractKeyValueRepository):
         try:
             return self._conn
         except AttributeError:
-            self._conn = redis.Redis(**self.redis_info)
+            self._conn = CONNECTIONS.redis_client(self.redis_info)
             return self._conn
 
-    def set(self, key: str, value: Union[str, Dict]) -> None:
+    def set(self, key: str, value: Union[str, Dict], ex: Optional[int] = None) -> None:
         if isinstance(value, dict) or isinstance(value, list):
             value = json.dumps(value)
-        self.conn.set(key, value)
+        self.conn.set(key, value, ex=ex)
         self.log.debug(f"Successfully updated {key} to {value}")
 
     def get(self, key: str) -> Optional[str]:
         return self.conn.get(key)
 
+    def mget(self, keys: List[str]) -> List[Optional[str]]:
+        if not keys:
+            return []
+        return self.conn.mget(keys)
+
+    def mset(self, mapping: Dict[str, Union[str, Dict]]) -> None:
+        if not mapping:
+            return
+        self.conn.mset(
+            {
+                key: json.dumps(value) if isinstance(value, (dict, list)) else value
+                for key, value in mapping.items()
+            }
+        )
+        self.log.debug(f"Successfully updated {len(mapping)} keys")
+
+    @staticmethod
+    def _decode_hash(raw: Dict[bytes, bytes]) -> Dict[str, str]:
+        return {
+            (k.decode() if isinstance(k, bytes) else k): (
+                v.decode() if isinstance(v, bytes) else v
+            )
+            for k, v in raw.items()
+        }
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        return self._decode_hash(self.conn.hgetall(key))
+
+    def hgetall_many(self, keys: List[str]) -> List[Dict[str, str]]:
+        pipe = self.conn.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(key)
+        return [self._decode_hash(raw) for raw in pipe.execute()]
+
+    def hset(self, key: str, mapping: Dict[str, str]) -> None:
+        if mapping:
+            self.conn.hset(key, mapping=mapping)
+
+    def hset_many(self, mappings: Dict[str, Dict[str, str]]) -> None:
+        pipe = self.conn.pipeline(transaction=False)
+        for key, mapping in mappings.items():
+            if mapping:
+                pipe.hset(key, mapping=mapping)
+        pipe.execute()
+
+    @staticmethod
+    def _decode(value: Union[bytes, str]) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+    def scan(
+        self, cursor: int = 0, match: Optional[str] = None, count: int = 100
+    ) -> Tuple[int, List[str]]:
+        cursor, keys = self.conn.scan(cursor=cursor, match=match, count=count)
+        return int(cursor), [self._decode(key) for key in keys]
+
+    def sadd(self, key: str, members: List[str]) -> int:
+        if not members:
+            return 0
+        return self.conn.sadd(key, *members)
+
+    def smembers(self, key: str) -> List[str]:
+        return sorted(self._decode(member) for member in self.conn.smembers(key))
+
+    def lpush(self, key: str, values: List[str]) -> int:
+        if not values:
+            return self.conn.llen(key)
+        return self.conn.lpush(key, *values)
+
+    def brpop(self, key: str, timeout: int = 0) -> Optional[str]:
+        popped = self.conn.brpop(key, timeout=timeout)
+        return self._decode(popped[1]) if popped is not None else None
+
+    @property
+    def compare_and_set_script(self):
+        try:
+            return self._cas_script
+        except AttributeError:
+            self._cas_script = self.conn.register_script(self._compare_and_set_script)
+            return self._cas_script
+
+    def hcompare_and_set(
+        self,
+        key: str,
+        expected: Dict[str, str],
+        updates: Dict[str, str],
+        defaults: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        defaults = defaults or {}
+        args = [len(expected)]
+        for field, value in expected.items():
+            args += [field, value, defaults.get(field, "")]
+        for field, value in updates.items():
+            args += [field, value]
+        return bool(self.compare_and_set_script(keys=[key], args=args))
+
 
 class FakeKeyValueRepository(AbstractKeyValueRepository):
     def __init__(self, data: Dict, log_info: LogConfig) -> None:
         self.data = data
         self.log_info = log_info
+        # Stands in for Redis running a script atomically, and wakes
+        # up brpop() callers.
+        self._lock = Condition()
 
     @property
     def log(self) -> Logger:
@@ -102,14 +534,77 @@ class FakeKeyValueRepository(AbstractKeyValueRepository):
             )
             return self._log
 
-    def set(self, key: str, value: Union[str, Dict]):
+    def set(self, key: str, value: Union[str, Dict], ex: Optional[int] = None):
+        # Keys never expire in memory.
         if type(value) == dict:
             value = json.dumps(value)
         self.data[key] = value
         self.log.debug(f"Successfully updated {key} to {value}")
 
     def get(self, key: str) -> Optional[str]:
-        return self.data[key]
+        return self.data.get(key)
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self.data.get(key, {}))
+
+    def hset(self, key: str, mapping: Dict[str, str]) -> None:
+        with self._lock:
+            self.data.setdefault(key, {}).update(mapping)
+
+    def hcompare_and_set(
+        self,
+        key: str,
+        expected: Dict[str, str],
+        updates: Dict[str, str],
+        defaults: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        defaults = defaults or {}
+        with self._lock:
+            current = self.data.get(key, {})
+            for field, value in expected.items():
+                if current.get(field, defaults.get(field)) != value:
+                    return False
+            self.data.setdefault(key, {}).update(updates)
+            return True
+
+    def scan(
+        self, cursor: int = 0, match: Optional[str] = None, count: int = 100
+    ) -> Tuple[int, List[str]]:
+        # The cursor is an offset into the sorted keys.
+        with self._lock:
+            keys = sorted(self.data)
+        page = keys[cursor : cursor + count]
+        next_cursor = cursor + count if cursor + count < len(keys) else 0
+        if match is not None:
+            page = [key for key in page if fnmatchcase(key, match)]
+        return next_cursor, page
+
+    def sadd(self, key: str, members: List[str]) -> int:
+        with self._lock:
+            current = self.data.setdefault(key, set())
+            added = len(set(members) - current)
+            current.update(members)
+            return added
+
+    def smembers(self, key: str) -> List[str]:
+        with self._lock:
+            return sorted(self.data.get(key, set()))
+
+    def lpush(self, key: str, values: List[str]) -> int:
+        with self._lock:
+            current = self.data.setdefault(key, [])
+            current[:0] = reversed(values)
+            self._lock.notify_all()
+            return len(current)
+
+    def brpop(self, key: str, timeout: int = 0) -> Optional[str]:
+        with self._lock:
+            if not self._lock.wait_for(
+                lambda: self.data.get(key), timeout=timeout or None
+            ):
+                return None
+            return self.data[key].pop()
 
 
 class KeyValueRepository:
@@ -139,6 +634,7 @@ class KeyValueRepository:
 
     @property
     def handler(self) -> AbstractKeyValueRepository:
-        return KeyValueRepository._kv_handlers[self.kv_handler](
+        handler = KeyValueRepository._kv_handlers[self.kv_handler](
             self.kv_info, self.log_info
         )
+        return instrument(handler, self.log_info, rebind=["pipeline"])
@@ -10,6 +10,8 @@ from pydantic import validate_arguments
 from algo_trading.config.controllers import ObjStoreController
 from algo_trading.logger.controllers import LogConfig
 from algo_trading.logger.default_logger import get_child_logger
+from algo_trading.utils.instrumentation import instrument
+from algo_trading.repositories.connection_registry import CONNECTIONS
 
 
 class AbstractObjStore(ABC):
@@ -194,12 +196,13 @@ class S3Repository(AbstractObjStore):
         try:
             return self._client
         except AttributeError:
-            self._client = boto3.client(
-                "s3",
-                endpoint_url=self.endpoint_url,
-                aws_access_key_id=self.aws_access_key_id,
-                aws_secret_access_key=self.aws_secret_access_key,
-                region_name=self.region_name,
+            self._client = CONNECTIONS.s3_client(
+                {
+                    "endpoint_url": self.endpoint_url,
+                    "aws_access_key_id": self.aws_access_key_id,
+                    "aws_secret_access_key": self.aws_secret_access_key,
+                    "region_name": self.region_name,
+                }
             )
             return self._client
 
@@ -288,7 +291,8 @@ class ObjStoreRepository:
 
     @property
     def handler(self) -> AbstractObjStore:
-        return ObjStoreRepository._obj_handlers[self.obj_handler](
+        handler = ObjStoreRepository._obj_handlers[self.obj_handler](
             log_info=self.log_info,
             **self.obj_store_info,
         )
+        return instrument(handler, self.log_info)
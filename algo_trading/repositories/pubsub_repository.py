@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Generator
+import json
 import redis
 from pydantic import validate_arguments
 from logging import Logger
@@ -7,6 +8,7 @@ from logging import Logger
 from algo_trading.logger.default_logger import get_child_logger
 from algo_trading.logger.controllers import LogConfig
 from algo_trading.config.controllers import PubSubController
+from algo_trading.repositories.connection_registry import CONNECTIONS
 
 
 class AbstractPubSub(ABC):
@@ -56,11 +58,19 @@ class RedisPubSub(AbstractPubSub):
             return self._log
 
     @property
-    def pubsub(self) -> redis.Connection:
+    def conn(self) -> redis.Redis:
+        try:
+            return self._conn
+        except AttributeError:
+            self._conn = CONNECTIONS.redis_client(self.redis_info)
+            return self._conn
+
+    @property
+    def pubsub(self) -> redis.client.PubSub:
         try:
             return self._pubsub
         except AttributeError:
-            self._pubsub = redis.Redis(**self.redis_info)
+            self._pubsub = self.conn.pubsub(ignore_subscribe_messages=True)
             return self._pubsub
 
     def subscribe(self, channel: str) -> None:
@@ -70,7 +80,8 @@ class RedisPubSub(AbstractPubSub):
         return self.pubsub.listen()
 
     def publish(self, channel: str, msg: Dict) -> None:
-        self.pubsub.publish(channel, msg)
+        self.conn.publish(channel, json.dumps(msg))
+        self.log.debug(f"Published {msg} to {channel}")
 
 
 class PubSubRepository:
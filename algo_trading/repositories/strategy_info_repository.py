@@ -0,0 +1,150 @@
+import json
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from algo_trading.config.controllers import StrategyInfo
+from algo_trading.repositories.key_val_repository import AbstractKeyValueRepository
+
+
+class StrategyInfoRepository:
+
+    # Hash per ticker, one field per StrategyInfo attribute. The old
+    # schema kept a JSON string under the bare ticker.
+    key_format = "strategy_info:{ticker}"
+
+    def __init__(self, kv_repo: AbstractKeyValueRepository) -> None:
+        """Reads and writes each ticker's StrategyInfo as a hash in a
+        Key Value store. Strategies only write the fields they changed,
+        so strategies sharing a ticker never overwrite each other, and
+        status transitions are compare-and-set.
+
+        Fields missing from a hash read as the StrategyInfo default.
+
+        Args:
+            kv_repo (AbstractKeyValueRepository): Store holding the hashes.
+        """
+        self.kv_repo = kv_repo
+
+    @classmethod
+    def key(cls, ticker: str) -> str:
+        return cls.key_format.format(ticker=ticker)
+
+    @staticmethod
+    def _to_field(value: Any) -> str:
+        return value.value if isinstance(value, Enum) else str(value)
+
+    @staticmethod
+    def to_hash(info: StrategyInfo) -> Dict[str, str]:
+        return {
+            field: StrategyInfoRepository._to_field(value)
+            for field, value in info.dict().items()
+        }
+
+    @staticmethod
+    def changed_fields(
+        old: Optional[StrategyInfo], new: StrategyInfo
+    ) -> Dict[str, str]:
+        """Fields of new that differ from old, or from the defaults when
+        there is no old, as hash values.
+
+        Args:
+            old (Optional[StrategyInfo]): Info as read from the store.
+            new (StrategyInfo): Updated info.
+
+        Returns:
+            Dict[str, str]: Changed values keyed by field.
+        """
+        old_hash = StrategyInfoRepository.to_hash(old or StrategyInfo())
+        return {
+            field: value
+            for field, value in StrategyInfoRepository.to_hash(new).items()
+            if old_hash[field] != value
+        }
+
+    def get(self, ticker: str) -> Optional[StrategyInfo]:
+        """Gets a ticker's StrategyInfo.
+
+        Args:
+            ticker (str): Ticker to query.
+
+        Returns:
+            Optional[StrategyInfo]: Info, or None if the ticker has none.
+        """
+        return self.get_many([ticker])[ticker]
+
+    def get_many(self, tickers: List[str]) -> Dict[str, Optional[StrategyInfo]]:
+        """Gets the StrategyInfo of several tickers at once.
+
+        Args:
+            tickers (List[str]): Tickers to query.
+
+        Returns:
+            Dict[str, Optional[StrategyInfo]]: Info keyed by ticker, None
+                                               for tickers with none.
+        """
+        hashes = self.kv_repo.hgetall_many([self.key(t) for t in tickers])
+        return {
+            ticker: StrategyInfo(**fields) if fields else None
+            for ticker, fields in zip(tickers, hashes)
+        }
+
+    def update(
+        self, ticker: str, old: Optional[StrategyInfo], new: StrategyInfo
+    ) -> Dict[str, str]:
+        """Writes only the fields that changed between old and new.
+
+        Args:
+            ticker (str): Ticker to update.
+            old (Optional[StrategyInfo]): Info as read with get().
+            new (StrategyInfo): Updated info.
+
+        Returns:
+            Dict[str, str]: Fields written.
+        """
+        changed = self.changed_fields(old, new)
+        if changed:
+            self.kv_repo.hset(self.key(ticker), changed)
+        return changed
+
+    def compare_and_set(
+        self, ticker: str, field: str, expected: Any, value: Any
+    ) -> bool:
+        """Atomically sets a field if it still holds the expected value,
+        for status transitions.
+
+        Args:
+            ticker (str): Ticker to update.
+            field (str): StrategyInfo field.
+            expected (Any): Value the field must hold.
+            value (Any): New value.
+
+        Returns:
+            bool: True if the field was set.
+        """
+        return self.kv_repo.hcompare_and_set(
+            self.key(ticker),
+            {field: self._to_field(expected)},
+            {field: self._to_field(value)},
+            {field: self.to_hash(StrategyInfo())[field]},
+        )
+
+    def migrate_from_json(self, tickers: List[str]) -> List[str]:
+        """Copies StrategyInfo from the old JSON string keys into hashes.
+        Tickers that already have a hash are left alone.
+
+        Args:
+            tickers (List[str]): Tickers to migrate.
+
+        Returns:
+            List[str]: Tickers migrated.
+        """
+        existing = self.get_many(tickers)
+        legacy = dict(zip(tickers, self.kv_repo.mget(tickers)))
+        migrated = []
+        for ticker in tickers:
+            if existing[ticker] is not None or legacy[ticker] is None:
+                continue
+            info = StrategyInfo(**json.loads(legacy[ticker]))
+            self.kv_repo.hset(self.key(ticker), self.to_hash(info))
+            migrated.append(ticker)
+        return migrated
@@ -0,0 +1,202 @@
+import os
+import time
+from threading import Thread
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+from algo_trading.config.controllers import ColumnController, DBHandlerController
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.repositories.db_repository import (
+    CachedDBRepository,
+    DBRepository,
+    FakeDBRepository,
+    PostgresRepository,
+)
+from algo_trading.utils.utils import dt_to_str
+
+"""
+Functions tested in this module:
+- CachedDBRepository reads match the backing repository
+- CachedDBRepository incremental refresh
+- CachedDBRepository full pulls streamed to the cache file
+- CachedDBRepository concurrent loads of the same ticker
+"""
+
+DATA = pd.read_csv("./sample_data/backtest_sample_data.csv")
+DATA[ColumnController.date.value] = pd.to_datetime(DATA[ColumnController.date.value])
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="test_cached_db_repository",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+
+class CountingDBRepository(FakeDBRepository):
+    """
+    Fake DB that counts full history pulls.
+    """
+
+    full_pulls = 0
+
+    def get_all(self, ticker: str) -> pd.DataFrame:
+        self.full_pulls += 1
+        return super().get_all(ticker)
+
+
+class FailingDBRepository(FakeDBRepository):
+    """
+    Fake DB whose streamed read fails after the first chunk.
+    """
+
+    def iter_all(self, ticker: str, chunk_size: int = 50_000):
+        yield self.data.iloc[:10].reset_index(drop=True)
+        raise ConnectionError("connection lost")
+
+
+class SlowDBRepository(FakeDBRepository):
+    """
+    Fake DB whose streamed read is slow enough for loads to overlap.
+    """
+
+    streams = 0
+
+    def iter_all(self, ticker: str, chunk_size: int = 50_000):
+        SlowDBRepository.streams += 1
+        for start in range(0, len(self.data), 500):
+            time.sleep(0.01)
+            yield self.data.iloc[start : start + 500].reset_index(drop=True)
+
+
+def _sqlite_backing() -> PostgresRepository:
+    """
+    Postgres repository running on an in memory SQLite engine,
+    holding the sample data as the aapl table.
+    """
+    engine = sa.create_engine("sqlite://")
+    DATA.to_sql("aapl", engine, index=False)
+    db_info = {"user": "", "password": "", "db_name": "", "host": "", "port": ""}
+    repo = PostgresRepository(db_info, LOG_INFO)
+    repo._db_engine = engine
+    return repo
+
+
+def _cached(backing, cache_dir) -> CachedDBRepository:
+    return CachedDBRepository(backing, {"cache_dir": str(cache_dir)}, LOG_INFO)
+
+
+class TestCachedDBRepository:
+    def test_wrapper_builds_cached_repo(self, tmp_path):
+        handler = DBRepository(
+            {"data": DATA},
+            DBHandlerController.fake,
+            LOG_INFO,
+            {"cache_dir": str(tmp_path)},
+        ).handler
+        assert isinstance(handler, CachedDBRepository)
+
+    def test_reads_match_backing_repo(self, tmp_path):
+        backing = FakeDBRepository({"data": DATA}, LOG_INFO)
+        cached = _cached(backing, tmp_path)
+
+        pd.testing.assert_frame_equal(cached.get_all("aapl"), DATA)
+        pd.testing.assert_frame_equal(
+            cached.get_until_date("aapl", "2005-03-09"),
+            backing.get_until_date("aapl", "2005-03-09"),
+        )
+        pd.testing.assert_frame_equal(
+            cached.get_dates_between("aapl", "2004-12-28", "2005-03-09"),
+            backing.get_dates_between("aapl", "2004-12-28", "2005-03-09"),
+        )
+        pd.testing.assert_frame_equal(
+            cached.get_since_date("aapl", "2005-03-09"),
+            backing.get_since_date("aapl", "2005-03-09"),
+        )
+        assert len(cached.get_days_back("aapl", 5)) == 5
+        assert cached.get_row_num("aapl")["row_num"].iloc[-1] == len(DATA)
+        assert os.path.exists(tmp_path / "aapl.arrow")
+
+    def test_reads_are_copies(self, tmp_path):
+        cached = _cached(FakeDBRepository({"data": DATA}, LOG_INFO), tmp_path)
+        data = cached.get_all("aapl")
+        data["ma_7"] = 1.0
+        assert "ma_7" not in cached.get_all("aapl").columns
+
+    def test_incremental_refresh(self, tmp_path):
+        """
+        A new process reads the file and only the rows newer than
+        the cached max date are pulled.
+        """
+        backing = CountingDBRepository({"data": DATA.iloc[:-10]}, LOG_INFO)
+        _cached(backing, tmp_path).get_all("aapl")
+        assert backing.full_pulls == 1
+
+        backing = CountingDBRepository({"data": DATA}, LOG_INFO)
+        cached = _cached(backing, tmp_path)
+        pd.testing.assert_frame_equal(cached.get_all("aapl"), DATA)
+        assert backing.full_pulls == 0
+
+        # The refreshed file is served as is to the next process.
+        next_run = CountingDBRepository({"data": DATA}, LOG_INFO)
+        pd.testing.assert_frame_equal(_cached(next_run, tmp_path).get_all("aapl"), DATA)
+        assert next_run.full_pulls == 0
+
+    def test_batch_reads(self, tmp_path):
+        backing = FakeDBRepository({"data": DATA}, LOG_INFO)
+        cached = _cached(backing, tmp_path)
+
+        days_back = cached.get_days_back_many(["aapl", "msft"], 5)
+        assert list(days_back) == ["aapl", "msft"]
+        pd.testing.assert_frame_equal(
+            days_back["aapl"], DATA.iloc[-5:].reset_index(drop=True)
+        )
+        assert cached.get_most_recent_dates(["aapl"]) == {
+            "aapl": backing.get_most_recent_date("aapl")
+        }
+
+    def test_full_pull_streams_to_file(self, tmp_path):
+        backing = _sqlite_backing()
+        cached = _cached(backing, tmp_path)
+
+        data = cached.get_all("aapl")
+
+        pd.testing.assert_frame_equal(data, backing.get_all("aapl"), check_dtype=False)
+        assert os.listdir(tmp_path) == ["aapl.arrow"]
+        # A new instance reads the file instead of pulling again.
+        latest = dt_to_str(data[ColumnController.date.value].iloc[-1])
+        pd.testing.assert_frame_equal(
+            _cached(backing, tmp_path)._load("aapl", latest), data
+        )
+
+    def test_failed_stream_leaves_no_file(self, tmp_path):
+        cached = _cached(FailingDBRepository({"data": DATA}, LOG_INFO), tmp_path)
+
+        with pytest.raises(ConnectionError):
+            cached.get_all("aapl")
+        assert os.listdir(tmp_path) == []
+
+    def test_concurrent_loads_share_one_pull(self, tmp_path):
+        """
+        Two handlers loading the same ticker at once pull it once,
+        and the second one reads the file the first one wrote.
+        """
+        SlowDBRepository.streams = 0
+        results = {}
+
+        def _load(name):
+            backing = SlowDBRepository({"data": DATA}, LOG_INFO)
+            results[name] = _cached(backing, tmp_path).get_all("aapl")
+
+        threads = [Thread(target=_load, args=(name,)) for name in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert SlowDBRepository.streams == 1
+        for data in results.values():
+            pd.testing.assert_frame_equal(data, DATA)
+        assert os.listdir(tmp_path) == ["aapl.arrow"]
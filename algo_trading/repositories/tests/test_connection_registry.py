@@ -0,0 +1,173 @@
+from threading import Barrier, Event, Thread
+from time import monotonic
+
+import redis
+
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.repositories.connection_registry import ConnectionRegistry
+from algo_trading.repositories.key_val_repository import RedisRepository
+
+"""
+Functions tested in this module:
+- ConnectionRegistry.get()
+- ConnectionRegistry.clear()
+- ConnectionRegistry.sql_engine()
+- ConnectionRegistry.redis_client()
+"""
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="test_connection_registry",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+REDIS_INFO = {"host": "localhost", "port": "6379", "db": "0", "password": None}
+
+
+class Conn:
+    def __init__(self) -> None:
+        self.healthy = True
+        self.closed = False
+
+    def check(self) -> None:
+        if not self.healthy:
+            raise ConnectionError("gone")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestGet:
+    def test_cached_per_kind_and_info(self):
+        registry = ConnectionRegistry()
+
+        first = registry.get("sql", {"host": "a", "port": 1}, Conn)
+        assert registry.get("sql", {"port": 1, "host": "a"}, Conn) is first
+        assert registry.get("sql", {"host": "b", "port": 1}, Conn) is not first
+        assert registry.get("redis", {"host": "a", "port": 1}, Conn) is not first
+        assert len(registry) == 3
+
+    def test_unhealthy_connection_is_replaced(self):
+        registry = ConnectionRegistry(health_check_interval=0)
+        kwargs = dict(health_check=Conn.check, close=Conn.close)
+
+        first = registry.get("sql", "info", Conn, **kwargs)
+        assert registry.get("sql", "info", Conn, **kwargs) is first
+
+        first.healthy = False
+        second = registry.get("sql", "info", Conn, **kwargs)
+        assert second is not first
+        assert first.closed
+
+    def test_health_check_interval(self):
+        registry = ConnectionRegistry(health_check_interval=3600)
+        first = registry.get("sql", "info", Conn, Conn.check)
+        first.healthy = False
+
+        assert registry.get("sql", "info", Conn, Conn.check) is first
+
+    def test_health_check_runs_outside_lock(self):
+        registry = ConnectionRegistry(health_check_interval=0)
+        started, release = Event(), Event()
+
+        def hang(conn):
+            started.set()
+            release.wait(5)
+
+        slow = registry.get("sql", "slow", Conn, hang)
+        checker = Thread(target=registry.get, args=("sql", "slow", Conn, hang))
+        checker.start()
+        try:
+            assert started.wait(5)
+            # Other keys, and the key being checked, are not blocked.
+            assert registry.get("redis", "fast", Conn, Conn.check) is not None
+            assert registry.get("sql", "slow", Conn, hang) is slow
+        finally:
+            release.set()
+            checker.join()
+
+    def test_factory_runs_outside_lock(self):
+        registry = ConnectionRegistry()
+        started, release = Event(), Event()
+
+        def slow_factory():
+            started.set()
+            release.wait(5)
+            return Conn()
+
+        creator = Thread(target=registry.get, args=("sql", "slow", slow_factory))
+        creator.start()
+        try:
+            assert started.wait(5)
+            # Other keys are not blocked by the slow connect.
+            start = monotonic()
+            assert registry.get("redis", "fast", Conn) is not None
+            assert monotonic() - start < 1
+        finally:
+            release.set()
+            creator.join()
+        assert len(registry) == 2
+
+    def test_racing_creates_keep_one(self):
+        registry = ConnectionRegistry()
+        barrier = Barrier(2)
+        created, results = [], []
+
+        def factory():
+            conn = Conn()
+            created.append(conn)
+            barrier.wait(5)
+            return conn
+
+        def get():
+            results.append(registry.get("sql", "info", factory, close=Conn.close))
+
+        threads = [Thread(target=get) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(created) == 2
+        assert results[0] is results[1]
+        assert [conn.closed for conn in created].count(True) == 1
+        assert not results[0].closed
+
+    def test_clear(self):
+        registry = ConnectionRegistry()
+        first = registry.get("sql", "info", Conn, close=Conn.close)
+
+        registry.clear()
+
+        assert first.closed
+        assert len(registry) == 0
+        assert registry.get("sql", "info", Conn) is not first
+
+
+class TestClients:
+    def test_sql_engine_is_shared(self):
+        registry = ConnectionRegistry()
+        engine = registry.sql_engine("sqlite://")
+
+        assert registry.sql_engine("sqlite://") is engine
+        assert engine.pool._pre_ping
+
+    def test_redis_client_settings(self):
+        registry = ConnectionRegistry(pool_size=2, max_overflow=1)
+        client = registry.redis_client(REDIS_INFO)
+
+        assert registry.redis_client(dict(REDIS_INFO)) is client
+        # The SQL pool settings leave Redis uncapped.
+        assert not isinstance(client.connection_pool, redis.BlockingConnectionPool)
+
+        registry = ConnectionRegistry(redis_max_connections=3)
+        pool = registry.redis_client(REDIS_INFO).connection_pool
+        assert isinstance(pool, redis.BlockingConnectionPool)
+        assert pool.max_connections == 3
+
+    def test_handlers_share_client(self):
+        first = RedisRepository(REDIS_INFO, LOG_INFO)
+        second = RedisRepository(dict(REDIS_INFO), LOG_INFO)
+
+        assert first.conn is second.conn
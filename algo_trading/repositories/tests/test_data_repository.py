@@ -0,0 +1,309 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+import os
+import time
+import numpy as np
+import pandas as pd
+import pytest
+
+from algo_trading.config.controllers import ColumnController, DataHandlerController
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.repositories.data_repository import (
+    DataRepository,
+    ResponseCache,
+    SyntheticDataRepository,
+    get_stock_data_many,
+)
+from algo_trading.utils.utils import clean_df
+
+"""
+Functions tested in this module:
+- get_stock_data_many()
+- YahooFinanceDataRepository.get_stock_data() retries and timeouts
+- YahooFinanceDataRepository.get_stock_data() response cache
+- ResponseCache TTL and eviction
+- LocalCSVDataRepository / ParquetDataRepository.get_stock_data()
+- SyntheticDataRepository.get_stock_data()
+"""
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="test_data_repository",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+CSV = (
+    "Date,Open,High,Low,Close,Adj Close,Volume\n"
+    + "2022-01-03,1.0,2.0,0.5,1.5,1.5,100\n"
+    + "2022-01-04,1.5,2.5,1.0,2.0,2.0,200\n"
+)
+
+
+class YahooStub(BaseHTTPRequestHandler):
+    """
+    Stands in for the download endpoint. Tickers in `failures` get
+    that many 503s before a CSV, tickers in `dropped` have that many
+    connections closed without a response, tickers in `slow` wait that
+    many seconds before answering, tickers in `missing` always 404 and
+    tickers in `garbled` get an empty 200.
+    """
+
+    failures = {}
+    dropped = {}
+    slow = {}
+    missing = set()
+    garbled = set()
+    hits = {}
+    lock = Lock()
+
+    def do_GET(self):
+        ticker = self.path.split("?")[0].rsplit("/", 1)[-1]
+        with self.lock:
+            self.hits[ticker] = self.hits.get(ticker, 0) + 1
+            failing = self.failures.get(ticker, 0) > 0
+            if failing:
+                self.failures[ticker] -= 1
+            dropping = self.dropped.get(ticker, 0) > 0
+            if dropping:
+                self.dropped[ticker] -= 1
+            delay = self.slow.pop(ticker, 0)
+
+        if dropping:
+            self.close_connection = True
+            return
+        time.sleep(delay)
+        if ticker in self.missing:
+            self.send_error(404)
+        elif failing:
+            self.send_error(503)
+        else:
+            body = b"" if ticker in self.garbled else CSV.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    YahooStub.failures = {}
+    YahooStub.dropped = {}
+    YahooStub.slow = {}
+    YahooStub.missing = set()
+    YahooStub.garbled = set()
+    YahooStub.hits = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), YahooStub)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _data_info(ticker: str, base_url: str, **kwargs) -> dict:
+    return {
+        **kwargs,
+        "ticker": ticker,
+        "start_date": "2022-01-01",
+        "end_date": "2022-01-05",
+        "log_info": LOG_INFO,
+        "base_url": base_url,
+        "requests_per_second": 0,
+        "backoff": 0.01,
+    }
+
+
+def _pull(ticker: str, base_url: str, **kwargs):
+    return DataRepository(
+        _data_info(ticker, base_url, **kwargs), DataHandlerController.yahoo_finance
+    ).handler.get_stock_data()
+
+
+class TestYahooFinanceDataRepository:
+    def test_get_stock_data_many(self, base_url):
+        tickers = ["aapl", "msft", "tsla", "amzn"]
+        pulled = get_stock_data_many(
+            {t: _data_info(t, base_url) for t in tickers},
+            DataHandlerController.yahoo_finance,
+            max_workers=4,
+        )
+        assert list(pulled) == tickers
+        for df in pulled.values():
+            assert list(df["Close"]) == [1.5, 2.0]
+
+    def test_retries_server_errors(self, base_url):
+        YahooStub.failures = {"aapl": 2}
+        df = _pull("aapl", base_url)
+        assert len(df) == 2
+        assert YahooStub.hits["aapl"] == 3
+
+    def test_retries_dropped_connections(self, base_url):
+        YahooStub.dropped = {"aapl": 2}
+        df = _pull("aapl", base_url)
+        assert len(df) == 2
+        assert YahooStub.hits["aapl"] == 3
+
+    def test_retries_timeouts(self, base_url):
+        YahooStub.slow = {"aapl": 1.0}
+        df = _pull("aapl", base_url, timeout=0.2)
+        assert len(df) == 2
+        assert YahooStub.hits["aapl"] == 2
+
+    def test_unparseable_response(self, base_url, tmp_path):
+        YahooStub.garbled = {"aapl"}
+        df = _pull("aapl", base_url, cache_info={"cache_dir": str(tmp_path)})
+        assert len(df) == 0
+        assert YahooStub.hits["aapl"] == 1
+        assert not list(tmp_path.glob("*.csv.gz"))
+
+    def test_no_retry_on_missing_ticker(self, base_url):
+        YahooStub.missing = {"nope"}
+        df = _pull("nope", base_url)
+        assert len(df) == 0
+        assert YahooStub.hits["nope"] == 1
+
+
+class TestResponseCache:
+    def test_cache_hit_skips_provider(self, base_url, tmp_path):
+        cache_info = {"cache_dir": str(tmp_path)}
+        first = _pull("aapl", base_url, cache_info=cache_info)
+        second = _pull("aapl", base_url, cache_info=cache_info)
+
+        assert YahooStub.hits["aapl"] == 1
+        assert second.equals(first)
+        assert len(list(tmp_path.glob("aapl_*.csv.gz"))) == 1
+
+    def test_failures_are_not_cached(self, base_url, tmp_path):
+        YahooStub.missing = {"nope"}
+        cache_info = {"cache_dir": str(tmp_path)}
+        _pull("nope", base_url, cache_info=cache_info)
+        _pull("nope", base_url, cache_info=cache_info)
+        assert YahooStub.hits["nope"] == 2
+
+    def test_offline(self, base_url, tmp_path):
+        _pull("aapl", base_url, cache_info={"cache_dir": str(tmp_path)})
+        offline = {"cache_dir": str(tmp_path), "offline": True, "ttl": 0}
+
+        assert len(_pull("aapl", base_url, cache_info=offline)) == 2
+        assert len(_pull("msft", base_url, cache_info=offline)) == 0
+        assert YahooStub.hits == {"aapl": 1}
+
+    def test_ttl(self, tmp_path):
+        cache = ResponseCache({"cache_dir": str(tmp_path), "ttl": 60})
+        cache.set("aapl", b"data")
+        assert cache.get("aapl") == b"data"
+
+        path = tmp_path / "aapl.csv.gz"
+        stale = time.time() - 120
+        os.utime(path, (stale, stale))
+        assert cache.get("aapl") is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        # Room for roughly two entries.
+        cache = ResponseCache({"cache_dir": str(tmp_path), "max_mb": 2.5})
+        data = os.urandom(1024 * 1024)
+        cache.set("a", data)
+        cache.set("b", data)
+        for key, age in (("a", 20), ("b", 10)):
+            then = time.time() - age
+            os.utime(tmp_path / f"{key}.csv.gz", (then, then))
+        assert cache.get("a") == data
+
+        cache.set("c", data)
+        assert cache.get("b") is None
+        assert cache.get("a") == data
+        assert cache.get("c") == data
+
+    def test_evicted_after_read(self, tmp_path, monkeypatch):
+        """
+        A file evicted by another thread between the read and the
+        access time bump is still a hit.
+        """
+        cache = ResponseCache({"cache_dir": str(tmp_path)})
+        cache.set("aapl", b"data")
+
+        def evicted(path, times):
+            os.remove(path)
+            raise FileNotFoundError(path)
+
+        monkeypatch.setattr(os, "utime", evicted)
+        assert cache.get("aapl") == b"data"
+
+
+def _local_pull(handler: DataHandlerController, **kwargs):
+    return DataRepository(
+        {
+            "ticker": "aapl",
+            "start_date": "2022-01-04",
+            "end_date": "2022-01-06",
+            "log_info": LOG_INFO,
+            **kwargs,
+        },
+        handler,
+    ).handler.get_stock_data()
+
+
+class TestLocalFileDataRepository:
+    def _frame(self):
+        return pd.DataFrame(
+            {
+                "Date": ["2022-01-03", "2022-01-04", "2022-01-05", "2022-01-06"],
+                "Open": [1.0, 2.0, 3.0, 4.0],
+                "High": [1.0, 2.0, 3.0, 4.0],
+                "Low": [1.0, 2.0, 3.0, 4.0],
+                "Close": [1.0, 2.0, 3.0, 4.0],
+                "Adj Close": [1.0, 2.0, 3.0, 4.0],
+                "Volume": [1, 2, 3, 4],
+            }
+        )
+
+    def test_local_csv(self, tmp_path):
+        self._frame().to_csv(tmp_path / "aapl.csv", index=False)
+        df = _local_pull(DataHandlerController.local_csv, data_dir=str(tmp_path))
+        assert list(df["Date"]) == ["2022-01-04", "2022-01-05"]
+        assert list(clean_df(df).columns) == ColumnController.df_columns()
+
+    def test_parquet(self, tmp_path):
+        self._frame().to_parquet(tmp_path / "aapl.parquet", index=False)
+        df = _local_pull(DataHandlerController.parquet, data_dir=str(tmp_path))
+        assert list(df["Close"]) == [2.0, 3.0]
+
+    def test_missing_file(self, tmp_path):
+        df = _local_pull(DataHandlerController.local_csv, data_dir=str(tmp_path))
+        assert len(df) == 0
+
+
+class TestSyntheticDataRepository:
+    def test_history_is_stable_across_ranges(self):
+        full = _local_pull(DataHandlerController.synthetic, start_date="max")
+        recent = _local_pull(DataHandlerController.synthetic)
+
+        assert full["Date"].iloc[0] == "2000-01-03"
+        assert list(recent["Date"]) == ["2022-01-04", "2022-01-05"]
+        pd.testing.assert_frame_equal(full.iloc[-2:].reset_index(drop=True), recent)
+        assert list(clean_df(recent).columns) == ColumnController.df_columns()
+
+    def test_seeded_per_ticker(self):
+        def closes(ticker, seed=0):
+            return SyntheticDataRepository(
+                ticker, "2021-01-01", "2022-01-01", LOG_INFO, seed=seed
+            ).get_stock_data()["Close"]
+
+        assert closes("aapl").equals(closes("aapl"))
+        assert not closes("aapl").equals(closes("msft"))
+        assert not closes("aapl").equals(closes("aapl", seed=1))
+
+    def test_intraday(self):
+        daily = _local_pull(DataHandlerController.synthetic)
+        bars = _local_pull(DataHandlerController.synthetic, interval="30m")
+
+        assert len(bars) == 2 * 13
+        assert bars["Date"].iloc[0] == "2022-01-04 09:30:00"
+        # The last bar of each day closes on the daily close.
+        np.testing.assert_allclose(bars["Close"].iloc[[12, 25]], daily["Close"])
+        assert (bars["High"] >= bars[["Open", "Close"]].max(axis=1)).all()
+        assert (bars["Low"] <= bars[["Open", "Close"]].min(axis=1)).all()
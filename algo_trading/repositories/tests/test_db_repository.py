@@ -1,6 +1,17 @@
+import numpy as np
 import pandas as pd
+import pytest
+import sqlalchemy as sa
 
-from algo_trading.repositories.db_repository import FakeDBRepository
+from algo_trading.config.controllers import BulkLoadController, ColumnController
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.repositories.db_repository import (
+    FakeDBRepository,
+    PostgresPricesQuery,
+    PostgresPricesRepository,
+    PostgresRepository,
+)
 
 """
 data = pd.read_csv("./sample_data/repository_sample_data.csv")
@@ -15,3 +26,278 @@ def test_step_through():
     one_day_back = fake_db.get_days_back("aapl", 1)
     print(one_day_back.to_dict("records"))
 """
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="test_db_repository",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+
+def test_copy_buffer():
+    """
+    COPY CSV has no header, ISO dates, empty fields for NULLs
+    and integer volumes even after pandas upcasts to float.
+    """
+    df = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2022-01-03", "2022-01-04"]),
+            "close": [1.5, None],
+            "volume": [100.0, None],
+        }
+    )
+    buffer = PostgresRepository._to_copy_buffer(df)
+    assert buffer.read() == "2022-01-03,1.5,100\n2022-01-04,,\n"
+
+
+def test_split_by_ticker():
+    """
+    Long format batch results are split into one ascending
+    frame per ticker, without the ticker column.
+    """
+    repo = PostgresRepository({}, None)
+    df = pd.DataFrame(
+        {
+            "ticker": ["aapl", "aapl", "tsla"],
+            "date": pd.to_datetime(["2022-01-04", "2022-01-03", "2022-01-04"]),
+            "close": [2.0, 1.0, 3.0],
+        }
+    )
+    split = repo._split_by_ticker(df)
+
+    assert list(split) == ["aapl", "tsla"]
+    assert list(split["aapl"].columns) == ["date", "close"]
+    assert split["aapl"]["close"].tolist() == [1.0, 2.0]
+    assert split["aapl"].index.tolist() == [0, 1]
+
+
+def _fake_db() -> FakeDBRepository:
+    data = pd.DataFrame(
+        {
+            "date": pd.to_datetime(
+                ["2022-01-03", "2022-01-04", "2022-01-05", "2022-01-07"]
+            ),
+            "close": [1.0, 2.0, 3.0, 4.0],
+        }
+    )
+    return FakeDBRepository({"data": data}, None)
+
+
+def test_fake_date_lookup():
+    """
+    Exact dates are found by binary search, and missing ones fall
+    back to the first or last row.
+    """
+    fake_db = _fake_db()
+
+    assert fake_db._get_idx_from_date("2022-01-05") == 2
+    assert fake_db._get_idx_from_date("2022-01-07", default="min") == 3
+    assert fake_db._get_idx_from_date("2022-01-06") == 3
+    assert fake_db._get_idx_from_date("2022-01-06", default="min") == 0
+    assert fake_db._get_idx_from_date("2023-01-01", default="min") == 0
+
+    between = fake_db.get_dates_between("aapl", "2022-01-04", "2022-01-05")
+    assert between["close"].tolist() == [2.0, 3.0]
+    assert between.index.tolist() == [0, 1]
+    assert fake_db.get_since_date("aapl", "2022-01-05")["close"].tolist() == [3.0, 4.0]
+    assert fake_db.get_until_date("aapl", "2022-01-04")["close"].tolist() == [1.0, 2.0]
+
+
+def test_fake_requires_sorted_dates():
+    data = _fake_db().data.iloc[[1, 0, 2, 3]]
+    fake_db = FakeDBRepository({"data": data}, None)
+
+    with pytest.raises(ValueError):
+        fake_db.get_since_date("aapl", "2022-01-04")
+
+
+def test_fake_range_is_zero_copy():
+    """
+    Range queries share the table's values, and new columns on
+    the result leave the table alone.
+    """
+    fake_db = _fake_db()
+    since = fake_db.get_since_date("aapl", "2022-01-04")
+
+    assert np.shares_memory(since["close"].to_numpy(), fake_db.data["close"].to_numpy())
+    since["ma_7"] = 1.0
+    assert "ma_7" not in fake_db.data.columns
+
+
+def test_fake_row_num():
+    row_nums = _fake_db().get_row_num("aapl")
+
+    assert list(row_nums.columns) == ["index", ColumnController.date.value]
+    assert row_nums["index"].tolist() == [0, 1, 2, 3]
+
+
+def _sqlite_repo(repo_class, create: str, insert: str):
+    """
+    Postgres repository running its queries on an in memory SQLite
+    engine, which has no server side cursors but streams the same way.
+    """
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(create)
+        conn.execute(insert)
+    db_info = {"user": "", "password": "", "db_name": "", "host": "", "port": ""}
+    repo = repo_class(db_info, LOG_INFO)
+    repo._db_engine = engine
+    return repo
+
+
+def test_iter_all_streams_typed_chunks():
+    """
+    Chunks have parsed dates and the same dtypes whether or not
+    they hold NULLs, and add up to get_all().
+    """
+    repo = _sqlite_repo(
+        PostgresRepository,
+        "CREATE TABLE aapl (date DATE, close REAL, volume BIGINT)",
+        "INSERT INTO aapl VALUES ('2022-01-05', 3.0, 30), "
+        + "('2022-01-03', 1.0, 10), ('2022-01-04', 2.0, NULL)",
+    )
+
+    chunks = list(repo.iter_all("aapl", chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    for chunk in chunks:
+        assert str(chunk["date"].dtype) == "datetime64[ns]"
+        assert str(chunk["volume"].dtype) == "Int64"
+    streamed = pd.concat(chunks, ignore_index=True)
+    assert streamed["close"].tolist() == [1.0, 2.0, 3.0]
+    assert streamed["volume"].isna().tolist() == [False, True, False]
+    assert streamed["date"].tolist() == repo.get_all("aapl")["date"].tolist()
+
+    between = list(repo.iter_dates_between("aapl", "2022-01-04", "2022-01-05", 5))
+    assert [len(chunk) for chunk in between] == [2]
+
+
+def test_iter_all_prices_layout():
+    repo = _sqlite_repo(
+        PostgresPricesRepository,
+        "CREATE TABLE prices (ticker TEXT, date DATE, open REAL, high REAL, "
+        + "low REAL, close REAL, adj_close REAL, volume BIGINT)",
+        "INSERT INTO prices VALUES ('aapl', '2022-01-03', 1, 1, 1, 1, 1, 10), "
+        + "('tsla', '2022-01-03', 2, 2, 2, 2, 2, 20), "
+        + "('aapl', '2022-01-04', 3, 3, 3, 3, 3, 30)",
+    )
+
+    chunks = list(repo.iter_all("aapl", chunk_size=1))
+
+    assert len(chunks) == 2
+    assert list(chunks[0].columns) == ColumnController.df_columns()
+    assert pd.concat(chunks)["volume"].tolist() == [10, 30]
+
+
+def test_fake_iter_all():
+    chunks = list(_fake_db().iter_all("aapl", chunk_size=3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    assert chunks[1].index.tolist() == [0]
+    assert chunks[1]["close"].tolist() == [4.0]
+
+
+class SQLitePricesQuery(PostgresPricesQuery):
+    """
+    Swaps the Postgres only statements of an upsert, an UNLOGGED
+    LIKE table and DELETE ... USING, for SQLite ones.
+    """
+
+    @property
+    def create_staging_table(self) -> str:
+        return "CREATE TABLE {staging_table} AS SELECT * FROM {table} WHERE 0;"
+
+    @property
+    def delete_staged_dates(self) -> str:
+        return """
+            DELETE FROM {table} WHERE EXISTS (
+                SELECT 1 FROM {staging_table} AS s
+                WHERE s.ticker = {table}.ticker AND s.{date_col} = {table}.{date_col}
+            );
+            """
+
+
+def _sqlite_prices_repo() -> PostgresPricesRepository:
+    repo = _sqlite_repo(PostgresPricesRepository, "SELECT 1", "SELECT 1")
+    repo._queries = SQLitePricesQuery(**repo.db_info)
+    return repo
+
+
+def _prices(dates, close) -> pd.DataFrame:
+    df = pd.DataFrame({"date": pd.to_datetime(dates)})
+    for col in ColumnController.db_columns():
+        if col != "date":
+            df[col] = close
+    df["volume"] = 100
+    return df
+
+
+def test_prices_create_tables():
+    """
+    Tickers are registered once, and the schema is created on the
+    first call.
+    """
+    repo = _sqlite_prices_repo()
+
+    assert sorted(repo.create_new_ticker_tables(["aapl", "tsla"])) == ["aapl", "tsla"]
+    assert repo.create_new_ticker_tables(["aapl", "msft"]) == ["msft"]
+    assert sorted(sa.inspect(repo.db_engine).get_table_names()) == ["prices", "tickers"]
+
+
+def test_prices_reads_and_upsert():
+    repo = _sqlite_prices_repo()
+    repo.create_new_ticker_tables(["aapl", "tsla"])
+    insert = BulkLoadController.insert
+    repo.append_df_to_sql(
+        "aapl", _prices(["2022-01-03", "2022-01-04", "2022-01-05"], 1.0), insert
+    )
+    repo.append_df_to_sql("tsla", _prices(["2022-01-03"], 5.0), insert)
+
+    # Re-loading a date replaces it instead of duplicating it.
+    repo.append_df_to_sql(
+        "aapl", _prices(["2022-01-05", "2022-01-06"], 2.0), insert, upsert=True
+    )
+
+    aapl = repo.get_all("aapl")
+    assert list(aapl.columns) == ColumnController.df_columns()
+    assert aapl["close"].tolist() == [1.0, 1.0, 2.0, 2.0]
+
+    days_back = repo.get_days_back("aapl", 2)
+    assert days_back["date"].tolist() == list(
+        pd.to_datetime(["2022-01-05", "2022-01-06"])
+    )
+
+    many = repo.get_days_back_many(["aapl", "tsla", "msft"], 2)
+    assert list(many) == ["aapl", "tsla"]
+    assert many["aapl"]["close"].tolist() == [2.0, 2.0]
+    assert list(many["tsla"].columns) == ColumnController.df_columns()
+
+    assert repo.get_most_recent_dates(["aapl", "tsla", "msft"]) == {
+        "aapl": "2022-01-06",
+        "tsla": "2022-01-03",
+    }
+
+
+def test_migrate_from_legacy():
+    """
+    Only tables with the price columns are migrated, the tickers
+    filter is honored and re-runs insert nothing.
+    """
+    repo = _sqlite_prices_repo()
+    ddl = ", ".join(f"{k} {v}" for k, v in ColumnController.db_columns().items())
+    with repo.db_engine.begin() as conn:
+        for ticker, rows in (("aapl", 2), ("msft", 1)):
+            conn.execute(f"CREATE TABLE {ticker} ({ddl})")
+            for day in range(rows):
+                conn.execute(
+                    f"INSERT INTO {ticker} VALUES ('2022-01-0{day + 3}', 1, 1, 1, 1, 1, 10)"
+                )
+        conn.execute("CREATE TABLE users (id INTEGER, email TEXT)")
+
+    assert repo.migrate_from_legacy(["aapl"]) == {"aapl": 2}
+    assert repo.migrate_from_legacy() == {"aapl": 0, "msft": 1}
+    assert repo.migrate_from_legacy() == {"aapl": 0, "msft": 0}
+
+    assert repo.get_all("aapl")["volume"].tolist() == [10, 10]
+    assert sorted(repo._get_new_tickers(["aapl", "msft", "users"])) == ["users"]
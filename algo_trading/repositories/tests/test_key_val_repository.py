@@ -0,0 +1,131 @@
+import json
+import pytest
+
+from algo_trading.config.controllers import KeyValueController
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.repositories.key_val_repository import KeyValueRepository
+
+"""
+Functions tested in this module:
+- FakeKeyValueRepository.get()
+- FakeKeyValueRepository.mget()
+- FakeKeyValueRepository.mset()
+- FakeKeyValueRepository.scan()
+- FakeKeyValueRepository.sadd()
+- FakeKeyValueRepository.smembers()
+- FakeKeyValueRepository.lpush()
+- FakeKeyValueRepository.brpop()
+- AbstractKeyValueRepository.scan_iter()
+- AbstractKeyValueRepository.pipeline()
+"""
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="test_key_val_repository",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+
+class CountingKeyValueRepository:
+    """
+    Counts the calls that would be round trips to a real store.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.calls = []
+
+    def __getattr__(self, name):
+        attr = getattr(self.repo, name)
+        if name in ("get", "set", "mget", "mset"):
+            self.calls.append(name)
+        return attr
+
+
+def _fake_kv(data=None):
+    return KeyValueRepository(
+        {} if data is None else data, KeyValueController.fake, LOG_INFO
+    ).handler
+
+
+class TestFakeKeyValueRepository:
+    def test_missing_key(self):
+        assert _fake_kv().get("aapl") is None
+
+    def test_mget_mset(self):
+        kv = _fake_kv({"aapl": "1"})
+        kv.mset({"msft": {"sma_last_status": "buy"}, "tsla": "2"})
+
+        assert kv.mget(["aapl", "msft", "nio", "tsla"]) == [
+            "1",
+            json.dumps({"sma_last_status": "buy"}),
+            None,
+            "2",
+        ]
+        assert kv.mget([]) == []
+
+    def test_scan_pages(self):
+        kv = _fake_kv({f"ticker:{i:02d}": "1" for i in range(25)})
+        kv.set("user:1", "1")
+
+        cursor, keys = kv.scan(0, "ticker:*", 10)
+        assert cursor == 10
+        assert keys == [f"ticker:{i:02d}" for i in range(10)]
+
+        pages = []
+        cursor = 0
+        while True:
+            cursor, keys = kv.scan(cursor, "ticker:*", 10)
+            pages.append(keys)
+            if cursor == 0:
+                break
+        assert len(pages) == 3
+        assert sum(pages, []) == list(kv.scan_iter("ticker:*", 10))
+        assert len(list(kv.scan_iter(count=7))) == 26
+
+    def test_sets(self):
+        kv = _fake_kv()
+        assert kv.smembers("subscribers:aapl") == []
+        assert kv.sadd("subscribers:aapl", ["b@test.com", "a@test.com"]) == 2
+        assert kv.sadd("subscribers:aapl", ["a@test.com", "c@test.com"]) == 1
+        assert kv.smembers("subscribers:aapl") == [
+            "a@test.com",
+            "b@test.com",
+            "c@test.com",
+        ]
+
+    def test_lists_pop_oldest_first(self):
+        kv = _fake_kv()
+        assert kv.lpush("jobs", ["a", "b"]) == 2
+        assert kv.lpush("jobs", ["c"]) == 3
+
+        assert [kv.brpop("jobs", 1) for _ in range(3)] == ["a", "b", "c"]
+        assert kv.brpop("jobs", 1) is None
+
+
+class TestPipeline:
+    def test_writes_flush_once(self):
+        kv = _fake_kv({"aapl": "1", "msft": "2"})
+        counted = CountingKeyValueRepository(kv)
+
+        with kv.pipeline() as pipe:
+            pipe.repo = counted
+            assert pipe.mget(["aapl", "msft", "aapl"]) == ["1", "2", "1"]
+            pipe.set("aapl", {"a": 1})
+            pipe.set("nio", "3")
+            # Reads see the buffered writes.
+            assert pipe.get("aapl") == json.dumps({"a": 1})
+            assert pipe.get("msft") == "2"
+            assert kv.get("aapl") == "1"
+
+        assert counted.calls == ["mget", "mset"]
+        assert kv.mget(["aapl", "nio"]) == [json.dumps({"a": 1}), "3"]
+
+    def test_no_flush_on_error(self):
+        kv = _fake_kv({"aapl": "1"})
+        with pytest.raises(ValueError):
+            with kv.pipeline() as pipe:
+                pipe.set("aapl", "2")
+                raise ValueError("boom")
+        assert kv.get("aapl") == "1"
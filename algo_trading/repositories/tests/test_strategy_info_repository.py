@@ -0,0 +1,147 @@
+import json
+from datetime import datetime
+from threading import Barrier, Thread
+
+from algo_trading.config.controllers import (
+    KeyValueController,
+    StockStatusController,
+    StrategyInfo,
+)
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.repositories.key_val_repository import KeyValueRepository
+from algo_trading.repositories.strategy_info_repository import StrategyInfoRepository
+from algo_trading.strategies.sma_cross_strat import SMACross
+
+"""
+Functions tested in this module:
+- StrategyInfoRepository.get() / get_many()
+- StrategyInfoRepository.update()
+- StrategyInfoRepository.compare_and_set()
+- StrategyInfoRepository.migrate_from_json()
+- KeyValuePipeline hash reads and writes
+"""
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="test_strategy_info_repository",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+TICKER = "aapl"
+
+
+def _fake_kv(data=None):
+    return KeyValueRepository(
+        {} if data is None else data, KeyValueController.fake, LOG_INFO
+    ).handler
+
+
+class TestStrategyInfoRepository:
+    def test_missing_ticker(self):
+        repo = StrategyInfoRepository(_fake_kv())
+        assert repo.get(TICKER) is None
+        assert repo.get_many([TICKER, "msft"]) == {TICKER: None, "msft": None}
+
+    def test_update_writes_changed_fields(self):
+        kv = _fake_kv()
+        repo = StrategyInfoRepository(kv)
+
+        sma = StrategyInfo(sma_last_cross_up="2022-01-03")
+        assert repo.update(TICKER, None, sma) == {"sma_last_cross_up": "2022-01-03"}
+
+        # MACD works from a read taken before the SMA write, and
+        # still leaves the SMA field alone.
+        macd = StrategyInfo(macd_last_status=StockStatusController.buy)
+        assert repo.update(TICKER, None, macd) == {"macd_last_status": "BUY"}
+
+        assert repo.get(TICKER) == StrategyInfo(
+            sma_last_cross_up="2022-01-03",
+            macd_last_status=StockStatusController.buy,
+        )
+        assert kv.hgetall(repo.key(TICKER)) == {
+            "sma_last_cross_up": "2022-01-03",
+            "macd_last_status": "BUY",
+        }
+
+    def test_compare_and_set(self):
+        repo = StrategyInfoRepository(_fake_kv())
+        sell, buy = StockStatusController.sell, StockStatusController.buy
+
+        # A missing field compares as its default, which is SELL.
+        assert repo.compare_and_set(TICKER, "sma_last_status", sell, buy)
+        assert not repo.compare_and_set(TICKER, "sma_last_status", sell, buy)
+        assert repo.get(TICKER).sma_last_status == buy
+
+    def test_compare_and_set_race(self):
+        """
+        Of several runs moving the same status at once, one wins.
+        """
+        repo = StrategyInfoRepository(_fake_kv())
+        barrier = Barrier(8)
+        results = []
+
+        def transition():
+            barrier.wait()
+            results.append(
+                repo.compare_and_set(
+                    TICKER,
+                    "sma_last_status",
+                    StockStatusController.sell,
+                    StockStatusController.buy,
+                )
+            )
+
+        threads = [Thread(target=transition) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(results) == [False] * 7 + [True]
+
+    def test_strategy_loses_transition(self):
+        """
+        A run that reads SELL but finds the status already moved
+        to BUY holds instead of emitting a second buy.
+        """
+        kv = _fake_kv()
+        repo = StrategyInfoRepository(kv)
+        repo.update(TICKER, None, StrategyInfo(sma_last_cross_up="2022-01-04"))
+
+        first = SMACross(TICKER, kv, datetime(2022, 1, 5))
+        second = SMACross(TICKER, kv, datetime(2022, 1, 5))
+        # Both read the SELL status before either writes.
+        assert first.cross_info == second.cross_info
+
+        assert first.run().signal == StockStatusController.buy
+        assert second.run().signal == StockStatusController.hold
+        assert repo.get(TICKER).sma_last_status == StockStatusController.buy
+
+    def test_migrate_from_json(self):
+        info = StrategyInfo(sma_last_status=StockStatusController.buy)
+        kv = _fake_kv({TICKER: json.dumps(info.dict())})
+        repo = StrategyInfoRepository(kv)
+
+        assert repo.migrate_from_json([TICKER, "msft"]) == [TICKER]
+        assert repo.get(TICKER) == info
+        assert repo.migrate_from_json([TICKER]) == []
+
+
+class TestPipelineHashes:
+    def test_buffers_hset(self):
+        kv = _fake_kv()
+        kv.hset("h", {"a": "1"})
+
+        with kv.pipeline() as pipe:
+            pipe.hset("h", {"b": "2"})
+            assert pipe.hgetall("h") == {"a": "1", "b": "2"}
+            assert kv.hgetall("h") == {"a": "1"}
+        assert kv.hgetall("h") == {"a": "1", "b": "2"}
+
+    def test_compare_and_set_sees_buffered_writes(self):
+        kv = _fake_kv()
+        with kv.pipeline() as pipe:
+            pipe.hset("h", {"status": "BUY"})
+            assert not pipe.hcompare_and_set("h", {"status": "SELL"}, {"status": "BUY"})
+            assert pipe.hcompare_and_set("h", {"status": "BUY"}, {"status": "SELL"})
+            assert pipe.hgetall("h") == {"status": "SELL"}
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Dict
-import json
+from typing import Dict, Tuple
+import numpy as np
 import pandas as pd
 
 from algo_trading.strategies.abstract_strategy import AbstractStrategy
@@ -12,10 +12,77 @@ from algo_trading.config.controllers import (
 )
 from algo_trading.repositories.db_repository import AbstractDBRepository
 from algo_trading.repositories.key_val_repository import AbstractKeyValueRepository
+from algo_trading.repositories.strategy_info_repository import StrategyInfoRepository
 from algo_trading.utils.utils import dt_to_str, str_to_dt
 
 
 class MACDCrossUtils:
+    @staticmethod
+    def cross_masks(
+        macd_line: np.ndarray, signal_line: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The array version of check_cross_up() and check_cross_down(),
+        for every day in one pass. A cross up is the MACD line going
+        above the signal line, a cross down is it going below. The
+        first day never crosses and NaNs compare as False.
+
+        Args:
+            macd_line (np.ndarray): MACD line in ASCENDING order by date.
+            signal_line (np.ndarray): Signal line in ASCENDING order by date.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Cross up and cross down masks.
+        """
+        diff = macd_line - signal_line
+        cross_up = np.zeros(diff.shape, dtype=bool)
+        cross_down = np.zeros(diff.shape, dtype=bool)
+        cross_up[1:] = (diff[1:] > 0) & (diff[:-1] <= 0)
+        cross_down[1:] = (diff[1:] < 0) & (diff[:-1] >= 0)
+        return cross_up, cross_down
+
+    @staticmethod
+    def backfill_cross_info(
+        data: pd.DataFrame,
+        cross_info: StrategyInfo,
+    ) -> StrategyInfo:
+        """
+        Finds the last cross up, last cross down and status over the
+        whole history in one NumPy pass.
+
+        Args:
+            data (pd.DataFrame): dataframe with the MACD and signal lines calculated.
+            cross_info (StrategyInfo): current cross info. Only the MACD fields are replaced.
+
+        Returns:
+            StrategyInfo: Returns the backfilled cross info.
+        """
+        cross_info = cross_info.copy()
+        default = StrategyInfo()
+        cross_up, cross_down = MACDCrossUtils.cross_masks(
+            data[ColumnController.macd_line.value].to_numpy(),
+            data[ColumnController.signal_line.value].to_numpy(),
+        )
+
+        dates = data[ColumnController.date.value]
+        cross_info.macd_last_cross_up = (
+            dt_to_str(dates.iloc[np.flatnonzero(cross_up)[-1]])
+            if cross_up.any()
+            else default.macd_last_cross_up
+        )
+        cross_info.macd_last_cross_down = (
+            dt_to_str(dates.iloc[np.flatnonzero(cross_down)[-1]])
+            if cross_down.any()
+            else default.macd_last_cross_down
+        )
+        if str_to_dt(cross_info.macd_last_cross_down) < str_to_dt(
+            cross_info.macd_last_cross_up
+        ):
+            cross_info.macd_last_status = StockStatusController.buy
+        else:
+            cross_info.macd_last_status = StockStatusController.sell
+        return cross_info
+
     @staticmethod
     def check_cross_up(
         data: pd.DataFrame,
@@ -100,19 +167,27 @@ class MACDCross(AbstractStrategy):
         try:
             return self._cross_info
         except AttributeError:
-            self._cross_info = StrategyInfo(**json.loads(self.macd_db.get(self.ticker)))
+            info = StrategyInfoRepository(self.macd_db).get(self.ticker)
+            self._cross_info = info or StrategyInfo()
             return self._cross_info
 
-    def _update_last_status(self, signal: StockStatusController) -> None:
-        """Updates the last_status value to the given signal for the
-        Key Value store.
+    def _update_last_status(self, signal: StockStatusController) -> bool:
+        """Moves macd_last_status to the given signal in the Key Value
+        store, only if no one else has moved it since it was read.
 
         Args:
             signal (StockStatusController): Enumeration signal.
+
+        Returns:
+            bool: True if the status was moved.
         """
         current = self.cross_info
-        current.macd_last_status = signal
-        self.macd_db.set(self.ticker, current.dict())
+        swapped = StrategyInfoRepository(self.macd_db).compare_and_set(
+            self.ticker, "macd_last_status", current.macd_last_status, signal
+        )
+        if swapped:
+            current.macd_last_status = signal
+        return swapped
 
     def run(self) -> TradeEvent:
         """Runs the MACDCross strategy logic based on the last cross up/down
@@ -130,11 +205,15 @@ class MACDCross(AbstractStrategy):
                 signal = StockStatusController.hold
             elif last_status == StockStatusController.sell:
                 signal = StockStatusController.buy
-                self._update_last_status(signal)
+                if not self._update_last_status(signal):
+                    # Another run already bought.
+                    signal = StockStatusController.hold
         else:
             if last_status == StockStatusController.buy:
                 signal = StockStatusController.sell
-                self._update_last_status(signal)
+                if not self._update_last_status(signal):
+                    # Another run already sold.
+                    signal = StockStatusController.wait
             elif last_status == StockStatusController.sell:
                 signal = StockStatusController.wait
 
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Dict
-import json
+from typing import Dict, Tuple
+import numpy as np
 import pandas as pd
 
 from algo_trading.strategies.abstract_strategy import AbstractStrategy
@@ -12,10 +12,110 @@ from algo_trading.config.controllers import (
 )
 from algo_trading.repositories.db_repository import AbstractDBRepository
 from algo_trading.repositories.key_val_repository import AbstractKeyValueRepository
-from algo_trading.utils.utils import dt_to_str, str_to_dt
+from algo_trading.repositories.strategy_info_repository import StrategyInfoRepository
+from algo_trading.utils.utils import dt_to_str, str_to_dt, last_true_idx
 
 
 class SMACrossUtils:
+    @staticmethod
+    def cross_masks(
+        close: np.ndarray,
+        ma_fast: np.ndarray,
+        ma_slow: np.ndarray,
+        ma_filter: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The array version of check_cross_up() and the raw crossing
+        part of check_cross_down(), for every day in one pass. A cross
+        up is fast >= slow today, fast < slow yesterday and close >
+        filter MA. A raw cross down is fast < slow today and fast >= slow
+        yesterday. The first day never crosses, and NaN moving averages
+        compare as False just like the row by row checks.
+
+        Arrays can either be 1D (one ticker) or 2D (days x tickers).
+
+        **NOTE**
+        We expect the arrays to be in ASCENDING order by date.
+
+        Args:
+            close (np.ndarray): Close prices.
+            ma_fast (np.ndarray): Fast moving average (ma_7).
+            ma_slow (np.ndarray): Slow moving average (ma_21).
+            ma_filter (np.ndarray): Bull market filter (ma_50).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Cross up and raw cross down masks.
+        """
+        above = ma_fast >= ma_slow
+        below = ma_fast < ma_slow
+
+        cross_up = np.zeros(close.shape, dtype=bool)
+        cross_down = np.zeros(close.shape, dtype=bool)
+        cross_up[1:] = above[1:] & below[:-1] & (close[1:] > ma_filter[1:])
+        cross_down[1:] = below[1:] & above[:-1]
+        return cross_up, cross_down
+
+    @staticmethod
+    def backfill_cross_info(
+        data: pd.DataFrame,
+        cross_info: StrategyInfo,
+    ) -> StrategyInfo:
+        """
+        Finds the last cross up, last cross down and status over the
+        whole history in one NumPy pass. Gives the same SMA fields as
+        running check_cross_up() and check_cross_down() on every day
+        in ASCENDING order from a fresh StrategyInfo, so a cross down
+        that follows a cross up filtered out by the 50 day SMA is
+        ignored.
+
+        **NOTE**
+        We expect the dataframe to be in ASCENDING order by date, with
+        the SMA columns calculated.
+
+        Args:
+            data (pd.DataFrame): Data to parse SMA info.
+            cross_info (StrategyInfo): Cross info to update. Only the
+                                       SMA fields are replaced.
+
+        Returns:
+            StrategyInfo: Updated SMACross info object.
+        """
+        cross_info = cross_info.copy()
+        default = StrategyInfo()
+        cross_up, cross_down = SMACrossUtils.cross_masks(
+            data[ColumnController.close.value].to_numpy(),
+            data[ColumnController.ma_7.value].to_numpy(),
+            data[ColumnController.ma_21.value].to_numpy(),
+            data[ColumnController.ma_50.value].to_numpy(),
+        )
+
+        # A raw cross down only counts if a cross up came after the
+        # last counted cross down, i.e. if the latest event before
+        # today was a cross up.
+        events = np.where(cross_up, 1, np.where(cross_down, -1, 0))
+        events[0] = -1
+        last_event = events[last_true_idx(events != 0)]
+        cross_down[1:] &= last_event[:-1] > 0
+
+        dates = data[ColumnController.date.value]
+        cross_info.sma_last_cross_up = (
+            dt_to_str(dates.iloc[np.flatnonzero(cross_up)[-1]])
+            if cross_up.any()
+            else default.sma_last_cross_up
+        )
+        cross_info.sma_last_cross_down = (
+            dt_to_str(dates.iloc[np.flatnonzero(cross_down)[-1]])
+            if cross_down.any()
+            else default.sma_last_cross_down
+        )
+        if str_to_dt(cross_info.sma_last_cross_down) < str_to_dt(
+            cross_info.sma_last_cross_up
+        ):
+            cross_info.sma_last_status = StockStatusController.buy
+        else:
+            cross_info.sma_last_status = StockStatusController.sell
+        return cross_info
+
     @staticmethod
     def check_cross_up(
         data: pd.DataFrame,
@@ -126,21 +226,27 @@ class SMACross(AbstractStrategy):
         try:
             return self._cross_info
         except AttributeError:
-            self._cross_info = StrategyInfo(
-                **json.loads(self.cross_db.get(self.ticker))
-            )
+            info = StrategyInfoRepository(self.cross_db).get(self.ticker)
+            self._cross_info = info or StrategyInfo()
             return self._cross_info
 
-    def _update_last_status(self, signal: StockStatusController) -> None:
-        """Updates the ast_status value to the given signal for the
-        Key Value store.
+    def _update_last_status(self, signal: StockStatusController) -> bool:
+        """Moves sma_last_status to the given signal in the Key Value
+        store, only if no one else has moved it since it was read.
 
         Args:
             signal (StockStatusController): Enumeration signal.
+
+        Returns:
+            bool: True if the status was moved.
         """
         current = self.cross_info
-        current.sma_last_status = signal
-        self.cross_db.set(self.ticker, current.dict())
+        swapped = StrategyInfoRepository(self.cross_db).compare_and_set(
+            self.ticker, "sma_last_status", current.sma_last_status, signal
+        )
+        if swapped:
+            current.sma_last_status = signal
+        return swapped
 
     def run(self) -> TradeEvent:
         """Runs the SMACross strategy logic based on the last cross up/down
@@ -158,11 +264,15 @@ class SMACross(AbstractStrategy):
                 signal = StockStatusController.hold
             elif last_status == StockStatusController.sell:
                 signal = StockStatusController.buy
-                self._update_last_status(signal)
+                if not self._update_last_status(signal):
+                    # Another run already bought.
+                    signal = StockStatusController.hold
         else:
             if last_status == StockStatusController.buy:
                 signal = StockStatusController.sell
-                self._update_last_status(signal)
+                if not self._update_last_status(signal):
+                    # Another run already sold.
+                    signal = StockStatusController.wait
             elif last_status == StockStatusController.sell:
                 signal = StockStatusController.wait
 
@@ -0,0 +1,33 @@
+import pandas as pd
+
+from algo_trading.config.controllers import ColumnController, StrategyInfo
+from algo_trading.strategies.macd_cross_strat import MACDCrossUtils
+from algo_trading.utils.calculations import Calculator
+
+
+"""
+Functions tested in this module:
+- MACDCrossUtils.backfill_cross_info()
+"""
+
+DATA = pd.read_csv("./sample_data/backtest_sample_data.csv")
+DATA[ColumnController.date.value] = pd.to_datetime(DATA[ColumnController.date.value])
+DATA = Calculator.calculate_ema(
+    DATA, ColumnController.close.value, ColumnController.ema_calculations()
+)
+DATA = Calculator.calculate_macd_signal(
+    DATA, ColumnController.ema_12.value, ColumnController.ema_26.value
+)
+
+
+def test_backfill_matches_row_by_row():
+    expected = StrategyInfo()
+    for i in range(1, len(DATA)):
+        expected = MACDCrossUtils.check_cross_up(DATA, i, expected)
+        expected = MACDCrossUtils.check_cross_down(DATA, i, expected)
+
+    cross_info = MACDCrossUtils.backfill_cross_info(DATA, StrategyInfo())
+
+    assert cross_info.macd_last_cross_up == expected.macd_last_cross_up
+    assert cross_info.macd_last_cross_down == expected.macd_last_cross_down
+    assert cross_info.macd_last_cross_up != StrategyInfo().macd_last_cross_up
@@ -1,4 +1,3 @@
-import json
 from datetime import datetime
 import pandas as pd
 
@@ -10,13 +9,16 @@ from algo_trading.config.controllers import (
 )
 from algo_trading.config.events import TradeEvent
 from algo_trading.repositories.key_val_repository import KeyValueRepository
+from algo_trading.repositories.strategy_info_repository import StrategyInfoRepository
 from algo_trading.strategies.sma_cross_strat import SMACrossUtils, SMACross
+from algo_trading.utils.calculations import Calculator
 
 
 """
 Functions tested in this module:
 - SMACrossUtils.check_cross_up()
 - SMACrossUtils.check_cross_down()
+- SMACrossUtils.backfill_cross_info()
 - SMACross.run()
 """
 
@@ -121,6 +123,50 @@ class TestCheckCrossDown:
         assert cross_info.sma_last_cross_down == "1900-01-02"
 
 
+class TestBackfillCrossInfo:
+    """
+    Tests the whole series backfill against stepping the
+    row by row checks through every day.
+    """
+
+    data = Calculator.calculate_sma(
+        pd.read_csv("./sample_data/backtest_sample_data.csv"),
+        ColumnController.close.value,
+    )
+    data[ColumnController.date.value] = pd.to_datetime(
+        data[ColumnController.date.value]
+    )
+
+    def _step_through(self, data: pd.DataFrame) -> StrategyInfo:
+        cross_info = StrategyInfo()
+        for i in range(1, len(data)):
+            cross_info = SMACrossUtils.check_cross_up(data, i, cross_info)
+            cross_info = SMACrossUtils.check_cross_down(data, i, cross_info)
+        return cross_info
+
+    def test_matches_row_by_row(self):
+        """
+        Checked at several cut off dates so both a more recent
+        cross up and a more recent cross down are covered.
+        """
+        statuses = set()
+        for end in [300, 500, 750, 1000, 1250, len(self.data)]:
+            data = self.data.iloc[:end]
+            expected = self._step_through(data)
+            cross_info = SMACrossUtils.backfill_cross_info(data, StrategyInfo())
+
+            assert cross_info.sma_last_cross_up == expected.sma_last_cross_up
+            assert cross_info.sma_last_cross_down == expected.sma_last_cross_down
+            statuses.add(cross_info.sma_last_status)
+        assert statuses == {StockStatusController.buy, StockStatusController.sell}
+
+    def test_keeps_other_fields(self):
+        init_cross_info = StrategyInfo(macd_last_cross_up="2022-01-03")
+        cross_info = SMACrossUtils.backfill_cross_info(self.data, init_cross_info)
+        assert cross_info.macd_last_cross_up == "2022-01-03"
+        assert init_cross_info.sma_last_cross_up == "1900-01-01"
+
+
 class TestSMACross:
     """
     Tests updating signals according to StrategyInfo
@@ -153,7 +199,11 @@ class TestSMACross:
             sma_last_cross_down="1900-01-02",
             sma_last_status=StockStatusController.buy,
         )
-        init_kv = {self.TICKER: json.dumps(init_cross_info.dict())}
+        init_kv = {
+            StrategyInfoRepository.key(self.TICKER): StrategyInfoRepository.to_hash(
+                init_cross_info
+            )
+        }
         fake_kv_repo = KeyValueRepository(
             kv_info=init_kv,
             kv_handler=KeyValueController.fake,
@@ -169,9 +219,7 @@ class TestSMACross:
             signal=StockStatusController.sell,
         )
 
-        assert StrategyInfo(
-            **json.loads(fake_kv_repo.get(self.TICKER))
-        ) == StrategyInfo(
+        assert StrategyInfoRepository(fake_kv_repo).get(self.TICKER) == StrategyInfo(
             sma_last_cross_up="1900-01-01",
             sma_last_cross_down="1900-01-02",
             sma_last_status=StockStatusController.sell,
@@ -189,7 +237,11 @@ class TestSMACross:
             sma_last_cross_down="1899-12-31",
             sma_last_status=StockStatusController.sell,
         )
-        init_kv = {self.TICKER: json.dumps(init_cross_info.dict())}
+        init_kv = {
+            StrategyInfoRepository.key(self.TICKER): StrategyInfoRepository.to_hash(
+                init_cross_info
+            )
+        }
         fake_kv_repo = KeyValueRepository(
             kv_info=init_kv,
             kv_handler=KeyValueController.fake,
@@ -205,9 +257,7 @@ class TestSMACross:
             signal=StockStatusController.buy,
         )
 
-        assert StrategyInfo(
-            **json.loads(fake_kv_repo.get(self.TICKER))
-        ) == StrategyInfo(
+        assert StrategyInfoRepository(fake_kv_repo).get(self.TICKER) == StrategyInfo(
             sma_last_cross_up="1900-01-01",
             sma_last_cross_down="1899-12-31",
             sma_last_status=StockStatusController.buy,
@@ -225,7 +275,11 @@ class TestSMACross:
             sma_last_cross_down="1900-01-02",
             sma_last_status=StockStatusController.sell,
         )
-        init_kv = {self.TICKER: json.dumps(init_cross_info.dict())}
+        init_kv = {
+            StrategyInfoRepository.key(self.TICKER): StrategyInfoRepository.to_hash(
+                init_cross_info
+            )
+        }
         fake_kv_repo = KeyValueRepository(
             kv_info=init_kv,
             kv_handler=KeyValueController.fake,
@@ -241,9 +295,7 @@ class TestSMACross:
             signal=StockStatusController.wait,
         )
 
-        assert (
-            StrategyInfo(**json.loads(fake_kv_repo.get(self.TICKER))) == init_cross_info
-        )
+        assert StrategyInfoRepository(fake_kv_repo).get(self.TICKER) == init_cross_info
 
     def test_hold_signal(self):
         """
@@ -258,7 +310,11 @@ class TestSMACross:
             sma_last_cross_down="1899-12-31",
             sma_last_status=StockStatusController.buy,
         )
-        init_kv = {self.TICKER: json.dumps(init_cross_info.dict())}
+        init_kv = {
+            StrategyInfoRepository.key(self.TICKER): StrategyInfoRepository.to_hash(
+                init_cross_info
+            )
+        }
         fake_kv_repo = KeyValueRepository(
             kv_info=init_kv,
             kv_handler=KeyValueController.fake,
@@ -274,6 +330,4 @@ class TestSMACross:
             signal=StockStatusController.hold,
         )
 
-        assert (
-            StrategyInfo(**json.loads(fake_kv_repo.get(self.TICKER))) == init_cross_info
-        )
+        assert StrategyInfoRepository(fake_kv_repo).get(self.TICKER) == init_cross_info
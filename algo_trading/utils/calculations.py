@@ -1,6 +1,9 @@
+import math
 import pandas as pd
-from typing import Dict
-from algo_trading.config.controllers import ColumnController
+from datetime import datetime
+from typing import Dict, List, Optional
+from algo_trading.config.controllers import ColumnController, IndicatorState
+from algo_trading.utils.utils import dt_to_str
 
 
 class Calculator:
@@ -62,3 +65,176 @@ class Calculator:
         )
 
         return df
+
+    @staticmethod
+    def calculate_all(df: pd.DataFrame, rolling_col: str) -> pd.DataFrame:
+        """Calculates every indicator the strategies use, so one
+        frame can be shared between all of them.
+
+        Args:
+            df (pd.DataFrame): Price data in ASCENDING order by date.
+            rolling_col (str): Column the indicators are calculated on.
+
+        Returns:
+            pd.DataFrame: df with the columns from indicator_columns().
+        """
+        df = Calculator.calculate_sma(df, rolling_col)
+        df = Calculator.calculate_ema(
+            df, rolling_col, ColumnController.ema_calculations()
+        )
+        return Calculator.calculate_macd_signal(
+            df, ColumnController.ema_12.value, ColumnController.ema_26.value
+        )
+
+    @staticmethod
+    def indicator_columns() -> List[str]:
+        return (
+            [ColumnController.date.value, ColumnController.close.value]
+            + list(ColumnController.sma_calculations().keys())
+            + list(ColumnController.ema_calculations().keys())
+            + [ColumnController.macd_line.value]
+            + list(ColumnController.macd_calculations().keys())
+        )
+
+    @staticmethod
+    def _nan_to_none(value: float) -> Optional[float]:
+        return None if value is None or math.isnan(value) else float(value)
+
+    @staticmethod
+    def init_indicator_state(df: pd.DataFrame, rolling_col: str) -> IndicatorState:
+        """Builds the indicator state from the full price history of a
+        ticker, so that it can be advanced one bar at a time with
+        advance_indicator_state().
+
+        Args:
+            df (pd.DataFrame): Price data in ASCENDING order by date.
+            rolling_col (str): Column the indicators are calculated on.
+
+        Returns:
+            IndicatorState: State as of the last row of the DF.
+        """
+        data = Calculator.calculate_all(df.copy(), rolling_col)
+
+        values = data[rolling_col].astype(float)
+        sma_windows = ColumnController.sma_calculations()
+
+        # Without min_periods the EWM is the raw adjust=False recurrence,
+        # which keeps going while the calculated columns are still NaN.
+        emas, ema_obs = dict(), dict()
+        for col, span in ColumnController.ema_calculations().items():
+            emas[col] = float(values.ewm(span=span, adjust=False).mean().iloc[-1])
+            ema_obs[col] = int(values.count())
+        macd_line = data[ColumnController.macd_line.value]
+        for col, span in ColumnController.macd_calculations().items():
+            signal = macd_line.ewm(span=span, adjust=False).mean().iloc[-1]
+            emas[col] = 0.0 if math.isnan(signal) else float(signal)
+            ema_obs[col] = int(macd_line.count())
+
+        rows = data[Calculator.indicator_columns()].iloc[-2:].to_dict("records")
+        for row in rows:
+            row[ColumnController.date.value] = dt_to_str(
+                pd.to_datetime(row[ColumnController.date.value])
+            )
+            for col, val in row.items():
+                if col != ColumnController.date.value:
+                    row[col] = Calculator._nan_to_none(val)
+
+        return IndicatorState(
+            date=rows[-1][ColumnController.date.value],
+            closes=values.iloc[-max(sma_windows.values()) :].tolist(),
+            sma_sums={
+                col: float(values.iloc[-window:].sum())
+                for col, window in sma_windows.items()
+            },
+            emas=emas,
+            ema_obs=ema_obs,
+            rows=rows,
+        )
+
+    @staticmethod
+    def indicator_frame(state: IndicatorState) -> pd.DataFrame:
+        """Turns the last two rows of indicators in the state into a
+        DF shaped like the calculated price data, for the strategy
+        cross checks.
+
+        Args:
+            state (IndicatorState): Indicator state.
+
+        Returns:
+            pd.DataFrame: Indicators in ASCENDING order by date.
+        """
+        df = pd.DataFrame(state.rows, columns=Calculator.indicator_columns())
+        df = df.astype({col: float for col in Calculator.indicator_columns()[1:]})
+        df[ColumnController.date.value] = pd.to_datetime(
+            df[ColumnController.date.value]
+        )
+        return df
+
+    @staticmethod
+    def _advance_ema(
+        state: IndicatorState, col: str, span: int, value: float
+    ) -> Optional[float]:
+        # pandas ewm(span, adjust=False): y_0 = x_0, y_t = (1 - a) y_t-1 + a x_t,
+        # reported once min_periods=span values have been seen.
+        alpha = 2 / (span + 1)
+        if state.ema_obs[col] == 0:
+            state.emas[col] = value
+        else:
+            state.emas[col] = (1 - alpha) * state.emas[col] + alpha * value
+        state.ema_obs[col] += 1
+        return state.emas[col] if state.ema_obs[col] >= span else None
+
+    @staticmethod
+    def advance_indicator_state(
+        state: IndicatorState, date: datetime, value: float
+    ) -> IndicatorState:
+        """Folds one new bar into the indicator state in O(1). The
+        latest row of indicators matches what calculate_sma(),
+        calculate_ema() and calculate_macd_signal() give on the
+        full history.
+
+        Args:
+            state (IndicatorState): State as of the previous bar.
+            date (datetime): Date of the new bar.
+            value (float): Close (rolling_col) of the new bar.
+
+        Returns:
+            IndicatorState: State as of the new bar.
+        """
+        state = state.copy(deep=True)
+        value = float(value)
+        row = {
+            ColumnController.date.value: dt_to_str(date),
+            ColumnController.close.value: value,
+        }
+
+        sma_windows = ColumnController.sma_calculations()
+        state.closes.append(value)
+        for col, window in sma_windows.items():
+            state.sma_sums[col] += value
+            if len(state.closes) > window:
+                state.sma_sums[col] -= state.closes[-window - 1]
+            row[col] = (
+                state.sma_sums[col] / window if len(state.closes) >= window else None
+            )
+        state.closes = state.closes[-max(sma_windows.values()) :]
+
+        for col, span in ColumnController.ema_calculations().items():
+            row[col] = Calculator._advance_ema(state, col, span, value)
+
+        ema_fast = row[ColumnController.ema_12.value]
+        ema_slow = row[ColumnController.ema_26.value]
+        macd_line = None
+        if ema_fast is not None and ema_slow is not None:
+            macd_line = ema_fast - ema_slow
+        row[ColumnController.macd_line.value] = macd_line
+        for col, span in ColumnController.macd_calculations().items():
+            row[col] = (
+                Calculator._advance_ema(state, col, span, macd_line)
+                if macd_line is not None
+                else None
+            )
+
+        state.date = row[ColumnController.date.value]
+        state.rows = (state.rows + [row])[-2:]
+        return state
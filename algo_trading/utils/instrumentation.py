@@ -0,0 +1,286 @@
+import json
+import os
+from bisect import bisect_left
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from algo_trading.logger.controllers import LogConfig
+
+
+class Instrumentation:
+
+    # Upper bounds of the latency histogram buckets, in milliseconds.
+    # Anything slower lands in the last, unbounded bucket.
+    bucket_bounds_ms = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self) -> None:
+        """Collects call latencies, row counts and bytes per named
+        call. Disabled by default: while disabled, instrument() returns
+        handlers unwrapped and timed() functions skip straight to the
+        wrapped function, so the cost is one attribute check per call.
+        """
+        self.enabled = False
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = Lock()
+
+    def enable(self, enabled: bool = True) -> None:
+        """Turns recording on or off. Handlers built while disabled
+        stay uninstrumented, so enable before creating them.
+
+        Args:
+            enabled (bool, optional): Defaults to True.
+        """
+        self.enabled = enabled
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats = {}
+
+    def _bucket_labels(self) -> Sequence[str]:
+        return [f"<={bound}ms" for bound in self.bucket_bounds_ms] + [
+            f">{self.bucket_bounds_ms[-1]}ms"
+        ]
+
+    def record(
+        self,
+        name: str,
+        seconds: float,
+        rows: Optional[int] = None,
+        nbytes: Optional[int] = None,
+        error: bool = False,
+    ) -> None:
+        """Adds one call to the stats of name.
+
+        Args:
+            name (str): Call name, e.g. "data_pull_dag.PostgresRepository.get_all".
+            seconds (float): Latency of the call.
+            rows (Optional[int], optional): Rows returned. Defaults to None.
+            nbytes (Optional[int], optional): Bytes returned. Defaults to None.
+            error (bool, optional): Whether the call raised. Defaults to False.
+        """
+        bucket = bisect_left(self.bucket_bounds_ms, seconds * 1000)
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = {
+                    "calls": 0,
+                    "errors": 0,
+                    "total_seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "rows": 0,
+                    "bytes": 0,
+                    "histogram": [0] * (len(self.bucket_bounds_ms) + 1),
+                }
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            stats["rows"] += rows or 0
+            stats["bytes"] += nbytes or 0
+            stats["histogram"][bucket] += 1
+
+    def report(self, prefix: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Summarizes the stats, slowest total first.
+
+        Args:
+            prefix (Optional[str], optional): Only calls whose name starts
+                with "{prefix}.", e.g. one DAG's log name. Defaults to None.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Stats keyed by call name, with the
+                                       mean latency and labelled histogram.
+        """
+        labels = self._bucket_labels()
+        with self._lock:
+            items = [
+                (name, dict(stats))
+                for name, stats in self.stats.items()
+                if prefix is None or name.startswith(f"{prefix}.")
+            ]
+        items.sort(key=lambda item: item[1]["total_seconds"], reverse=True)
+        return {
+            name: {
+                **stats,
+                "mean_seconds": stats["total_seconds"] / stats["calls"],
+                "histogram": {
+                    label: count
+                    for label, count in zip(labels, stats["histogram"])
+                    if count
+                },
+            }
+            for name, stats in items
+        }
+
+    def write_report(self, path: str, prefix: Optional[str] = None) -> str:
+        """Writes report() to path as JSON.
+
+        Args:
+            path (str): File to write.
+            prefix (Optional[str], optional): See report(). Defaults to None.
+
+        Returns:
+            str: path
+        """
+        with open(path, "w") as f:
+            json.dump(self.report(prefix), f, indent=2)
+        return path
+
+
+def report_path(log_path: str) -> str:
+    """Path of the JSON run report that goes beside a log file or key.
+
+    Args:
+        log_path (str): Path or object key of the log.
+
+    Returns:
+        str: The same path with a _report.json suffix instead of the extension.
+    """
+    return f"{os.path.splitext(log_path)[0]}_report.json"
+
+
+# One collector per process, so every handler and DAG step lands in
+# the same report.
+INSTRUMENTATION = Instrumentation()
+
+
+def measure(value: Any) -> Tuple[Optional[int], Optional[int]]:
+    """Rows and bytes of a call's return value, where they mean
+    something.
+
+    Args:
+        value (Any): Return value.
+
+    Returns:
+        Tuple[Optional[int], Optional[int]]: Rows and bytes, None if unknown.
+    """
+    if isinstance(value, pd.DataFrame):
+        return len(value), int(value.memory_usage(index=False).sum())
+    if isinstance(value, (bytes, str)):
+        return None, len(value)
+    if isinstance(value, (list, dict, tuple, set)):
+        return len(value), None
+    return None, None
+
+
+class InstrumentedProxy:
+    def __init__(
+        self,
+        target: Any,
+        component: str,
+        instrumentation: Instrumentation,
+        rebind: Sequence[str] = (),
+    ) -> None:
+        """Stands in for a repository handler and records every
+        method call as "{component}.{method}". Other attributes are
+        passed through untouched.
+
+        Args:
+            target (Any): Handler to wrap.
+            component (str): Prefix of the recorded names.
+            instrumentation (Instrumentation): Collector to record into.
+            rebind (Sequence[str], optional): Methods that only compose other
+                calls, like a KV pipeline(). They are bound to the proxy
+                instead, so the calls they make are the ones recorded.
+                Defaults to ().
+        """
+        self._target = target
+        self._component = component
+        self._instrumentation = instrumentation
+        self._rebind = set(rebind)
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self._rebind:
+            return getattr(type(self._target), name).__get__(self)
+
+        attr = getattr(self._target, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        call_name = f"{self._component}.{name}"
+        instrumentation = self._instrumentation
+
+        @wraps(attr)
+        def call(*args, **kwargs):
+            start = perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except Exception:
+                instrumentation.record(call_name, perf_counter() - start, error=True)
+                raise
+            seconds = perf_counter() - start
+            instrumentation.record(call_name, seconds, *measure(result))
+            return result
+
+        return call
+
+
+def instrument(
+    handler: Any,
+    log_info: Optional[LogConfig] = None,
+    rebind: Sequence[str] = (),
+    instrumentation: Instrumentation = INSTRUMENTATION,
+) -> Any:
+    """Wraps a repository handler in an InstrumentedProxy when
+    instrumentation is enabled, and returns it as is otherwise.
+    Calls are recorded as "{log_name}.{handler class}.{method}".
+
+    Args:
+        handler (Any): Handler built by a repository wrapper.
+        log_info (Optional[LogConfig], optional): Log of the owner, whose
+            name prefixes the recorded calls. Defaults to None.
+        rebind (Sequence[str], optional): See InstrumentedProxy. Defaults to ().
+        instrumentation (Instrumentation, optional): Defaults to INSTRUMENTATION.
+
+    Returns:
+        Any: The handler or its proxy.
+    """
+    if not instrumentation.enabled:
+        return handler
+    component = type(handler).__name__
+    if log_info is not None:
+        component = f"{log_info.log_name}.{component}"
+    return InstrumentedProxy(handler, component, instrumentation, rebind)
+
+
+def timed(
+    fn: Optional[Callable] = None,
+    name: Optional[str] = None,
+    instrumentation: Instrumentation = INSTRUMENTATION,
+) -> Callable:
+    """Decorator recording the calls of a function, named
+    "{module}.{function}" by default. Used as @timed or
+    @timed(name=...).
+
+    Args:
+        fn (Optional[Callable], optional): Function to time.
+        name (Optional[str], optional): Recorded name. Defaults to None.
+        instrumentation (Instrumentation, optional): Defaults to INSTRUMENTATION.
+
+    Returns:
+        Callable: The wrapped function.
+    """
+
+    def decorate(fn: Callable) -> Callable:
+        call_name = name or f"{fn.__module__}.{fn.__name__}"
+
+        @wraps(fn)
+        def call(*args, **kwargs):
+            if not instrumentation.enabled:
+                return fn(*args, **kwargs)
+            start = perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                instrumentation.record(call_name, perf_counter() - start, error=True)
+                raise
+            seconds = perf_counter() - start
+            instrumentation.record(call_name, seconds, *measure(result))
+            return result
+
+        return call
+
+    return decorate(fn) if fn is not None else decorate
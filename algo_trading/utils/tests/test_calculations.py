@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from algo_trading.config.controllers import ColumnController
+from algo_trading.utils.calculations import Calculator
+
+"""
+Functions tested in this module:
+- Calculator.calculate_all()
+- Calculator.init_indicator_state()
+- Calculator.advance_indicator_state()
+"""
+
+DATA = pd.read_csv("./sample_data/backtest_sample_data.csv")
+DATA[ColumnController.date.value] = pd.to_datetime(DATA[ColumnController.date.value])
+
+
+def _full_calc(df: pd.DataFrame) -> pd.DataFrame:
+    return Calculator.calculate_all(df.copy(), ColumnController.close.value)
+
+
+def test_calculate_all():
+    data = _full_calc(DATA)
+    assert set(Calculator.indicator_columns()) <= set(data.columns)
+    pd.testing.assert_series_equal(
+        data[ColumnController.ma_7.value],
+        DATA[ColumnController.close.value].rolling(7).mean(),
+        check_names=False,
+    )
+    assert data[ColumnController.signal_line.value].notna().iloc[-1]
+
+
+def _assert_row_matches(row, expected):
+    for col in Calculator.indicator_columns()[1:]:
+        if pd.isna(expected[col]):
+            assert row[col] is None, col
+        else:
+            assert row[col] == pytest.approx(expected[col], rel=1e-9), col
+
+
+@pytest.mark.parametrize("init_rows", [5, 30, 250])
+def test_advance_matches_full_history(init_rows):
+    """
+    Advancing one bar at a time from any starting point gives the
+    same indicators as recalculating over the full history, including
+    the warm up rows where they are still NaN.
+    """
+    expected = _full_calc(DATA)
+    state = Calculator.init_indicator_state(
+        DATA.iloc[:init_rows], ColumnController.close.value
+    )
+    _assert_row_matches(state.rows[-1], expected.iloc[init_rows - 1])
+
+    for idx in range(init_rows, len(DATA)):
+        state = Calculator.advance_indicator_state(
+            state,
+            DATA[ColumnController.date.value].iloc[idx],
+            DATA[ColumnController.close.value].iloc[idx],
+        )
+        _assert_row_matches(state.rows[-1], expected.iloc[idx])
+
+    assert len(state.rows) == 2
+    assert state.date == "2010-12-31"
+    assert len(state.closes) == 200
+
+
+def test_indicator_frame():
+    """
+    The state's rows come back as a float DF the cross checks can
+    index, with NaN for indicators that are still warming up.
+    """
+    state = Calculator.init_indicator_state(
+        DATA.iloc[:30], ColumnController.close.value
+    )
+    data = Calculator.indicator_frame(state)
+
+    assert len(data) == 2
+    assert (
+        data[ColumnController.date.value].iloc[1]
+        == DATA[ColumnController.date.value].iloc[29]
+    )
+    assert data[ColumnController.ma_200.value].isna().all()
+    assert data[ColumnController.ma_21.value].notna().all()
@@ -0,0 +1,148 @@
+import json
+import pandas as pd
+import pytest
+
+from algo_trading.config.controllers import KeyValueController
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.repositories.key_val_repository import KeyValueRepository
+from algo_trading.utils.instrumentation import (
+    Instrumentation,
+    InstrumentedProxy,
+    instrument,
+    measure,
+    report_path,
+    timed,
+)
+
+"""
+Functions tested in this module:
+- Instrumentation.record()
+- Instrumentation.report()
+- Instrumentation.write_report()
+- measure()
+- instrument()
+- timed()
+- report_path()
+"""
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="test_instrumentation",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+
+class Repo:
+    def get_all(self, ticker: str) -> pd.DataFrame:
+        return pd.DataFrame({"close": [1.0, 2.0, 3.0]})
+
+    def fail(self) -> None:
+        raise ValueError("boom")
+
+
+class TestInstrumentation:
+    def test_record_and_report(self, tmp_path):
+        inst = Instrumentation()
+        inst.record("dag.Repo.get", 0.0005, rows=2, nbytes=10)
+        inst.record("dag.Repo.get", 0.03, rows=3)
+        inst.record("dag.Repo.set", 20.0, error=True)
+        inst.record("other.Repo.get", 0.001)
+
+        report = inst.report(prefix="dag")
+
+        assert list(report) == ["dag.Repo.set", "dag.Repo.get"]
+        get = report["dag.Repo.get"]
+        assert get["calls"] == 2
+        assert get["rows"] == 5
+        assert get["bytes"] == 10
+        assert get["max_seconds"] == 0.03
+        assert get["histogram"] == {"<=1ms": 1, "<=50ms": 1}
+        assert report["dag.Repo.set"]["errors"] == 1
+        assert report["dag.Repo.set"]["histogram"] == {">10000ms": 1}
+
+        path = inst.write_report(str(tmp_path / "report.json"))
+        assert set(json.load(open(path))) == {
+            "dag.Repo.get",
+            "dag.Repo.set",
+            "other.Repo.get",
+        }
+
+    def test_measure(self):
+        df = pd.DataFrame({"a": [1, 2]}, dtype="int64")
+        assert measure(df) == (2, 16)
+        assert measure(b"abc") == (None, 3)
+        assert measure([1, 2, 3]) == (3, None)
+        assert measure(None) == (None, None)
+
+    def test_report_path(self):
+        assert (
+            report_path("logs/dag_2022-01-01.log") == "logs/dag_2022-01-01_report.json"
+        )
+        assert report_path("dag/2022-01-01.log") == "dag/2022-01-01_report.json"
+
+
+class TestInstrument:
+    def test_disabled_returns_handler(self):
+        inst = Instrumentation()
+        repo = Repo()
+        assert instrument(repo, LOG_INFO, instrumentation=inst) is repo
+
+    def test_proxy_records_calls(self):
+        inst = Instrumentation()
+        inst.enable()
+        repo = instrument(Repo(), LOG_INFO, instrumentation=inst)
+
+        assert isinstance(repo, InstrumentedProxy)
+        assert len(repo.get_all("aapl")) == 3
+        with pytest.raises(ValueError):
+            repo.fail()
+
+        report = inst.report(prefix="test_instrumentation")
+        assert report["test_instrumentation.Repo.get_all"]["rows"] == 3
+        assert report["test_instrumentation.Repo.get_all"]["bytes"] == 24
+        assert report["test_instrumentation.Repo.fail"]["errors"] == 1
+
+    def test_kv_pipeline_calls_are_recorded(self):
+        inst = Instrumentation()
+        inst.enable()
+        kv = KeyValueRepository(
+            {"aapl": "1"}, KeyValueController.fake, LOG_INFO
+        ).handler
+        kv = instrument(kv, LOG_INFO, rebind=["pipeline"], instrumentation=inst)
+
+        with kv.pipeline() as pipe:
+            pipe.mget(["aapl", "msft"])
+            pipe.set("msft", "2")
+
+        assert kv.get("msft") == "2"
+        names = set(inst.report())
+        assert "test_instrumentation.FakeKeyValueRepository.mget" in names
+        assert "test_instrumentation.FakeKeyValueRepository.mset" in names
+
+
+class TestTimed:
+    def test_records_only_when_enabled(self):
+        inst = Instrumentation()
+
+        @timed(name="dag.step", instrumentation=inst)
+        def step(n):
+            return list(range(n))
+
+        assert step(3) == [0, 1, 2]
+        assert inst.report() == {}
+
+        inst.enable()
+        step(4)
+        assert inst.report()["dag.step"]["rows"] == 4
+
+    def test_default_name(self):
+        inst = Instrumentation()
+        inst.enable()
+
+        @timed(instrumentation=inst)
+        def step():
+            return None
+
+        step()
+        assert list(inst.report()) == [f"{__name__}.step"]
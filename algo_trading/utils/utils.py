@@ -1,5 +1,6 @@
-from typing import List
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime
+import numpy as np
 import pandas as pd
 from sqlalchemy.engine.base import Engine
 
@@ -48,7 +49,64 @@ def convert_date_col_to_datetime(df: pd.DataFrame, date_col: str) -> pd.DataFram
 
 
 def read_sql_to_df(query: str, con: Engine) -> pd.DataFrame:
-    df = pd.read_sql(query, con=con)
-    if ColumnController.date.value in df.columns:
-        df = convert_date_col_to_datetime(df, ColumnController.date.value)
-    return df
+    # Dates are parsed as the result is built, not in a second pass.
+    return pd.read_sql(query, con=con, parse_dates=[ColumnController.date.value])
+
+
+def iter_sql_to_df(
+    query: str,
+    con: Engine,
+    chunk_size: int,
+    dtypes: Optional[Dict[str, str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams a query's result as frames of at most chunk_size rows.
+    The query runs on a server side cursor where the dialect has
+    them (psycopg2 does), so only one chunk is held in memory at a
+    time. Dates are parsed and dtypes applied to each chunk as it is
+    fetched.
+
+    The connection stays open until the iterator is exhausted or
+    closed.
+
+    Args:
+        query (str): Query to run.
+        con (Engine): Engine to connect with.
+        chunk_size (int): Rows per frame.
+        dtypes (Optional[Dict[str, str]], optional): Dtypes by column, for
+            the columns the query returns. Defaults to None.
+
+    Yields:
+        pd.DataFrame: Chunks of the result, with a RangeIndex each.
+    """
+    with con.connect() as conn:
+        conn = conn.execution_options(stream_results=True, max_row_buffer=chunk_size)
+        for chunk in pd.read_sql(
+            query,
+            con=conn,
+            chunksize=chunk_size,
+            parse_dates=[ColumnController.date.value],
+        ):
+            if dtypes:
+                chunk = chunk.astype(
+                    {col: dtype for col, dtype in dtypes.items() if col in chunk}
+                )
+            yield chunk
+
+
+def last_true_idx(mask: np.ndarray) -> np.ndarray:
+    """
+    For every row, the index of the latest row (along axis 0) at or
+    before it where mask is True. Rows before the first True get 0.
+    Used to forward fill events over whole arrays.
+
+    Args:
+        mask (np.ndarray): 1D (days) or 2D (days x tickers) boolean array.
+
+    Returns:
+        np.ndarray: Integer array with the same shape as mask.
+    """
+    row_idx = np.arange(mask.shape[0]).reshape((-1,) + (1,) * (mask.ndim - 1))
+    last_idx = np.where(mask, row_idx, 0)
+    np.maximum.accumulate(last_idx, axis=0, out=last_idx)
+    return last_idx
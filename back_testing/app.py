@@ -1,21 +1,20 @@
 from typing import Dict
 from fastapi import FastAPI
 
-from algo_trading.logger.default_logger import get_main_logger
-from algo_trading.logger.controllers import LogLevelController
-
-from src.sma_cross_backtest import SMACrossBackTester
-from src.controllers import BackTestPayload, BackTestOptions
-from src.config import DB_INFO, DB_HANDLER
+from src.sma_cross_sweep import SMACrossSweeper
+from src.portfolio_backtest import SMACrossPortfolioBackTester
+from src.implementation import LOG, LOG_INFO, JOB_QUEUE, run_backtest
+from src.controllers import (
+    BackTestPayload,
+    BackTestResult,
+    BackTestOptions,
+    PortfolioBackTestPayload,
+    SweepPayload,
+)
+from src.config import DB_INFO, DB_HANDLER, PRICE_CACHE_INFO
 
 app = FastAPI()
 
-LOG, LOG_INFO = get_main_logger(
-    log_name="SMA_backtest",
-    file_name=None,
-    log_level=LogLevelController.info,
-)
-
 
 @app.post("/backtest")
 def backtest(payload: BackTestPayload) -> Dict:
@@ -30,23 +29,157 @@ def backtest(payload: BackTestPayload) -> Dict:
         Dict: Status
     """
 
+    try:
+        res = run_backtest(payload)
+        return {
+            "status": 200,
+            "body": {
+                "summary": BackTestResult(**res["summary"]),
+                # "trade_book": res["trade_book"],
+            },
+            "error": None,
+        }
+    except Exception as e:
+        return {
+            "status": 500,
+            "body": None,
+            "error": str(e),
+        }
+
+
+@app.post("/backtest/jobs")
+def submit_backtest_job(payload: BackTestPayload) -> Dict:
+    """
+    Queues a backtest and returns straight away. Poll
+    GET /backtest/jobs/{job_id} for its progress and result.
+
+    Args:
+        payload (BackTestPayload): Pydantic payload model.
+
+    Returns:
+        Dict: Status and the pending job.
+    """
+
+    try:
+        job = JOB_QUEUE.submit(payload)
+        return {
+            "status": 202,
+            "body": {"job_id": job.job_id, "status": job.status},
+            "error": None,
+        }
+    except Exception as e:
+        return {
+            "status": 500,
+            "body": None,
+            "error": str(e),
+        }
+
+
+@app.get("/backtest/jobs/{job_id}")
+def get_backtest_job(job_id: str) -> Dict:
+    """
+    Gets the status, progress and (once finished) result
+    of a queued backtest.
+
+    Args:
+        job_id (str): Job ID returned by POST /backtest/jobs.
+
+    Returns:
+        Dict: Status and the job.
+    """
+
+    try:
+        job = JOB_QUEUE.get(job_id)
+        if job is None:
+            return {
+                "status": 404,
+                "body": None,
+                "error": f"Job {job_id} does not exist.",
+            }
+        return {
+            "status": 200,
+            "body": job.dict(exclude={"payload"}),
+            "error": None,
+        }
+    except Exception as e:
+        return {
+            "status": 500,
+            "body": None,
+            "error": str(e),
+        }
+
+
+@app.post("/backtest/sweep")
+def backtest_sweep(payload: SweepPayload) -> Dict:
+    """
+    Runs the backtester for every combination of the given
+    windows and date ranges in a process pool.
+
+    Args:
+        payload (SweepPayload): Pydantic payload model.
+
+    Returns:
+        Dict: Status and ranked results.
+    """
+
+    sweepers = {
+        BackTestOptions.sma_cross: SMACrossSweeper(
+            payload=payload,
+            db_info=DB_INFO,
+            db_handler=DB_HANDLER,
+            log=LOG,
+            log_info=LOG_INFO,
+            price_cache_info=PRICE_CACHE_INFO,
+        ),
+    }
+
+    sweeper = sweepers[payload.strategy]
+    try:
+        return {
+            "status": 200,
+            "body": {"results": sweeper.run()},
+            "error": None,
+        }
+    except Exception as e:
+        return {
+            "status": 500,
+            "body": None,
+            "error": str(e),
+        }
+
+
+@app.post("/backtest/portfolio")
+def backtest_portfolio(payload: PortfolioBackTestPayload) -> Dict:
+    """
+    Runs the backtester for several tickers sharing one
+    pot of capital.
+
+    Args:
+        payload (PortfolioBackTestPayload): Pydantic payload model.
+
+    Returns:
+        Dict: Status, portfolio summary and equity curve.
+    """
+
     strategies = {
-        BackTestOptions.sma_cross: SMACrossBackTester(
+        BackTestOptions.sma_cross: SMACrossPortfolioBackTester(
             payload=payload,
             db_info=DB_INFO,
             db_handler=DB_HANDLER,
             log=LOG,
             log_info=LOG_INFO,
+            price_cache_info=PRICE_CACHE_INFO,
         ),
     }
 
     tester = strategies[payload.strategy]
     try:
-        summary, trade_book = tester.test()
+        summary, trade_book, equity = tester.test()
         return {
             "status": 200,
             "body": {
                 "summary": summary,
+                "equity": equity,
                 # "trade_book": trade_book,
             },
             "error": None,
@@ -0,0 +1,13 @@
+#!/bin/bash
+
+# If we specify a directory, then use that to look
+# for the worker.
+
+if [ -z "$1" ]
+  then
+    echo "Running backtest worker in current working dir."
+    python worker.py
+  else
+    echo "Running backtest worker in supplied dir {$1}"
+    cd $1 && python worker.py
+fi
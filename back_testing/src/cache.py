@@ -0,0 +1,178 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from hashlib import sha1
+from logging import Logger
+from threading import Lock
+from typing import Dict, Optional
+import json
+from pydantic import BaseModel, validate_arguments
+
+from algo_trading.config.controllers import KeyValueController
+from algo_trading.logger.controllers import LogConfig
+from algo_trading.logger.default_logger import get_child_logger
+from algo_trading.repositories.key_val_repository import (
+    AbstractKeyValueRepository,
+    KeyValueRepository,
+)
+
+from .controllers import BackTestCacheController
+
+
+def build_cache_key(payload: BaseModel, data_version: str) -> str:
+    """
+    Builds the cache key for a backtest. The data version is the
+    latest price date in the DB, so the key changes (and old results
+    stop being served) as soon as data_pull_dag appends new rows.
+
+    The engine is left out of the key since every engine gives
+    the same results.
+
+    Args:
+        payload (BaseModel): Backtest payload (ticker, strategy, parameters, dates).
+        data_version (str): Latest price date for the ticker.
+
+    Returns:
+        str: Cache key.
+    """
+    params = json.loads(payload.json(exclude={"engine"}))
+    params_hash = sha1(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"backtest:{params.get('strategy')}:{params.get('ticker')}:{data_version}:{params_hash}"
+
+
+class AbstractBackTestCache(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict]:
+        """Gets a cached backtest result.
+
+        Args:
+            key (str): Key built with build_cache_key().
+
+        Returns:
+            Optional[Dict]: Cached result, or None on a miss.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Dict) -> None:
+        """Caches a backtest result.
+
+        Args:
+            key (str): Key built with build_cache_key().
+            value (Dict): JSON serializable result.
+        """
+        pass
+
+
+class LRUBackTestCache(AbstractBackTestCache):
+    def __init__(self, cache_info: Dict, log_info: LogConfig) -> None:
+        """In-process cache that keeps the max_size most recently
+        used results. Safe to share between request threads.
+
+        Args:
+            cache_info (Dict): Contains max_size.
+            log_info (LogConfig): Info to create a log.
+        """
+        self.cache_info = cache_info
+        self.log_info = log_info
+
+        self.max_size = int(self.cache_info.get("max_size", 256))
+        self._data: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def log(self) -> Logger:
+        try:
+            return self._log
+        except AttributeError:
+            self._log = get_child_logger(
+                self.log_info.log_name, self.__class__.__name__
+            )
+            return self._log
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                evicted, _ = self._data.popitem(last=False)
+                self.log.debug(f"Evicted {evicted} from the backtest cache")
+
+
+class RedisBackTestCache(AbstractBackTestCache):
+    def __init__(self, cache_info: Dict, log_info: LogConfig) -> None:
+        """Cache shared by every backtest worker, stored in Redis
+        through the KeyValueRepository. Stale entries are never read
+        again once the data version moves on, so every entry expires
+        after ttl seconds.
+
+        Args:
+            cache_info (Dict): Contains redis_info and ttl (seconds,
+                               defaults to a day).
+            log_info (LogConfig): Info to create a log.
+        """
+        self.cache_info = cache_info
+        self.log_info = log_info
+
+        self.ttl = int(self.cache_info.get("ttl", 86400))
+
+    @property
+    def kv_repo(self) -> AbstractKeyValueRepository:
+        try:
+            return self._kv_repo
+        except AttributeError:
+            self._kv_repo = KeyValueRepository(
+                self.cache_info["redis_info"],
+                KeyValueController.redis,
+                self.log_info,
+            ).handler
+            return self._kv_repo
+
+    def get(self, key: str) -> Optional[Dict]:
+        value = self.kv_repo.get(key)
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Dict) -> None:
+        self.kv_repo.set(key, value, ex=self.ttl)
+
+
+class BackTestCache:
+    _cache_handlers = {
+        BackTestCacheController.memory: LRUBackTestCache,
+        BackTestCacheController.redis: RedisBackTestCache,
+    }
+
+    @validate_arguments(config=dict(arbitrary_types_allowed=True))
+    def __init__(
+        self,
+        cache_info: Dict,
+        cache_handler: BackTestCacheController,
+        log_info: LogConfig,
+    ) -> None:
+        """A wrapper class to provide a consistent interface to the
+        different BackTestCache types found in the _cache_handlers class
+        attribute.
+
+        Args:
+            cache_info (Dict): Info to set up the cache.
+            cache_handler (BackTestCacheController): Type of cache to use.
+            log_info (LogConfig): Log info to initialize child log.
+        """
+        self.cache_info = cache_info
+        self.cache_handler = cache_handler
+        self.log_info = log_info
+
+    @property
+    def handler(self) -> AbstractBackTestCache:
+        return BackTestCache._cache_handlers[self.cache_handler](
+            self.cache_info, self.log_info
+        )
@@ -2,6 +2,9 @@ from os import getenv
 from dotenv import load_dotenv
 
 from algo_trading.config.controllers import DBHandlerController
+from algo_trading.repositories.connection_registry import CONNECTIONS
+
+from .controllers import BackTestCacheController, JobQueueController
 
 load_dotenv()
 
@@ -15,6 +18,43 @@ DB_PASSWORD = getenv("POSTGRES_PASSWORD")
 
 DB_HANDLER = DBHandlerController[getenv("DB_HANDLER")]
 
+# Connection pool settings shared by every handler of the process.
+# Configured before any handler is built, since pools are created
+# with the settings current at the time.
+DB_POOL_SIZE = getenv("DB_POOL_SIZE", "5")
+DB_MAX_OVERFLOW = getenv("DB_MAX_OVERFLOW", "10")
+DB_PRE_PING = getenv("DB_PRE_PING", "true").lower() == "true"
+HEALTH_CHECK_INTERVAL = getenv("HEALTH_CHECK_INTERVAL", "30")
+REDIS_MAX_CONNECTIONS = getenv("REDIS_MAX_CONNECTIONS", "0")
+CONNECTIONS.configure(
+    pool_size=int(DB_POOL_SIZE),
+    max_overflow=int(DB_MAX_OVERFLOW),
+    pre_ping=DB_PRE_PING,
+    health_check_interval=float(HEALTH_CHECK_INTERVAL),
+    redis_max_connections=int(REDIS_MAX_CONNECTIONS),
+)
+
+# Loading in IN MEMORY info
+REDIS_HOST = getenv("REDIS_HOST")
+REDIS_PORT = getenv("REDIS_PORT")
+REDIS_DATABASE = getenv("REDIS_DB")
+REDIS_PASSWORD = getenv("REDIS_PASSWORD")
+
+# Loading in local price cache info
+PRICE_CACHE_DIR = getenv("PRICE_CACHE_DIR")
+
+# Loading in result cache info
+CACHE_HANDLER = BackTestCacheController[getenv("CACHE_HANDLER", "memory")]
+CACHE_MAX_SIZE = getenv("CACHE_MAX_SIZE", "256")
+CACHE_TTL = getenv("CACHE_TTL", "86400")
+
+# Loading in job queue info
+JOB_QUEUE_HANDLER = JobQueueController[getenv("JOB_QUEUE_HANDLER", "local")]
+JOB_QUEUE_WORKERS = getenv("JOB_QUEUE_WORKERS", "4")
+JOB_QUEUE_CHANNEL = getenv("JOB_QUEUE_CHANNEL", "backtest_jobs")
+JOB_QUEUE_TTL = getenv("JOB_QUEUE_TTL", "86400")
+JOB_QUEUE_MAX_FINISHED = getenv("JOB_QUEUE_MAX_FINISHED", "1000")
+
 # Building global vars for processing
 
 DB_INFO = {
@@ -24,3 +64,30 @@ DB_INFO = {
     "password": DB_PASSWORD,
     "port": DB_PORT,
 }
+
+PRICE_CACHE_INFO = {"cache_dir": PRICE_CACHE_DIR} if PRICE_CACHE_DIR else None
+
+REDIS_INFO = {
+    "host": REDIS_HOST,
+    "port": REDIS_PORT,
+    "db": REDIS_DATABASE,
+    "password": REDIS_PASSWORD,
+}
+
+CACHE_INFO = {
+    BackTestCacheController.memory: {
+        "max_size": CACHE_MAX_SIZE,
+    },
+    BackTestCacheController.redis: {
+        "redis_info": REDIS_INFO,
+        "ttl": CACHE_TTL,
+    },
+}[CACHE_HANDLER]
+
+JOB_QUEUE_INFO = {
+    "max_workers": JOB_QUEUE_WORKERS,
+    "channel": JOB_QUEUE_CHANNEL,
+    "ttl": JOB_QUEUE_TTL,
+    "max_finished": JOB_QUEUE_MAX_FINISHED,
+    "redis_info": REDIS_INFO,
+}
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -10,12 +11,18 @@ class BackTestOptions(str, Enum):
     sma_cross = "sma_cross"
 
 
+class BackTestEngine(str, Enum):
+    iterative = "iterative"
+    vectorized = "vectorized"
+
+
 class BackTestPayload(BaseModel):
     ticker: str
     strategy: BackTestOptions
     start_date: str = "max"
     end_date: str = dt_to_str(datetime.today())
     starting_capital: int = 1000
+    engine: BackTestEngine = BackTestEngine.vectorized
 
 
 class BackTestResult(BaseModel):
@@ -26,3 +33,83 @@ class BackTestResult(BaseModel):
     final_cap: float
     cap_gains: float
     num_trades: int
+
+
+class SMACrossWindows(BaseModel):
+    fast_window: int = 7
+    slow_window: int = 21
+    filter_window: int = 50
+
+
+class DateRange(BaseModel):
+    start_date: str = "max"
+    end_date: str = dt_to_str(datetime.today())
+
+
+class SweepPayload(BaseModel):
+    ticker: str
+    strategy: BackTestOptions
+    fast_windows: List[int] = [7]
+    slow_windows: List[int] = [21]
+    filter_windows: List[int] = [50]
+    date_ranges: List[DateRange] = [DateRange()]
+    starting_capital: int = 1000
+    max_workers: Optional[int] = None
+
+
+class SweepResult(BaseModel):
+    rank: int
+    windows: SMACrossWindows
+    result: BackTestResult
+
+
+class PortfolioBackTestPayload(BaseModel):
+    tickers: List[str]
+    strategy: BackTestOptions
+    start_date: str = "max"
+    end_date: str = dt_to_str(datetime.today())
+    starting_capital: int = 1000
+
+
+class TickerAttribution(BaseModel):
+    ticker: str
+    num_trades: int
+    pnl: float
+    contribution: float
+
+
+class PortfolioBackTestResult(BaseModel):
+    tickers: List[str]
+    start_date: str
+    end_date: str
+    init_cap: float
+    final_cap: float
+    cap_gains: float
+    num_trades: int
+    attribution: List[TickerAttribution]
+
+
+class BackTestCacheController(str, Enum):
+    memory = "memory"
+    redis = "redis"
+
+
+class JobQueueController(str, Enum):
+    local = "local"
+    redis = "redis"
+
+
+class JobStatusController(str, Enum):
+    pending = "PENDING"
+    running = "RUNNING"
+    finished = "FINISHED"
+    failed = "FAILED"
+
+
+class BackTestJob(BaseModel):
+    job_id: str
+    payload: BackTestPayload
+    status: JobStatusController = JobStatusController.pending
+    progress: float = 0.0
+    result: Optional[Dict] = None
+    error: Optional[str] = None
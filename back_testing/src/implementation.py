@@ -0,0 +1,74 @@
+from typing import Callable, Dict, Optional
+
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+
+from .sma_cross_backtest import SMACrossBackTester
+from .cache import BackTestCache, build_cache_key
+from .jobs import JobQueue
+from .controllers import BackTestPayload, BackTestOptions
+from .config import (
+    DB_INFO,
+    DB_HANDLER,
+    PRICE_CACHE_INFO,
+    CACHE_INFO,
+    CACHE_HANDLER,
+    JOB_QUEUE_INFO,
+    JOB_QUEUE_HANDLER,
+)
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="SMA_backtest",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+CACHE = BackTestCache(CACHE_INFO, CACHE_HANDLER, LOG_INFO).handler
+
+
+def run_backtest(
+    payload: BackTestPayload,
+    progress: Optional[Callable[[float], None]] = None,
+) -> Dict:
+    """
+    Runs the backtester for the given strategy, ticker and
+    dates, serving the result from the cache when the
+    parameters and data version have been seen before.
+
+    Args:
+        payload (BackTestPayload): Pydantic payload model.
+        progress (Optional[Callable[[float], None]], optional): Called
+            with the fraction of the backtest completed. Defaults to None.
+
+    Returns:
+        Dict: JSON serializable summary and trade book.
+    """
+
+    strategies = {
+        BackTestOptions.sma_cross: SMACrossBackTester(
+            payload=payload,
+            db_info=DB_INFO,
+            db_handler=DB_HANDLER,
+            log=LOG,
+            log_info=LOG_INFO,
+            price_cache_info=PRICE_CACHE_INFO,
+        ),
+    }
+
+    tester = strategies[payload.strategy]
+    cache_key = build_cache_key(
+        payload, tester.db_repo.get_most_recent_date(payload.ticker)
+    )
+    cached = CACHE.get(cache_key)
+    if cached is None:
+        summary, trade_book = tester.test(progress)
+        cached = {"summary": summary.dict(), "trade_book": trade_book}
+        CACHE.set(cache_key, cached)
+    else:
+        LOG.info(f"Serving cached backtest {cache_key}")
+        if progress is not None:
+            progress(1.0)
+    return cached
+
+
+JOB_QUEUE = JobQueue(JOB_QUEUE_INFO, JOB_QUEUE_HANDLER, run_backtest, LOG_INFO).handler
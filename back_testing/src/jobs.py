@@ -0,0 +1,308 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from logging import Logger
+from threading import BoundedSemaphore, Event, Lock
+from time import monotonic
+from typing import Callable, Dict, Optional
+from uuid import uuid4
+from pydantic import validate_arguments
+
+from algo_trading.config.controllers import KeyValueController
+from algo_trading.logger.controllers import LogConfig
+from algo_trading.logger.default_logger import get_child_logger
+from algo_trading.repositories.key_val_repository import (
+    AbstractKeyValueRepository,
+    KeyValueRepository,
+)
+
+from .controllers import (
+    BackTestJob,
+    BackTestPayload,
+    JobQueueController,
+    JobStatusController,
+)
+
+# Runs a backtest payload, reporting progress through the callback,
+# and returns a JSON serializable result.
+JobRunner = Callable[[BackTestPayload, Callable[[float], None]], Dict]
+
+
+class AbstractJobQueue(ABC):
+    """Queue that runs backtests outside of the request handler.
+    Jobs are submitted with submit() and polled with get().
+
+    Args:
+        ABC ([type]): Abstract Base Class
+    """
+
+    @abstractmethod
+    def submit(self, payload: BackTestPayload) -> BackTestJob:
+        """Queues a backtest.
+
+        Args:
+            payload (BackTestPayload): Backtest to run.
+
+        Returns:
+            BackTestJob: The pending job, including its job_id.
+        """
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[BackTestJob]:
+        """Gets the status, progress and result of a job.
+
+        Args:
+            job_id (str): Job ID returned by submit().
+
+        Returns:
+            Optional[BackTestJob]: The job, or None if it does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def _save(self, job: BackTestJob) -> None:
+        """Persists the current state of a job.
+
+        Args:
+            job (BackTestJob): Job to save.
+        """
+        pass
+
+    def _execute(self, job_id: str) -> None:
+        """Runs a job with the queue's runner, saving its state
+        as it starts, progresses and finishes.
+
+        Args:
+            job_id (str): Job to run.
+        """
+        job = self.get(job_id)
+        if job is None:
+            self.log.error(f"Job {job_id} does not exist.")
+            return
+
+        job.status = JobStatusController.running
+        self._save(job)
+
+        def _progress(fraction: float) -> None:
+            job.progress = round(fraction, 4)
+            self._save(job)
+
+        try:
+            job.result = self.runner(job.payload, _progress)
+            job.status = JobStatusController.finished
+            job.progress = 1.0
+        except Exception as e:
+            self.log.error(f"Job {job_id} failed: {e}")
+            job.status = JobStatusController.failed
+            job.error = str(e)
+        self._save(job)
+
+
+class LocalJobQueue(AbstractJobQueue):
+    def __init__(
+        self, queue_info: Dict, runner: JobRunner, log_info: LogConfig
+    ) -> None:
+        """In-process queue. Jobs are kept in memory and run on a
+        thread pool, so status is only visible to this process.
+        Finished and failed jobs are forgotten after ttl seconds, and
+        only the latest max_finished of them are kept, so a long lived
+        API process does not grow without bound.
+
+        Args:
+            queue_info (Dict): Contains max_workers, ttl (seconds, defaults
+                               to a day) and max_finished (defaults to 1000).
+            runner (JobRunner): Function that runs a backtest payload.
+            log_info (LogConfig): Info to create a log.
+        """
+        self.queue_info = queue_info
+        self.runner = runner
+        self.log_info = log_info
+
+        self.ttl = int(self.queue_info.get("ttl", 86400))
+        self.max_finished = int(self.queue_info.get("max_finished", 1000))
+
+        self._jobs: Dict[str, BackTestJob] = {}
+        # Job ID -> time it finished, oldest first.
+        self._finished: Dict[str, float] = {}
+        self._lock = Lock()
+
+    @property
+    def log(self) -> Logger:
+        try:
+            return self._log
+        except AttributeError:
+            self._log = get_child_logger(
+                self.log_info.log_name, self.__class__.__name__
+            )
+            return self._log
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        try:
+            return self._executor
+        except AttributeError:
+            self._executor = ThreadPoolExecutor(
+                max_workers=int(self.queue_info.get("max_workers", 4))
+            )
+            return self._executor
+
+    def _save(self, job: BackTestJob) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job.copy()
+            now = monotonic()
+            if job.status in (JobStatusController.finished, JobStatusController.failed):
+                self._finished[job.job_id] = now
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drops the finished jobs past ttl or max_finished. Called
+        with the lock held.
+
+        Args:
+            now (float): Current monotonic time.
+        """
+        while self._finished:
+            job_id, finished = next(iter(self._finished.items()))
+            if len(self._finished) <= self.max_finished and now - finished < self.ttl:
+                return
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
+
+    def submit(self, payload: BackTestPayload) -> BackTestJob:
+        job = BackTestJob(job_id=uuid4().hex, payload=payload)
+        self._save(job)
+        self.executor.submit(self._execute, job.job_id)
+        self.log.info(f"Submitted job {job.job_id} for {payload.ticker}")
+        return job
+
+    def get(self, job_id: str) -> Optional[BackTestJob]:
+        with self._lock:
+            self._evict(monotonic())
+            job = self._jobs.get(job_id)
+        return job.copy() if job is not None else None
+
+
+class RedisJobQueue(AbstractJobQueue):
+    def __init__(
+        self, queue_info: Dict, runner: JobRunner, log_info: LogConfig
+    ) -> None:
+        """Queue backed by Redis. Job state lives in the KeyValueRepository
+        so any API process can poll it, and expires after ttl seconds.
+        Job IDs are pushed onto the list named by channel, which worker
+        processes (see worker.py) pop with work(). A pop hands each job
+        to exactly one worker, and jobs submitted while no worker runs
+        wait in the list, so any number of workers can share a queue.
+
+        Args:
+            queue_info (Dict): Contains redis_info, channel, max_workers and
+                               ttl (seconds, defaults to a day).
+            runner (JobRunner): Function that runs a backtest payload.
+            log_info (LogConfig): Info to create a log.
+        """
+        self.queue_info = queue_info
+        self.runner = runner
+        self.log_info = log_info
+
+        self.channel = self.queue_info.get("channel", "backtest_jobs")
+        self.ttl = int(self.queue_info.get("ttl", 86400))
+
+    @property
+    def log(self) -> Logger:
+        try:
+            return self._log
+        except AttributeError:
+            self._log = get_child_logger(
+                self.log_info.log_name, self.__class__.__name__
+            )
+            return self._log
+
+    @property
+    def kv_repo(self) -> AbstractKeyValueRepository:
+        try:
+            return self._kv_repo
+        except AttributeError:
+            self._kv_repo = KeyValueRepository(
+                self.queue_info["redis_info"],
+                KeyValueController.redis,
+                self.log_info,
+            ).handler
+            return self._kv_repo
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"backtest_job:{job_id}"
+
+    def _save(self, job: BackTestJob) -> None:
+        self.kv_repo.set(self._key(job.job_id), job.json(), ex=self.ttl)
+
+    def submit(self, payload: BackTestPayload) -> BackTestJob:
+        job = BackTestJob(job_id=uuid4().hex, payload=payload)
+        self._save(job)
+        self.kv_repo.lpush(self.channel, [job.job_id])
+        self.log.info(f"Submitted job {job.job_id} for {payload.ticker}")
+        return job
+
+    def get(self, job_id: str) -> Optional[BackTestJob]:
+        job = self.kv_repo.get(self._key(job_id))
+        return BackTestJob.parse_raw(job) if job is not None else None
+
+    def work(self, stop: Optional[Event] = None, poll: int = 5) -> None:
+        """Runs queued jobs on a thread pool, starting with any backlog,
+        until stop is set. A job is only popped once a thread is free,
+        so the rest stay available to other workers.
+
+        Args:
+            stop (Optional[Event], optional): Set to return. Defaults to None,
+                                              run forever.
+            poll (int, optional): Seconds between checks of stop while the
+                                  queue is empty. Defaults to 5.
+        """
+        stop = stop or Event()
+        max_workers = int(self.queue_info.get("max_workers", 4))
+        free = BoundedSemaphore(max_workers)
+        self.log.info(f"Working backtest jobs from {self.channel}")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while not stop.is_set():
+                free.acquire()
+                job_id = self.kv_repo.brpop(self.channel, timeout=poll)
+                if job_id is None:
+                    free.release()
+                    continue
+                future = executor.submit(self._execute, job_id)
+                future.add_done_callback(lambda _: free.release())
+
+
+class JobQueue:
+    _job_handlers = {
+        JobQueueController.local: LocalJobQueue,
+        JobQueueController.redis: RedisJobQueue,
+    }
+
+    @validate_arguments(config=dict(arbitrary_types_allowed=True))
+    def __init__(
+        self,
+        queue_info: Dict,
+        queue_handler: JobQueueController,
+        runner: Callable,
+        log_info: LogConfig,
+    ) -> None:
+        """A wrapper class to provide a consistent interface to the
+        different JobQueue types found in the _job_handlers class
+        attribute.
+
+        Args:
+            queue_info (Dict): Info to set up the queue.
+            queue_handler (JobQueueController): Type of queue to use.
+            runner (Callable): Function that runs a backtest payload.
+            log_info (LogConfig): Log info to initialize child log.
+        """
+        self.queue_info = queue_info
+        self.queue_handler = queue_handler
+        self.runner = runner
+        self.log_info = log_info
+
+    @property
+    def handler(self) -> AbstractJobQueue:
+        return JobQueue._job_handlers[self.queue_handler](
+            self.queue_info, self.runner, self.log_info
+        )
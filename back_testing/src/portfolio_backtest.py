@@ -0,0 +1,241 @@
+from logging import Logger
+import json
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from pydantic import validate_arguments
+
+from algo_trading.logger.controllers import LogConfig
+from algo_trading.utils.utils import dt_to_str, str_to_dt
+from algo_trading.repositories.db_repository import AbstractDBRepository, DBRepository
+from algo_trading.config.controllers import (
+    ColumnController,
+    DBHandlerController,
+    StockStatusController,
+)
+from algo_trading.exceptions.data_exceptions import DateNotFoundException
+
+from .controllers import (
+    PortfolioBackTestPayload,
+    PortfolioBackTestResult,
+    TickerAttribution,
+)
+from .vectorized_engine import (
+    get_percent_change,
+    sma_cross_positions,
+    simulate_portfolio,
+)
+
+
+class SMACrossPortfolioBackTester:
+    @validate_arguments(config=dict(arbitrary_types_allowed=True))
+    def __init__(
+        self,
+        payload: PortfolioBackTestPayload,
+        db_info: Dict,
+        db_handler: DBHandlerController,
+        log: Logger,
+        log_info: LogConfig,
+        price_cache_info: Optional[Dict] = None,
+    ) -> None:
+        """
+        SMACross backtester for several tickers sharing one pot of
+        capital. All tickers are evaluated in one vectorized pass
+        over a date x ticker price panel. Entrypoint is the test() method.
+
+        Args:
+            payload (PortfolioBackTestPayload): Pydantic payload model.
+            db_info (Dict): DB to get price data.
+            db_handler (DBHandlerController): Type of DB repo.
+            log (Logger): Log object.
+            log_info (LogConfig): Info to create child logs.
+            price_cache_info (Optional[Dict], optional): Local price cache to read
+                through. Defaults to None.
+
+        Raises:
+            ValueError: A ticker is listed more than once.
+        """
+        if len(set(payload.tickers)) != len(payload.tickers):
+            raise ValueError(f"Duplicate tickers in {payload.tickers}")
+        self.tickers = payload.tickers
+        self.start_date = payload.start_date
+        self.end_date = payload.end_date
+        self.starting_capital = payload.starting_capital
+
+        self.db_info = db_info
+        self.db_handler = db_handler
+        self.log = log
+        self.log_info = log_info
+        self.price_cache_info = price_cache_info
+
+    @property
+    def db_repo(self) -> AbstractDBRepository:
+        """
+        Live prices DB to pull data from to test.
+
+        Returns:
+            AbstractDBRepository: DB Repo handler object.
+        """
+        try:
+            return self._db_repo
+        except AttributeError:
+            self._db_repo = DBRepository(
+                self.db_info,
+                self.db_handler,
+                self.log_info,
+                self.price_cache_info,
+            ).handler
+            return self._db_repo
+
+    @property
+    def closes(self) -> Dict[str, pd.Series]:
+        """
+        Close prices of each ticker on its own trading days.
+
+        Returns:
+            Dict[str, pd.Series]: Ticker -> close prices indexed by date.
+        """
+        try:
+            return self._closes
+        except AttributeError:
+            self._closes = {}
+            for ticker in self.tickers:
+                data = self.db_repo.get_until_date(ticker, self.end_date)
+                self._closes[ticker] = data.set_index(ColumnController.date.value)[
+                    ColumnController.close.value
+                ].sort_index()
+            return self._closes
+
+    @property
+    def price_panel(self) -> pd.DataFrame:
+        """
+        Close prices aligned on the union of all tickers' dates,
+        one column per ticker. A ticker has NaN prices on days it
+        did not trade (e.g. before it was listed).
+
+        Returns:
+            pd.DataFrame: Date x ticker close price panel.
+        """
+        try:
+            return self._price_panel
+        except AttributeError:
+            self._price_panel = pd.concat(self.closes, axis=1).sort_index()
+            return self._price_panel
+
+    def _sma_panel(self, window: int) -> pd.DataFrame:
+        """
+        Moving average of each ticker over its own rows, then aligned
+        on the price panel. Rolling over the panel instead would count
+        the NaN days of tickers with a different calendar. Days a ticker
+        did not trade carry its last average forward, so a cross that
+        spans them still shows on its next trading day.
+
+        Args:
+            window (int): Moving average window in trading days.
+
+        Returns:
+            pd.DataFrame: Date x ticker moving average panel.
+        """
+        smas = {
+            ticker: close.rolling(window).mean()
+            for ticker, close in self.closes.items()
+        }
+        return pd.concat(smas, axis=1).reindex(self.price_panel.index).ffill()
+
+    def _get_start_idx(self) -> int:
+        """
+        Index of the start date in the price panel. As the moving
+        averages are computed over each ticker's whole history, we don't need
+        to pull extra history before it.
+
+        Raises:
+            DateNotFoundException: Start date is not a trading day.
+
+        Returns:
+            int: Row of the first day to trade.
+        """
+        if self.start_date == "max":
+            return 0
+        try:
+            return self.price_panel.index.get_loc(str_to_dt(self.start_date))
+        except KeyError:
+            self.log.error(
+                f"Failed to backtest {self.tickers} with start date {self.start_date}"
+            )
+            raise DateNotFoundException(self.start_date, ", ".join(self.tickers))
+
+    def test(
+        self,
+    ) -> Tuple[PortfolioBackTestResult, Dict[str, Dict[str, str]], Dict[str, float]]:
+        """
+        Runs the SMA strategy for every ticker at once and allocates
+        capital across simultaneous signals.
+
+        Returns:
+            PortfolioBackTestResult: Portfolio results and per ticker attribution.
+            Dict[str, Dict[str, str]]: Trade book, date -> {ticker: signal}.
+            Dict[str, float]: Daily portfolio equity.
+        """
+        start_idx = self._get_start_idx()
+
+        def _sma(window: int) -> np.ndarray:
+            return self._sma_panel(window).to_numpy()[start_idx:]
+
+        panel = self.price_panel.iloc[start_idx:]
+        close = panel.to_numpy(dtype=np.float64)
+        sma_windows = ColumnController.sma_calculations()
+        positions = sma_cross_positions(
+            close,
+            _sma(sma_windows[ColumnController.ma_7.value]),
+            _sma(sma_windows[ColumnController.ma_21.value]),
+            _sma(sma_windows[ColumnController.ma_50.value]),
+        )
+
+        self.log.info(
+            f"Beginning SMA Cross portfolio strategy with ${self.starting_capital} "
+            + f"for {len(self.tickers)} tickers on {panel.index[0]}"
+        )
+
+        equity, num_trades, pnl, trades = simulate_portfolio(
+            close, positions, self.starting_capital
+        )
+
+        dates = [dt_to_str(date) for date in panel.index]
+        signals = {
+            1: StockStatusController.buy.value,
+            -1: StockStatusController.sell.value,
+        }
+        trade_book = {}
+        for day, ticker_idx in zip(*np.nonzero(trades[1:])):
+            trade_book.setdefault(dates[day + 1], {})[
+                self.tickers[ticker_idx]
+            ] = signals[trades[day + 1, ticker_idx]]
+
+        attribution = [
+            TickerAttribution(
+                ticker=ticker,
+                num_trades=ticker_trades,
+                pnl=ticker_pnl,
+                contribution=get_percent_change(
+                    self.starting_capital, self.starting_capital + ticker_pnl
+                ),
+            )
+            for ticker, ticker_trades, ticker_pnl in zip(self.tickers, num_trades, pnl)
+        ]
+
+        res = PortfolioBackTestResult(
+            tickers=self.tickers,
+            start_date=dates[0],
+            end_date=dates[-1],
+            init_cap=self.starting_capital,
+            final_cap=equity[-1],
+            cap_gains=get_percent_change(self.starting_capital, equity[-1]),
+            num_trades=num_trades.sum(),
+            attribution=attribution,
+        )
+
+        self.log.info(
+            f"Successfully backtested SMA Cross portfolio:\n {json.dumps(res.dict(), indent=2)}\n"
+        )
+
+        return res, trade_book, dict(zip(dates, equity.tolist()))
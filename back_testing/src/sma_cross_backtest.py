@@ -1,7 +1,7 @@
 from datetime import timedelta
 from logging import Logger
 import json
-from typing import Dict, Tuple
+from typing import Callable, Dict, Optional, Tuple
 import pandas as pd
 from pydantic import validate_arguments
 
@@ -11,6 +11,7 @@ from algo_trading.utils.utils import dt_to_str, str_to_dt
 from algo_trading.strategies.sma_cross_strat import SMACross, SMACrossUtils
 from algo_trading.repositories.db_repository import AbstractDBRepository, DBRepository
 from algo_trading.repositories.key_val_repository import KeyValueRepository
+from algo_trading.repositories.strategy_info_repository import StrategyInfoRepository
 from algo_trading.config.controllers import (
     ColumnController,
     DBHandlerController,
@@ -21,7 +22,12 @@ from algo_trading.config.controllers import (
 from algo_trading.utils.calculations import Calculator
 from algo_trading.exceptions.data_exceptions import DateNotFoundException
 
-from .controllers import BackTestPayload, BackTestResult
+from .controllers import BackTestEngine, BackTestPayload, BackTestResult
+from .vectorized_engine import (
+    get_percent_change,
+    sma_cross_positions,
+    simulate_trades,
+)
 
 # TODO: PERSIST LOGS TO MINIO BUCKET
 
@@ -35,6 +41,7 @@ class SMACrossBackTester:
         db_handler: DBHandlerController,
         log: Logger,
         log_info: LogConfig,
+        price_cache_info: Optional[Dict] = None,
     ) -> None:
         """
         SMACross Backtesting class. Entrypoint is the test() method.
@@ -45,16 +52,20 @@ class SMACrossBackTester:
             db_handler (DBHandlerController, optional): Defaults to DB_HANDLER.
             log (Logger, optional): Defaults to LOG.
             log_info (LogConfig, optional): Defaults to LOG_INFO.
+            price_cache_info (Optional[Dict], optional): Local price cache to read
+                through. Defaults to None.
         """
         self.ticker = payload.ticker
         self.start_date = payload.start_date
         self.end_date = payload.end_date
         self.starting_capital = payload.starting_capital
+        self.engine = payload.engine
 
         self.db_info = db_info
         self.db_handler = db_handler
         self.log = log
         self.log_info = log_info
+        self.price_cache_info = price_cache_info
 
         self.fake_kv_repo = None
 
@@ -73,6 +84,7 @@ class SMACrossBackTester:
                 self.db_info,
                 self.db_handler,
                 self.log_info,
+                self.price_cache_info,
             ).handler
             return self._db_repo
 
@@ -127,13 +139,14 @@ class SMACrossBackTester:
                 ].reset_index(drop=True)
             return self._price_data
 
-    def _init_fake_key_value(self) -> Tuple[StockStatusController, Dict[str, str]]:
+    def _init_fake_key_value(self) -> Tuple[StockStatusController, Dict[str, Dict]]:
         """
         Initializes the fake key,value store depending on the first day
         of the test data.
 
         Returns:
-            Tuple[StockStatusController, Dict[str, str]]: Initialized status as a dict.
+            Tuple[StockStatusController, Dict[str, Dict]]: Initialized status and
+                the StrategyInfo hash keyed by its KV key.
         """
         first_day = self.price_data.iloc[0].to_dict()
         if (
@@ -162,7 +175,11 @@ class SMACrossBackTester:
             sma_last_status=last_status,
         )
 
-        return last_status, {self.ticker: json.dumps(cross_info.dict())}
+        return last_status, {
+            StrategyInfoRepository.key(self.ticker): StrategyInfoRepository.to_hash(
+                cross_info
+            )
+        }
 
     def _get_num_shares(self, cash: float, share_price: float) -> float:
         """
@@ -204,14 +221,119 @@ class SMACrossBackTester:
         Returns:
             float: Percent change
         """
-        return round(((end_cap - start_cap) / start_cap) * 100, precision)
+        return get_percent_change(start_cap, end_cap, precision)
+
+    def _build_result(
+        self, init_cap: float, final_cap: float, num_trades: int
+    ) -> BackTestResult:
+        """
+        Wraps up the capital figures of a finished run.
+
+        Args:
+            init_cap (float): Starting capital
+            final_cap (float): Ending capital
+            num_trades (int): Number of buys and sells
+
+        Returns:
+            BackTestResult: Results of the back test.
+        """
+        res = BackTestResult(
+            ticker=self.ticker,
+            start_date=dt_to_str(self.price_data[ColumnController.date.value].iloc[0]),
+            end_date=dt_to_str(self.price_data[ColumnController.date.value].iloc[-1]),
+            init_cap=init_cap,
+            final_cap=final_cap,
+            cap_gains=self._get_percent_change(init_cap, final_cap),
+            num_trades=num_trades,
+        )
+
+        self.log.info(
+            f"Successfully backtested SMA Cross for {self.ticker}:\n {json.dumps(res.dict(), indent=2)}\n"
+        )
+        return res
+
+    def test(
+        self, progress: Optional[Callable[[float], None]] = None
+    ) -> Tuple[BackTestResult, Dict[str, str]]:
+        """
+        Runs the SMA strategy over the cached price data with the
+        engine requested in the payload. Both engines return the
+        same results.
+
+        Args:
+            progress (Optional[Callable[[float], None]], optional): Called
+                with the fraction of the run completed. Defaults to None.
+
+        Returns:
+            BackTestResult: Results of the back test.
+            Dict[str, StockStatusController]: Trade book used for testing.
+        """
+        progress = progress or (lambda fraction: None)
+        if self.engine == BackTestEngine.vectorized:
+            res, trade_book = self._test_vectorized(progress)
+        else:
+            res, trade_book = self._test_iterative(progress)
+        progress(1.0)
+        return res, trade_book
+
+    def _test_vectorized(
+        self, progress: Callable[[float], None]
+    ) -> Tuple[BackTestResult, Dict[str, str]]:
+        """
+        Runs the SMA strategy over whole NumPy arrays instead of
+        stepping through the fake repositories day by day. Cross
+        masks, the status state machine and the capital path are
+        computed in vectorized_engine.
+
+        Args:
+            progress (Callable[[float], None]): Progress callback.
+
+        Returns:
+            BackTestResult: Results of the back test.
+            Dict[str, StockStatusController]: Trade book used for testing.
+        """
+        close = self.price_data[ColumnController.close.value].to_numpy()
+        progress(0.5)
+        positions = sma_cross_positions(
+            close,
+            self.price_data[ColumnController.ma_7.value].to_numpy(),
+            self.price_data[ColumnController.ma_21.value].to_numpy(),
+            self.price_data[ColumnController.ma_50.value].to_numpy(),
+        )
+
+        self.log.info(
+            f"Beginning vectorized SMA Cross strategy with ${self.starting_capital} for "
+            + f"{self.ticker.upper()} at price {close[0]} on "
+            + f"{self.price_data[ColumnController.date.value].iloc[0]}"
+        )
+
+        final_cap, trade_idx = simulate_trades(close, positions, self.starting_capital)
+
+        trade_dates = self.price_data[ColumnController.date.value].iloc[trade_idx]
+        trade_book = {
+            dt_to_str(date): (
+                StockStatusController.buy.value
+                if is_long
+                else StockStatusController.sell.value
+            )
+            for date, is_long in zip(trade_dates, positions[trade_idx])
+        }
 
-    def test(self) -> Tuple[BackTestResult, Dict[str, str]]:
+        res = self._build_result(self.starting_capital, final_cap, len(trade_idx))
+        return res, trade_book
+
+    def _test_iterative(
+        self, progress: Callable[[float], None]
+    ) -> Tuple[BackTestResult, Dict[str, str]]:
         """
         Runs the SMA strategy over the cached price data.
         Instantiates a fake DBRepository and a fake KeyValueRepository
         to 'query' from.
 
+        Args:
+            progress (Callable[[float], None]): Progress callback, called
+                about every percent of the price data.
+
         Returns:
             BackTestResult: Results of the back test.
             Dict[str, StockStatusController]: Trade book used for testing.
@@ -225,6 +347,7 @@ class SMACrossBackTester:
             kv_handler=KeyValueController.fake,
             log_info=self.log_info,
         ).handler
+        strategy_info = StrategyInfoRepository(fake_kv_repo)
 
         starting_cap = self.starting_capital
         num_trades = 0
@@ -245,19 +368,23 @@ class SMACrossBackTester:
             + f"{self.price_data[ColumnController.date.value].iloc[0]}"
         )
 
+        num_days = len(self.price_data)
+        report_every = max(1, num_days // 100)
         for idx, row in self.price_data.iterrows():
             if idx == 0:
                 # Skip the first day.
                 continue
             else:
+                if idx % report_every == 0:
+                    progress(idx / num_days)
 
                 # Current key/val store for self.ticker
-                cross_info = StrategyInfo(**json.loads(fake_kv_repo.get(self.ticker)))
+                current = strategy_info.get(self.ticker)
 
                 cross_info = SMACrossUtils.check_cross_up(
                     self.price_data[: (idx + 1)],
                     idx,
-                    cross_info,
+                    current.copy(),
                 )
 
                 cross_info = SMACrossUtils.check_cross_down(
@@ -266,7 +393,7 @@ class SMACrossBackTester:
                     cross_info,
                 )
 
-                fake_kv_repo.set(self.ticker, cross_info.dict())
+                strategy_info.update(self.ticker, current, cross_info)
                 date = self.price_data.iloc[idx][ColumnController.date.value]
                 sma = SMACross(self.ticker, fake_kv_repo, date)
                 result = sma.run()
@@ -307,20 +434,6 @@ class SMACrossBackTester:
                 + f"on {self.price_data[ColumnController.date.value].iloc[-1]}."
             )
             self.log.debug(f"Selling all for a new capital of {self.starting_capital}.")
-        percent_change = self._get_percent_change(starting_cap, self.starting_capital)
-
-        res = BackTestResult(
-            ticker=self.ticker,
-            start_date=dt_to_str(self.price_data[ColumnController.date.value].iloc[0]),
-            end_date=dt_to_str(self.price_data[ColumnController.date.value].iloc[-1]),
-            init_cap=starting_cap,
-            final_cap=self.starting_capital,
-            cap_gains=percent_change,
-            num_trades=num_trades,
-        )
-
-        self.log.info(
-            f"Successfully backtested SMA Cross for {self.ticker}:\n {json.dumps(res.dict(), indent=2)}\n"
-        )
 
+        res = self._build_result(starting_cap, self.starting_capital, num_trades)
         return res, trade_book
@@ -0,0 +1,282 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from logging import Logger
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from pydantic import validate_arguments
+
+from algo_trading.logger.controllers import LogConfig
+from algo_trading.utils.utils import dt_to_str, str_to_dt
+from algo_trading.repositories.db_repository import AbstractDBRepository, DBRepository
+from algo_trading.config.controllers import ColumnController, DBHandlerController
+from algo_trading.exceptions.data_exceptions import DateNotFoundException
+
+from .controllers import (
+    BackTestResult,
+    DateRange,
+    SMACrossWindows,
+    SweepPayload,
+    SweepResult,
+)
+from .vectorized_engine import (
+    get_percent_change,
+    sma_cross_positions,
+    simulate_trades,
+)
+
+# Rows of history pulled before the start date. Matches the 199 days
+# SMACrossBackTester pulls so default windows give identical results.
+MIN_LOOKBACK = 199
+
+# Price arrays loaded once per worker process by _init_worker.
+_DATES: Optional[np.ndarray] = None
+_CLOSE: Optional[np.ndarray] = None
+
+
+def _init_worker(dates: np.ndarray, close: np.ndarray) -> None:
+    """
+    ProcessPoolExecutor initializer. The price data is shipped to
+    each worker once here instead of with every task.
+
+    Args:
+        dates (np.ndarray): datetime64 dates in ASCENDING order.
+        close (np.ndarray): Close prices.
+    """
+    global _DATES, _CLOSE
+    _DATES = dates
+    _CLOSE = close
+
+
+def _run_combo(
+    windows: SMACrossWindows,
+    start_idx: int,
+    end_idx: int,
+    starting_capital: int,
+) -> Tuple[SMACrossWindows, int, int, float, int]:
+    """
+    Backtests one set of windows over [start_idx, end_idx] of the
+    worker's price data.
+
+    Args:
+        windows (SMACrossWindows): Fast/slow/filter windows.
+        start_idx (int): Index of the first day to trade.
+        end_idx (int): Index of the last day to trade (inclusive).
+        starting_capital (int): Starting capital.
+
+    Returns:
+        Tuple[SMACrossWindows, int, int, float, int]: Windows, start and
+            end index, final capital and number of trades.
+    """
+    lookback = max(
+        MIN_LOOKBACK,
+        windows.fast_window - 1,
+        windows.slow_window - 1,
+        windows.filter_window - 1,
+    )
+    pull_idx = max(0, start_idx - lookback)
+    close = pd.Series(_CLOSE[pull_idx : (end_idx + 1)])
+
+    def _sma(window: int) -> np.ndarray:
+        return close.rolling(window).mean().to_numpy()[(start_idx - pull_idx) :]
+
+    trade_close = close.to_numpy()[(start_idx - pull_idx) :]
+    positions = sma_cross_positions(
+        trade_close,
+        _sma(windows.fast_window),
+        _sma(windows.slow_window),
+        _sma(windows.filter_window),
+    )
+    final_cap, trade_idx = simulate_trades(trade_close, positions, starting_capital)
+    return windows, start_idx, end_idx, final_cap, len(trade_idx)
+
+
+class SMACrossSweeper:
+    @validate_arguments(config=dict(arbitrary_types_allowed=True))
+    def __init__(
+        self,
+        payload: SweepPayload,
+        db_info: Dict,
+        db_handler: DBHandlerController,
+        log: Logger,
+        log_info: LogConfig,
+        price_cache_info: Optional[Dict] = None,
+    ) -> None:
+        """
+        Runs the SMACross backtest over a grid of fast/slow/filter
+        windows and date ranges in a process pool. Price data is
+        queried once and shared with the workers. Entrypoint is
+        the run() method.
+
+        Args:
+            payload (SweepPayload): Pydantic payload model.
+            db_info (Dict): DB to get price data.
+            db_handler (DBHandlerController): Type of DB repo.
+            log (Logger): Log object.
+            log_info (LogConfig): Info to create child logs.
+            price_cache_info (Optional[Dict], optional): Local price cache to read
+                through. Defaults to None.
+        """
+        self.ticker = payload.ticker
+        self.fast_windows = payload.fast_windows
+        self.slow_windows = payload.slow_windows
+        self.filter_windows = payload.filter_windows
+        self.date_ranges = payload.date_ranges
+        self.starting_capital = payload.starting_capital
+        self.max_workers = payload.max_workers
+
+        self.db_info = db_info
+        self.db_handler = db_handler
+        self.log = log
+        self.log_info = log_info
+        self.price_cache_info = price_cache_info
+
+    @property
+    def db_repo(self) -> AbstractDBRepository:
+        """
+        Live prices DB to pull data from to test.
+
+        Returns:
+            AbstractDBRepository: DB Repo handler object.
+        """
+        try:
+            return self._db_repo
+        except AttributeError:
+            self._db_repo = DBRepository(
+                self.db_info,
+                self.db_handler,
+                self.log_info,
+                self.price_cache_info,
+            ).handler
+            return self._db_repo
+
+    @property
+    def price_data(self) -> pd.DataFrame:
+        """
+        All price data up until the latest end date of the sweep,
+        pulled in a single query.
+
+        Returns:
+            pd.DataFrame: Price DF to use for testing.
+        """
+        try:
+            return self._price_data
+        except AttributeError:
+            end_date = max(
+                self.date_ranges, key=lambda date_range: str_to_dt(date_range.end_date)
+            ).end_date
+            self._price_data = self.db_repo.get_until_date(self.ticker, end_date)
+            return self._price_data
+
+    @property
+    def grid(self) -> List[SMACrossWindows]:
+        """
+        Every valid combination of windows. Combos where the fast
+        window is not shorter than the slow window are skipped.
+
+        Returns:
+            List[SMACrossWindows]: Windows to test.
+        """
+        return [
+            SMACrossWindows(fast_window=fast, slow_window=slow, filter_window=filt)
+            for fast, slow, filt in product(
+                self.fast_windows, self.slow_windows, self.filter_windows
+            )
+            if fast < slow
+        ]
+
+    def _get_date_range_idx(
+        self, dates: np.ndarray, date_range: DateRange
+    ) -> Tuple[int, int]:
+        """
+        Finds the indices of the first and last trading day of a date
+        range. The start date must be a trading day, like in
+        SMACrossBackTester.
+
+        Args:
+            dates (np.ndarray): datetime64 dates in ASCENDING order.
+            date_range (DateRange): Date range to look up.
+
+        Raises:
+            DateNotFoundException: Start date is not in the data, or no
+                trading day falls between the start and end dates.
+
+        Returns:
+            Tuple[int, int]: Start and end index (inclusive).
+        """
+        end_idx = (
+            int(np.searchsorted(dates, np.datetime64(date_range.end_date), "right")) - 1
+        )
+        start_idx = 0
+        if date_range.start_date != "max":
+            start_date = np.datetime64(date_range.start_date)
+            start_idx = int(np.searchsorted(dates, start_date))
+            if start_idx >= len(dates) or dates[start_idx] != start_date:
+                self.log.error(
+                    f"Failed to sweep {self.ticker} with start date {date_range.start_date}"
+                )
+                raise DateNotFoundException(date_range.start_date, self.ticker)
+
+        if end_idx < start_idx:
+            self.log.error(
+                f"Failed to sweep {self.ticker} with end date {date_range.end_date}"
+            )
+            raise DateNotFoundException(date_range.end_date, self.ticker)
+        return start_idx, end_idx
+
+    def run(self) -> List[SweepResult]:
+        """
+        Backtests every combination of windows and date ranges
+        in parallel.
+
+        Returns:
+            List[SweepResult]: Results ranked by capital gains.
+        """
+        dates = self.price_data[ColumnController.date.value].to_numpy(
+            dtype="datetime64[ns]"
+        )
+        close = self.price_data[ColumnController.close.value].to_numpy(dtype=np.float64)
+        ranges = [self._get_date_range_idx(dates, dr) for dr in self.date_ranges]
+        tasks = list(product(self.grid, ranges))
+
+        self.log.info(
+            f"Sweeping {len(tasks)} SMA Cross backtests for {self.ticker.upper()} "
+            + f"over {len(dates)} days of price data."
+        )
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(dates, close),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _run_combo, windows, start_idx, end_idx, self.starting_capital
+                )
+                for windows, (start_idx, end_idx) in tasks
+            ]
+            outputs = [future.result() for future in futures]
+
+        results = [
+            (
+                windows,
+                BackTestResult(
+                    ticker=self.ticker,
+                    start_date=dt_to_str(pd.Timestamp(dates[start_idx])),
+                    end_date=dt_to_str(pd.Timestamp(dates[end_idx])),
+                    init_cap=self.starting_capital,
+                    final_cap=final_cap,
+                    cap_gains=get_percent_change(self.starting_capital, final_cap),
+                    num_trades=num_trades,
+                ),
+            )
+            for windows, start_idx, end_idx, final_cap, num_trades in outputs
+        ]
+        results.sort(key=lambda res: res[1].final_cap, reverse=True)
+
+        self.log.info(f"Successfully swept SMA Cross for {self.ticker}.")
+
+        return [
+            SweepResult(rank=rank, windows=windows, result=result)
+            for rank, (windows, result) in enumerate(results, start=1)
+        ]
@@ -0,0 +1,186 @@
+from typing import Tuple
+import numpy as np
+
+from algo_trading.strategies.sma_cross_strat import SMACrossUtils
+from algo_trading.utils.utils import last_true_idx
+
+
+def sma_cross_positions(
+    close: np.ndarray,
+    ma_fast: np.ndarray,
+    ma_slow: np.ndarray,
+    ma_filter: np.ndarray,
+) -> np.ndarray:
+    """
+    Replays the SMACross state machine over whole arrays. A cross up
+    (fast >= slow today, fast < slow yesterday, close > filter MA)
+    puts us in the market and a cross down (fast < slow today,
+    fast >= slow yesterday) takes us out. A cross down while we are
+    already out is ignored, which is exactly the rule that drops the
+    cross down following a cross up filtered out by the filter MA.
+
+    The first day is initialized the same way as
+    SMACrossBackTester._init_fake_key_value: long if fast > slow.
+
+    NaN moving averages compare as False, matching the row-by-row
+    checks in SMACrossUtils.
+
+    Arrays can either be 1D (one ticker) or 2D (days x tickers), in
+    which case every ticker is evaluated in the same pass.
+
+    **NOTE**
+    We expect the arrays to be in ASCENDING order by date.
+
+    Args:
+        close (np.ndarray): Close prices.
+        ma_fast (np.ndarray): Fast moving average (ma_7).
+        ma_slow (np.ndarray): Slow moving average (ma_21).
+        ma_filter (np.ndarray): Bull market filter (ma_50).
+
+    Returns:
+        np.ndarray: Boolean array, True on the days we are holding shares.
+    """
+    if len(close) == 0:
+        return np.zeros(close.shape, dtype=bool)
+
+    cross_up, cross_down = SMACrossUtils.cross_masks(close, ma_fast, ma_slow, ma_filter)
+
+    events = np.zeros(close.shape, dtype=np.int8)
+    events[cross_up] = 1
+    events[cross_down] = -1
+    events[0] = np.where(ma_fast[0] > ma_slow[0], 1, -1)
+
+    # Forward fill the last event to get the state on every day.
+    last_event_idx = last_true_idx(events != 0)
+    return np.take_along_axis(events, last_event_idx, axis=0) > 0
+
+
+def simulate_trades(
+    close: np.ndarray,
+    positions: np.ndarray,
+    starting_capital: float,
+) -> Tuple[float, np.ndarray]:
+    """
+    Runs the all in / all out capital path for the given positions.
+    Trades happen on the days the position flips. Only the trades
+    are walked (not every day), and the arithmetic is the same as in
+    SMACrossBackTester so results are identical to the iterative engine.
+
+    Args:
+        close (np.ndarray): Close prices.
+        positions (np.ndarray): Output of sma_cross_positions().
+        starting_capital (float): Starting capital.
+
+    Returns:
+        Tuple[float, np.ndarray]: Final capital (liquidated at the last
+                                  close) and the indices of the trade days.
+    """
+    trade_idx = np.flatnonzero(positions[1:] != positions[:-1]) + 1
+
+    capital = starting_capital
+    num_shares = capital / close[0] if positions[0] else 0
+    for idx, price in zip(trade_idx, close[trade_idx]):
+        if positions[idx]:
+            num_shares = capital / price
+        else:
+            capital = num_shares * price
+            num_shares = 0
+
+    if num_shares != 0:
+        capital = num_shares * close[-1]
+
+    return capital, trade_idx
+
+
+def get_percent_change(start_cap: float, end_cap: float, precision: int = 2) -> float:
+    """
+    Generate percent change from starting and ending capital.
+
+    Args:
+        start_cap (float): Starting capital
+        end_cap (float): Ending capital
+        precision (int, optional): Decimal places. Defaults to 2.
+
+    Returns:
+        float: Percent change
+    """
+    return round(((end_cap - start_cap) / start_cap) * 100, precision)
+
+
+def simulate_portfolio(
+    close: np.ndarray,
+    positions: np.ndarray,
+    starting_capital: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Runs the capital path for a days x tickers panel of positions
+    sharing one pot of cash. Capital is split into one slot per
+    ticker: on a given day, sells are settled first and then every
+    ticker that flips long gets cash / (number of tickers not held).
+    With a single ticker this is the same all in / all out sizing as
+    simulate_trades.
+
+    Only days with at least one trade are walked; positions and
+    cash are then forward filled to get the daily equity curve.
+    Positions opened on the first day are not counted as trades,
+    like in SMACrossBackTester.
+
+    Args:
+        close (np.ndarray): Close prices, days x tickers. Prices may be
+                            NaN before a ticker starts trading.
+        positions (np.ndarray): Output of sma_cross_positions() on the panel.
+        starting_capital (float): Starting capital.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Daily equity,
+            number of trades per ticker, PnL per ticker (realized plus
+            unrealized at the last close) and a days x tickers array of
+            trades (1 buy, -1 sell, 0 nothing).
+    """
+    num_days, num_tickers = close.shape
+    trades = np.zeros(close.shape, dtype=np.int8)
+    trades[0][positions[0]] = 1
+    changed = positions[1:] != positions[:-1]
+    trades[1:][changed & positions[1:]] = 1
+    trades[1:][changed & ~positions[1:]] = -1
+
+    trade_days = np.flatnonzero((trades != 0).any(axis=1))
+    shares = np.zeros((num_days, num_tickers))
+    cash = np.zeros(num_days)
+
+    held = np.zeros(num_tickers)
+    cost_basis = np.zeros(num_tickers)
+    pnl = np.zeros(num_tickers)
+    capital = starting_capital
+    for day in trade_days:
+        sells = trades[day] == -1
+        proceeds = held[sells] * close[day, sells]
+        capital += proceeds.sum()
+        pnl[sells] += proceeds - cost_basis[sells]
+        held[sells] = 0
+        cost_basis[sells] = 0
+
+        buys = trades[day] == 1
+        if buys.any():
+            allocation = capital / np.count_nonzero(held == 0)
+            held[buys] = allocation / close[day, buys]
+            cost_basis[buys] = allocation
+            capital -= allocation * np.count_nonzero(buys)
+
+        shares[day] = held
+        cash[day] = capital
+
+    if not trades[0].any():
+        cash[0] = starting_capital
+    is_snapshot = np.zeros(num_days, dtype=bool)
+    is_snapshot[trade_days] = True
+    is_snapshot[0] = True
+    last_snapshot = last_true_idx(is_snapshot)
+
+    # Carry the last known price over days a ticker did not trade.
+    filled_close = np.take_along_axis(close, last_true_idx(~np.isnan(close)), axis=0)
+    holdings = np.nan_to_num(shares[last_snapshot] * filled_close)
+    equity = cash[last_snapshot] + holdings.sum(axis=1)
+
+    pnl += holdings[-1] - cost_basis
+    return equity, np.count_nonzero(trades[1:], axis=0), pnl, trades
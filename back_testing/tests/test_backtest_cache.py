@@ -0,0 +1,118 @@
+from algo_trading.config.controllers import KeyValueController
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.repositories.key_val_repository import KeyValueRepository
+
+from back_testing.src.cache import BackTestCache, build_cache_key
+from back_testing.src.controllers import (
+    BackTestCacheController,
+    BackTestEngine,
+    BackTestOptions,
+    BackTestPayload,
+)
+
+"""
+Functions tested in this module:
+- build_cache_key()
+- LRUBackTestCache.get()
+- LRUBackTestCache.set()
+- RedisBackTestCache.set()
+"""
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="test_backtest_cache",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+
+class TestBuildCacheKey:
+    """
+    Tests which payload changes lead to a new key.
+    """
+
+    payload = BackTestPayload(
+        ticker="AAPL",
+        strategy=BackTestOptions.sma_cross,
+        start_date="2004-01-02",
+        end_date="2010-12-31",
+    )
+
+    def test_same_payload_same_key(self):
+        assert build_cache_key(self.payload, "2010-12-31") == build_cache_key(
+            self.payload.copy(), "2010-12-31"
+        )
+
+    def test_engine_not_in_key(self):
+        iterative = self.payload.copy(update={"engine": BackTestEngine.iterative})
+        assert build_cache_key(self.payload, "2010-12-31") == build_cache_key(
+            iterative, "2010-12-31"
+        )
+
+    def test_new_data_invalidates(self):
+        """
+        Appending rows to the ticker's table moves the data
+        version and therefore the key.
+        """
+        assert build_cache_key(self.payload, "2010-12-31") != build_cache_key(
+            self.payload, "2011-01-03"
+        )
+
+    def test_parameters_in_key(self):
+        more_capital = self.payload.copy(update={"starting_capital": 2000})
+        key = build_cache_key(self.payload, "2010-12-31")
+        assert key != build_cache_key(more_capital, "2010-12-31")
+        assert key.startswith("backtest:sma_cross:AAPL:2010-12-31:")
+
+
+class TestLRUBackTestCache:
+    """
+    Tests the in-process LRU backend.
+    """
+
+    def _cache(self, max_size: int):
+        return BackTestCache(
+            {"max_size": max_size},
+            BackTestCacheController.memory,
+            LOG_INFO,
+        ).handler
+
+    def test_miss_then_hit(self):
+        cache = self._cache(2)
+        assert cache.get("a") is None
+        cache.set("a", {"summary": {"final_cap": 1.0}})
+        assert cache.get("a") == {"summary": {"final_cap": 1.0}}
+
+    def test_evicts_least_recently_used(self):
+        cache = self._cache(2)
+        cache.set("a", {})
+        cache.set("b", {})
+        cache.get("a")
+        cache.set("c", {})
+
+        assert cache.get("a") == {}
+        assert cache.get("b") is None
+        assert cache.get("c") == {}
+
+
+class TestRedisBackTestCache:
+    def test_entries_expire(self):
+        kv = KeyValueRepository({}, KeyValueController.fake, LOG_INFO).handler
+        expiries = {}
+        set_value = kv.set
+
+        def _set(key, value, ex=None):
+            expiries[key] = ex
+            set_value(key, value, ex)
+
+        kv.set = _set
+        cache = BackTestCache(
+            {"redis_info": {}, "ttl": "3600"},
+            BackTestCacheController.redis,
+            LOG_INFO,
+        ).handler
+        cache._kv_repo = kv
+
+        cache.set("a", {"summary": {}})
+        assert cache.get("a") == {"summary": {}}
+        assert expiries == {"a": 3600}
@@ -0,0 +1,174 @@
+import time
+from threading import Event, Lock, Thread
+
+import pandas as pd
+
+from algo_trading.config.controllers import (
+    ColumnController,
+    DBHandlerController,
+    KeyValueController,
+)
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.repositories.key_val_repository import KeyValueRepository
+
+from back_testing.src.jobs import JobQueue
+from back_testing.src.sma_cross_backtest import SMACrossBackTester
+from back_testing.src.controllers import (
+    BackTestJob,
+    BackTestOptions,
+    BackTestPayload,
+    JobQueueController,
+    JobStatusController,
+)
+
+"""
+Functions tested in this module:
+- LocalJobQueue.submit()
+- LocalJobQueue.get()
+- RedisJobQueue.submit()
+- RedisJobQueue.work()
+"""
+
+RAW_DATA = pd.read_csv("./sample_data/backtest_sample_data.csv")
+RAW_DATA[ColumnController.date.value] = pd.to_datetime(
+    RAW_DATA[ColumnController.date.value],
+)
+
+DB_INFO = {"data": RAW_DATA}
+LOG, LOG_INFO = get_main_logger(
+    log_name="test_backtest_jobs",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+PAYLOAD = BackTestPayload(ticker="AAPL", strategy=BackTestOptions.sma_cross)
+
+
+def _run(payload, progress):
+    summary, trade_book = SMACrossBackTester(
+        payload=payload,
+        db_info=DB_INFO,
+        db_handler=DBHandlerController.fake,
+        log=LOG,
+        log_info=LOG_INFO,
+    ).test(progress)
+    return {"summary": summary.dict(), "trade_book": trade_book}
+
+
+def _fail(payload, progress):
+    progress(0.5)
+    raise ValueError("no data")
+
+
+def _wait(queue, job_id: str, timeout: float = 30) -> BackTestJob:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job.status in (JobStatusController.finished, JobStatusController.failed):
+            return job
+        time.sleep(0.05)
+    raise TimeoutError(job_id)
+
+
+class TestLocalJobQueue:
+    """
+    Tests the in-process job queue.
+    """
+
+    def _queue(self, runner, **queue_info):
+        return JobQueue(
+            {"max_workers": 2, **queue_info},
+            JobQueueController.local,
+            runner,
+            LOG_INFO,
+        ).handler
+
+    def test_finished_job_has_result(self):
+        queue = self._queue(_run)
+        job = queue.submit(PAYLOAD)
+        assert job.status == JobStatusController.pending
+
+        job = _wait(queue, job.job_id)
+        expected = _run(PAYLOAD, lambda _: None)
+
+        assert job.status == JobStatusController.finished
+        assert job.progress == 1.0
+        assert job.result["summary"] == expected["summary"]
+        assert job.error is None
+
+    def test_failed_job_has_error(self):
+        queue = self._queue(_fail)
+        job = _wait(queue, queue.submit(PAYLOAD).job_id)
+
+        assert job.status == JobStatusController.failed
+        assert job.progress == 0.5
+        assert job.result is None
+        assert job.error == "no data"
+
+    def test_unknown_job(self):
+        assert self._queue(_run).get("missing") is None
+
+    def test_finished_jobs_are_bounded(self):
+        queue = self._queue(_fail, max_finished=2)
+        job_ids = [queue.submit(PAYLOAD).job_id for _ in range(3)]
+        queue.executor.shutdown(wait=True)
+
+        # Only the latest two finished jobs are kept.
+        assert [queue.get(job_id) is None for job_id in job_ids].count(True) == 1
+        assert len(queue._jobs) == 2
+
+    def test_finished_jobs_expire(self):
+        queue = self._queue(_fail, ttl=0)
+        job_id = queue.submit(PAYLOAD).job_id
+        queue.executor.shutdown(wait=True)
+
+        assert queue.get(job_id) is None
+        assert not queue._jobs
+
+
+class TestRedisJobQueue:
+    """
+    Tests the Redis job queue against the fake key value store.
+    """
+
+    def _queue(self, kv, runner):
+        queue = JobQueue(
+            {"max_workers": 2, "redis_info": {}},
+            JobQueueController.redis,
+            runner,
+            LOG_INFO,
+        ).handler
+        queue._kv_repo = kv
+        return queue
+
+    def test_backlog_runs_once_across_workers(self):
+        kv = KeyValueRepository({}, KeyValueController.fake, LOG_INFO).handler
+        runs, lock = [], Lock()
+
+        def _count(payload, progress):
+            with lock:
+                runs.append(payload.ticker)
+            return {}
+
+        # Submitted while no worker is running.
+        submitter = self._queue(kv, _count)
+        job_ids = [submitter.submit(PAYLOAD).job_id for _ in range(6)]
+
+        stop = Event()
+        workers = [
+            Thread(target=self._queue(kv, _count).work, args=(stop, 1))
+            for _ in range(2)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            jobs = [_wait(submitter, job_id) for job_id in job_ids]
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+        assert all(job.status == JobStatusController.finished for job in jobs)
+        assert len(runs) == 6
+        assert kv.data[submitter.channel] == []
@@ -0,0 +1,236 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from algo_trading.config.controllers import ColumnController, DBHandlerController
+from algo_trading.exceptions.data_exceptions import DateNotFoundException
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.utils.calculations import Calculator
+
+from back_testing.src.controllers import (
+    BackTestOptions,
+    BackTestPayload,
+    PortfolioBackTestPayload,
+)
+from back_testing.src.portfolio_backtest import SMACrossPortfolioBackTester
+from back_testing.src.sma_cross_backtest import SMACrossBackTester
+from back_testing.src.vectorized_engine import (
+    simulate_portfolio,
+    simulate_trades,
+    sma_cross_positions,
+)
+
+"""
+Functions tested in this module:
+- sma_cross_positions() on a date x ticker panel
+- simulate_portfolio()
+- SMACrossPortfolioBackTester.__init__()
+- SMACrossPortfolioBackTester.test()
+"""
+
+RAW_DATA = pd.read_csv("./sample_data/backtest_sample_data.csv")
+RAW_DATA[ColumnController.date.value] = pd.to_datetime(
+    RAW_DATA[ColumnController.date.value],
+)
+SMA_DATA = Calculator.calculate_sma(
+    RAW_DATA.copy(deep=True), ColumnController.close.value
+)
+
+DB_INFO = {"data": RAW_DATA}
+DB_HANDLER = DBHandlerController.fake
+LOG, LOG_INFO = get_main_logger(
+    log_name="test_SMA_portfolio_backtest",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+
+def _positions(data: pd.DataFrame) -> np.ndarray:
+    return sma_cross_positions(
+        data[ColumnController.close.value].to_numpy(),
+        data[ColumnController.ma_7.value].to_numpy(),
+        data[ColumnController.ma_21.value].to_numpy(),
+        data[ColumnController.ma_50.value].to_numpy(),
+    )
+
+
+class TestVectorizedPanel:
+    """
+    Tests the panel versions of the vectorized engine.
+    """
+
+    # Second ticker lags the first by 300 days, NaN before it lists.
+    close = np.column_stack(
+        [
+            SMA_DATA[ColumnController.close.value].to_numpy(),
+            np.concatenate(
+                [
+                    np.full(300, np.nan),
+                    SMA_DATA[ColumnController.close.value].to_numpy()[:-300],
+                ]
+            ),
+        ]
+    )
+
+    def _panel_positions(self) -> np.ndarray:
+        panel = pd.DataFrame(self.close)
+        return sma_cross_positions(
+            self.close,
+            panel.rolling(7).mean().to_numpy(),
+            panel.rolling(21).mean().to_numpy(),
+            panel.rolling(50).mean().to_numpy(),
+        )
+
+    def test_panel_positions_match_single_ticker(self):
+        """
+        Each column of the panel should be evaluated exactly
+        like a single ticker.
+        """
+        positions = self._panel_positions()
+        single = _positions(SMA_DATA)
+
+        assert (positions[:, 0] == single).all()
+        assert not positions[:300, 1].any()
+        assert (positions[300:, 1] == single[:-300]).all()
+
+    def test_single_ticker_portfolio_matches_simulate_trades(self):
+        """
+        With one ticker, the slot allocation is all in / all out.
+        """
+        close = self.close[:, :1]
+        positions = self._panel_positions()[:, :1]
+        equity, num_trades, pnl, _ = simulate_portfolio(close, positions, 1000)
+        final_cap, trade_idx = simulate_trades(close[:, 0], positions[:, 0], 1000)
+
+        assert equity[-1] == final_cap
+        assert num_trades[0] == len(trade_idx)
+        assert pnl[0] == pytest.approx(final_cap - 1000)
+
+    def test_attribution_adds_up(self):
+        """
+        Per ticker PnL should add up to the portfolio PnL and
+        cash is never overspent.
+        """
+        equity, num_trades, pnl, trades = simulate_portfolio(
+            self.close, self._panel_positions(), 1000
+        )
+
+        assert equity[0] == 1000
+        assert (equity > 0).all()
+        assert pnl.sum() == pytest.approx(equity[-1] - 1000)
+        assert (num_trades == np.count_nonzero(trades[1:], axis=0)).all()
+
+
+class CalendarRepo:
+    """
+    Serves a different price history per ticker.
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+    def get_until_date(self, ticker, date):
+        return self.data[ticker]
+
+
+class TestSMACrossPortfolioBackTester:
+    """
+    Tests the portfolio backtester end to end.
+    """
+
+    def _tester(self, tickers, **kwargs) -> SMACrossPortfolioBackTester:
+        return SMACrossPortfolioBackTester(
+            payload=PortfolioBackTestPayload(
+                tickers=tickers,
+                strategy=BackTestOptions.sma_cross,
+                **kwargs,
+            ),
+            db_info=DB_INFO,
+            db_handler=DB_HANDLER,
+            log=LOG,
+            log_info=LOG_INFO,
+        )
+
+    def test_one_ticker_matches_backtester(self):
+        """
+        A portfolio of one ticker is the single ticker backtest.
+        """
+        res, trade_book, equity = self._tester(["AAPL"]).test()
+        expected, expected_trade_book = SMACrossBackTester(
+            payload=BackTestPayload(ticker="AAPL", strategy=BackTestOptions.sma_cross),
+            db_info=DB_INFO,
+            db_handler=DB_HANDLER,
+            log=LOG,
+            log_info=LOG_INFO,
+        ).test()
+
+        assert res.final_cap == expected.final_cap
+        assert res.cap_gains == expected.cap_gains
+        assert res.num_trades == expected.num_trades
+        assert res.attribution[0].contribution == expected.cap_gains
+        assert {
+            date: signals["AAPL"] for date, signals in trade_book.items()
+        } == expected_trade_book
+        assert len(equity) == len(RAW_DATA)
+
+    def test_capital_is_split_across_simultaneous_signals(self):
+        """
+        Two tickers with the same prices always trade on the same
+        days and split capital evenly, so each contributes half
+        of the gains.
+        """
+        res, _, _ = self._tester(["AAPL", "AAPL_COPY"]).test()
+        single, _, _ = self._tester(["AAPL"]).test()
+
+        assert res.final_cap == pytest.approx(single.final_cap)
+        assert res.num_trades == 2 * single.num_trades
+        for attribution in res.attribution:
+            assert attribution.contribution == pytest.approx(
+                single.cap_gains / 2, abs=0.01
+            )
+
+    def test_start_date(self):
+        """
+        Starting from a given date trims the equity curve, and
+        a start date that is not a trading day raises.
+        """
+        res, _, equity = self._tester(
+            ["AAPL"], start_date="2004-12-28", end_date="2005-03-09"
+        ).test()
+        assert res.start_date == "2004-12-28"
+        assert res.end_date == "2005-03-09"
+        assert len(equity) == 50
+
+        with pytest.raises(DateNotFoundException):
+            self._tester(["AAPL"], start_date="2004-01-01").test()
+
+    def test_duplicate_tickers(self):
+        with pytest.raises(ValueError):
+            self._tester(["AAPL", "AAPL"])
+
+    def test_unaligned_calendars(self):
+        """
+        A ticker that trades on fewer days than the others gets its
+        moving averages from its own rows, so it signals on the same
+        days it would alone.
+        """
+        sparse = RAW_DATA.iloc[::2].reset_index(drop=True)
+        repo = CalendarRepo({"AAPL": RAW_DATA, "SPARSE": sparse})
+
+        alone = self._tester(["SPARSE"])
+        alone._db_repo = repo
+        _, alone_book, _ = alone.test()
+
+        tester = self._tester(["AAPL", "SPARSE"])
+        tester._db_repo = repo
+        res, trade_book, equity = tester.test()
+
+        assert alone_book
+        assert {
+            date: signals["SPARSE"]
+            for date, signals in trade_book.items()
+            if "SPARSE" in signals
+        } == {date: signals["SPARSE"] for date, signals in alone_book.items()}
+        assert len(equity) == len(RAW_DATA)
+        assert res.attribution[1].num_trades == len(alone_book)
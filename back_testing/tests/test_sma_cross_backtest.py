@@ -1,4 +1,3 @@
-import json
 import pandas as pd
 import numpy as np
 
@@ -10,10 +9,12 @@ from algo_trading.config.controllers import (
 )
 from algo_trading.logger.default_logger import get_main_logger
 from algo_trading.logger.controllers import LogLevelController
+from algo_trading.repositories.strategy_info_repository import StrategyInfoRepository
 from algo_trading.utils.calculations import Calculator
 from algo_trading.utils.utils import dt_to_str, str_to_dt
 
 from back_testing.src.controllers import (
+    BackTestEngine,
     BackTestOptions,
     BackTestPayload,
     BackTestResult,
@@ -27,6 +28,7 @@ Functions tested in this module:
 - SMACrossBackTester._get_new_capital()
 - SMACrossBackTester._get_percent_change()
 - SMACrossBackTester.test()
+- SMACrossBackTester._test_vectorized() vs SMACrossBackTester._test_iterative()
 """
 
 RAW_DATA = pd.read_csv("./sample_data/backtest_sample_data.csv")
@@ -159,12 +161,12 @@ class TestSMACrossBackTester:
         last_status, cross_info = init_sell_tester._init_fake_key_value()
         assert last_status == StockStatusController.sell
         assert cross_info == {
-            self.ticker: json.dumps(
+            StrategyInfoRepository.key(self.ticker): StrategyInfoRepository.to_hash(
                 StrategyInfo(
                     sma_last_cross_up="2010-11-17",
                     sma_last_cross_down="2010-11-18",
                     sma_last_status=StockStatusController.sell,
-                ).dict()
+                )
             )
         }
 
@@ -192,12 +194,12 @@ class TestSMACrossBackTester:
         last_status, cross_info = init_buy_tester._init_fake_key_value()
         assert last_status == StockStatusController.buy
         assert cross_info == {
-            self.ticker: json.dumps(
+            StrategyInfoRepository.key(self.ticker): StrategyInfoRepository.to_hash(
                 StrategyInfo(
                     sma_last_cross_up="2010-10-17",
                     sma_last_cross_down="2010-10-16",
                     sma_last_status=StockStatusController.buy,
-                ).dict()
+                )
             )
         }
 
@@ -212,12 +214,12 @@ class TestSMACrossBackTester:
         last_status, cross_info = self.tester._init_fake_key_value()
         assert last_status == StockStatusController.sell
         assert cross_info == {
-            self.ticker: json.dumps(
+            StrategyInfoRepository.key(self.ticker): StrategyInfoRepository.to_hash(
                 StrategyInfo(
                     sma_last_cross_up="2003-12-31",
                     sma_last_cross_down="2004-01-01",
                     sma_last_status=StockStatusController.sell,
-                ).dict()
+                )
             )
         }
 
@@ -306,3 +308,40 @@ class TestSMACrossBackTester:
             "2010-11-17": "SELL",
             "2010-11-29": "BUY",
         }
+
+    def test_vectorized_matches_iterative(self):
+        """
+        The vectorized engine should give the exact same
+        summary and trade book as the iterative engine,
+        whether starting from max or from an arbitrary date
+        (in a bull or bear state).
+        """
+        date_ranges = [
+            ("max", "2010-12-31"),
+            ("2004-01-29", "2004-11-11"),
+            ("2004-12-28", "2005-03-09"),
+            ("2010-10-18", "2010-11-18"),
+            ("2006-03-01", "2009-06-30"),
+        ]
+        for start_date, end_date in date_ranges:
+            results = {}
+            for engine in BackTestEngine:
+                payload = BackTestPayload(
+                    ticker=self.ticker,
+                    strategy=BackTestOptions.sma_cross,
+                    start_date=start_date,
+                    end_date=end_date,
+                    engine=engine,
+                )
+                tester = SMACrossBackTester(
+                    payload=payload,
+                    db_info=DB_INFO,
+                    db_handler=DB_HANDLER,
+                    log=LOG,
+                    log_info=LOG_INFO,
+                )
+                results[engine] = tester.test()
+
+            assert (
+                results[BackTestEngine.vectorized] == results[BackTestEngine.iterative]
+            )
@@ -0,0 +1,150 @@
+import pandas as pd
+import pytest
+
+from algo_trading.config.controllers import ColumnController, DBHandlerController
+from algo_trading.exceptions.data_exceptions import DateNotFoundException
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+
+from back_testing.src.controllers import (
+    BackTestOptions,
+    BackTestPayload,
+    DateRange,
+    SMACrossWindows,
+    SweepPayload,
+)
+from back_testing.src.sma_cross_backtest import SMACrossBackTester
+from back_testing.src.sma_cross_sweep import SMACrossSweeper
+
+"""
+Functions tested in this module:
+- SMACrossSweeper.grid
+- SMACrossSweeper.run()
+"""
+
+RAW_DATA = pd.read_csv("./sample_data/backtest_sample_data.csv")
+RAW_DATA[ColumnController.date.value] = pd.to_datetime(
+    RAW_DATA[ColumnController.date.value],
+)
+
+DB_INFO = {"data": RAW_DATA}
+DB_HANDLER = DBHandlerController.fake
+LOG, LOG_INFO = get_main_logger(
+    log_name="test_SMA_sweep",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+
+class TestSMACrossSweeper:
+    """
+    Tests the parameter sweep against the single backtester.
+    """
+
+    ticker = "AAPL"
+    date_ranges = [
+        DateRange(start_date="max", end_date="2010-12-31"),
+        DateRange(start_date="2004-12-28", end_date="2009-03-09"),
+    ]
+
+    def _sweeper(self, **kwargs) -> SMACrossSweeper:
+        payload = SweepPayload(
+            ticker=self.ticker,
+            strategy=BackTestOptions.sma_cross,
+            **kwargs,
+        )
+        return SMACrossSweeper(
+            payload=payload,
+            db_info=DB_INFO,
+            db_handler=DB_HANDLER,
+            log=LOG,
+            log_info=LOG_INFO,
+        )
+
+    def test_grid_skips_invalid_windows(self):
+        """
+        Fast windows that are not shorter than the slow
+        window are not tested.
+        """
+        sweeper = self._sweeper(
+            fast_windows=[5, 21],
+            slow_windows=[10, 21],
+            filter_windows=[50, 100],
+        )
+        assert sweeper.grid == [
+            SMACrossWindows(fast_window=5, slow_window=10, filter_window=50),
+            SMACrossWindows(fast_window=5, slow_window=10, filter_window=100),
+            SMACrossWindows(fast_window=5, slow_window=21, filter_window=50),
+            SMACrossWindows(fast_window=5, slow_window=21, filter_window=100),
+        ]
+
+    def test_default_windows_match_backtester(self):
+        """
+        With the default 7/21/50 windows, each date range should
+        give the same result as SMACrossBackTester.
+        """
+        results = self._sweeper(date_ranges=self.date_ranges, max_workers=2).run()
+        assert len(results) == 2
+
+        for sweep_result in results:
+            tester = SMACrossBackTester(
+                payload=BackTestPayload(
+                    ticker=self.ticker,
+                    strategy=BackTestOptions.sma_cross,
+                    start_date=(
+                        "max"
+                        if sweep_result.result.start_date == "2004-01-02"
+                        else sweep_result.result.start_date
+                    ),
+                    end_date=sweep_result.result.end_date,
+                ),
+                db_info=DB_INFO,
+                db_handler=DB_HANDLER,
+                log=LOG,
+                log_info=LOG_INFO,
+            )
+            expected, _ = tester.test()
+            assert sweep_result.result == expected
+
+    def test_results_are_ranked(self):
+        """
+        Results come back ordered by capital gains, best first.
+        """
+        results = self._sweeper(
+            fast_windows=[5, 7, 10],
+            slow_windows=[21, 30],
+            filter_windows=[50, 100],
+            date_ranges=self.date_ranges,
+            max_workers=2,
+        ).run()
+
+        assert len(results) == 24
+        assert [res.rank for res in results] == list(range(1, 25))
+        gains = [res.result.cap_gains for res in results]
+        assert gains == sorted(gains, reverse=True)
+
+    def test_start_date_not_found(self):
+        """
+        A start date that is not a trading day fails fast.
+        """
+        sweeper = self._sweeper(
+            date_ranges=[DateRange(start_date="2004-01-01", end_date="2010-12-31")]
+        )
+        with pytest.raises(DateNotFoundException):
+            sweeper.run()
+
+    @pytest.mark.parametrize(
+        "date_range",
+        [
+            DateRange(start_date="max", end_date="1990-01-01"),
+            DateRange(start_date="2004-12-28", end_date="2004-12-01"),
+        ],
+    )
+    def test_end_date_before_start(self, date_range):
+        """
+        An end date before the first bar or the start date fails
+        fast instead of backtesting an empty range.
+        """
+        sweeper = self._sweeper(date_ranges=[date_range])
+        with pytest.raises(DateNotFoundException):
+            sweeper.run()
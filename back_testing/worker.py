@@ -0,0 +1,12 @@
+from src.implementation import LOG, JOB_QUEUE
+from src.config import JOB_QUEUE_HANDLER
+from src.controllers import JobQueueController
+
+if __name__ == "__main__":
+    if JOB_QUEUE_HANDLER != JobQueueController.redis:
+        raise SystemExit(
+            "The local job queue runs inside the API process, "
+            "set JOB_QUEUE_HANDLER=redis to run a separate worker."
+        )
+    LOG.info("Starting backtest worker.")
+    JOB_QUEUE.work()
@@ -0,0 +1,87 @@
+"""
+Benchmarks PostgresRepository.append_df_to_sql with DataFrame.to_sql
+INSERTs against COPY FROM STDIN, with and without the staging table
+upsert, on sample_data/repository_sample_data.csv.
+
+Needs a running Postgres, configured with the same POSTGRES_* env
+vars as the DAGs. Run from the repo root:
+
+    python benchmarks/bench_bulk_load.py --repeat 3
+"""
+from argparse import ArgumentParser
+from os import getenv
+from time import perf_counter
+import pandas as pd
+from dotenv import load_dotenv
+
+from algo_trading.config.controllers import BulkLoadController, ColumnController
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.repositories.db_repository import PostgresRepository
+
+load_dotenv()
+
+SAMPLE_DATA = "./sample_data/repository_sample_data.csv"
+BENCH_TABLE = "bench_bulk_load"
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="bench_bulk_load",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+
+def _reset_table(repo: PostgresRepository) -> None:
+    with repo.db_engine.begin() as conn:
+        conn.execute(repo.queries.drop_table.format(table=BENCH_TABLE))
+    repo.create_new_ticker_tables([BENCH_TABLE])
+
+
+def _time_load(
+    repo: PostgresRepository,
+    df: pd.DataFrame,
+    method: BulkLoadController,
+    upsert: bool,
+) -> float:
+    _reset_table(repo)
+    if upsert:
+        # Upserting over a full table is the re-run case we care about.
+        repo.append_df_to_sql(BENCH_TABLE, df, method=BulkLoadController.copy)
+    start = perf_counter()
+    repo.append_df_to_sql(BENCH_TABLE, df, method=method, upsert=upsert)
+    elapsed = perf_counter() - start
+
+    rows = repo.get_all(BENCH_TABLE)
+    assert len(rows) == len(df), f"Expected {len(df)} rows, found {len(rows)}"
+    return elapsed
+
+
+def main(repeat: int) -> None:
+    df = pd.read_csv(SAMPLE_DATA)[ColumnController.df_columns()]
+    repo = PostgresRepository(
+        {
+            "host": getenv("POSTGRES_HOST"),
+            "db_name": getenv("POSTGRES_DB"),
+            "user": getenv("POSTGRES_USER"),
+            "password": getenv("POSTGRES_PASSWORD"),
+            "port": getenv("POSTGRES_PORT"),
+        },
+        LOG_INFO,
+    )
+
+    print(f"Loading {len(df)} rows, best of {repeat}:")
+    try:
+        for method in BulkLoadController:
+            for upsert in (False, True):
+                best = min(_time_load(repo, df, method, upsert) for _ in range(repeat))
+                label = f"{method.value}{' + upsert' if upsert else ''}"
+                print(f"  {label:<16} {best:8.3f}s  {len(df) / best:>10,.0f} rows/s")
+    finally:
+        with repo.db_engine.begin() as conn:
+            conn.execute(repo.queries.drop_table.format(table=BENCH_TABLE))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmarks to_sql vs COPY bulk loading.")
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args().repeat)
@@ -0,0 +1,198 @@
+"""
+Benchmarks the indicator calculations, the SMA cross scans, the
+back tester, FakeDBRepository queries and clean_df over the sample
+data and synthetic data of increasing size. Needs no services.
+
+Run from the repo root, optionally comparing with an earlier run:
+
+    python -m benchmarks.bench_engine --rows 10000,100000,1000000 \\
+        --output bench_engine.json --baseline bench_engine_before.json
+
+The iterative back tester and the row by row SMA checks are only
+run on datasets of up to 10k rows.
+"""
+import logging
+import sys
+from argparse import ArgumentParser
+from typing import Callable, Dict
+
+import pandas as pd
+
+from algo_trading.config.controllers import (
+    ColumnController,
+    DBHandlerController,
+    StrategyInfo,
+)
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.repositories.data_repository import RAW_COLUMNS
+from algo_trading.repositories.db_repository import DBRepository
+from algo_trading.strategies.sma_cross_strat import SMACrossUtils
+from algo_trading.utils.calculations import Calculator
+from algo_trading.utils.utils import clean_df, dt_to_str
+
+from back_testing.src.controllers import (
+    BackTestEngine,
+    BackTestOptions,
+    BackTestPayload,
+)
+from back_testing.src.sma_cross_backtest import SMACrossBackTester
+
+from benchmarks.harness import (
+    BENCHMARKS,
+    benchmark,
+    compare,
+    load,
+    print_comparison,
+    run,
+    synthetic_prices,
+    write,
+)
+
+SAMPLE_DATA = {
+    "backtest_sample": "./sample_data/backtest_sample_data.csv",
+    "repository_sample": "./sample_data/repository_sample_data.csv",
+}
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="bench_engine",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+# The back tester logs every run, which would drown the timings.
+LOG.setLevel(logging.WARNING)
+
+CLOSE = ColumnController.close.value
+DATE = ColumnController.date.value
+
+
+@benchmark("calculate_sma")
+def _calculate_sma(df: pd.DataFrame) -> Callable:
+    return lambda: Calculator.calculate_sma(df, CLOSE)
+
+
+@benchmark("calculate_ema")
+def _calculate_ema(df: pd.DataFrame) -> Callable:
+    return lambda: Calculator.calculate_ema(
+        df, CLOSE, ColumnController.ema_calculations()
+    )
+
+
+@benchmark("calculate_macd_signal")
+def _calculate_macd_signal(df: pd.DataFrame) -> Callable:
+    df = Calculator.calculate_ema(df, CLOSE, ColumnController.ema_calculations())
+    return lambda: Calculator.calculate_macd_signal(
+        df, ColumnController.ema_12.value, ColumnController.ema_26.value
+    )
+
+
+@benchmark("sma_backfill_cross_info")
+def _sma_backfill(df: pd.DataFrame) -> Callable:
+    df = Calculator.calculate_sma(df, CLOSE)
+    return lambda: SMACrossUtils.backfill_cross_info(df, StrategyInfo())
+
+
+@benchmark("sma_check_cross", max_rows=10_000)
+def _sma_check_cross(df: pd.DataFrame) -> Callable:
+    df = Calculator.calculate_sma(df, CLOSE)
+
+    def scan():
+        cross_info = StrategyInfo()
+        for idx in range(1, len(df)):
+            cross_info = SMACrossUtils.check_cross_up(df, idx, cross_info)
+            cross_info = SMACrossUtils.check_cross_down(df, idx, cross_info)
+        return cross_info
+
+    return scan
+
+
+def _backtester(df: pd.DataFrame, engine: BackTestEngine) -> Callable:
+    end_date = dt_to_str(df[DATE].iloc[-1])
+
+    def test():
+        payload = BackTestPayload(
+            ticker="BENCH",
+            strategy=BackTestOptions.sma_cross,
+            end_date=end_date,
+            engine=engine,
+        )
+        return SMACrossBackTester(
+            payload, {"data": df}, DBHandlerController.fake, LOG, LOG_INFO
+        ).test()
+
+    return test
+
+
+@benchmark("backtest_vectorized")
+def _backtest_vectorized(df: pd.DataFrame) -> Callable:
+    return _backtester(df, BackTestEngine.vectorized)
+
+
+@benchmark("backtest_iterative", max_rows=10_000, max_repeat=1)
+def _backtest_iterative(df: pd.DataFrame) -> Callable:
+    return _backtester(df, BackTestEngine.iterative)
+
+
+@benchmark("fake_db_queries")
+def _fake_db_queries(df: pd.DataFrame) -> Callable:
+    repo = DBRepository({"data": df}, DBHandlerController.fake, LOG_INFO).handler
+    dates = df[DATE].dt.normalize()
+    start = dt_to_str(dates.iloc[len(df) // 4])
+    end = dt_to_str(dates.iloc[3 * len(df) // 4])
+
+    def queries():
+        repo.get_since_date("BENCH", start)
+        repo.get_until_date("BENCH", end)
+        repo.get_dates_between("BENCH", start, end)
+        return repo.get_row_num("BENCH")
+
+    return queries
+
+
+@benchmark("clean_df")
+def _clean_df(df: pd.DataFrame) -> Callable:
+    # Raw headers as the data repositories return them, with a
+    # duplicated tail to drop.
+    raw = df[ColumnController.df_columns()]
+    raw = pd.concat([raw, raw.tail(len(raw) // 100)], ignore_index=True)
+    raw.columns = RAW_COLUMNS
+    return lambda: clean_df(raw.copy(deep=False))
+
+
+def load_datasets(rows: str) -> Dict[str, pd.DataFrame]:
+    datasets = {}
+    for name, path in SAMPLE_DATA.items():
+        df = pd.read_csv(path, parse_dates=[DATE])
+        datasets[name] = df[ColumnController.df_columns()]
+    for size in [int(r) for r in rows.split(",") if r]:
+        datasets[f"synthetic_{size}"] = synthetic_prices(size)
+    return datasets
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmarks the strategy engine.")
+    parser.add_argument(
+        "--rows",
+        default="10000,100000,1000000",
+        help="Comma separated synthetic dataset sizes, e.g. 10000,10000000.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--only", default="", help="Comma separated benchmark names to run."
+    )
+    parser.add_argument("--output", help="File to write the results to as JSON.")
+    parser.add_argument("--baseline", help="Earlier results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    only = [name for name in args.only.split(",") if name]
+    benchmarks = [b for name, b in BENCHMARKS.items() if not only or name in only]
+    results = run(benchmarks, load_datasets(args.rows), args.repeat)
+    if args.output:
+        write(results, args.output)
+
+    if args.baseline:
+        print()
+        rows = compare(load(args.baseline), results, args.threshold)
+        print_comparison(rows)
+        sys.exit(1 if any(row["regression"] for row in rows) else 0)
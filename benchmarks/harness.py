@@ -0,0 +1,244 @@
+"""
+Small benchmark harness: times registered scenarios over datasets
+of increasing size, writes the results to JSON and compares a run
+against a baseline to catch regressions.
+
+Compare two result files from the repo root:
+
+    python -m benchmarks.harness baseline.json current.json --threshold 0.1
+"""
+import json
+import platform
+import statistics
+import sys
+from argparse import ArgumentParser
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from algo_trading.config.controllers import ColumnController
+
+
+class Benchmark:
+    def __init__(
+        self,
+        name: str,
+        setup: Callable[[pd.DataFrame], Callable[[], Any]],
+        max_rows: Optional[int] = None,
+        max_repeat: Optional[int] = None,
+    ) -> None:
+        """A scenario to time.
+
+        Args:
+            name (str): Unique name, the key in the results.
+            setup (Callable[[pd.DataFrame], Callable[[], Any]]): Given a price
+                dataset, does the untimed preparation and returns the call to time.
+            max_rows (Optional[int], optional): Larger datasets are skipped, for
+                scenarios that would take minutes. Defaults to None.
+            max_repeat (Optional[int], optional): Caps the repeats of slow
+                scenarios. Defaults to None.
+        """
+        self.name = name
+        self.setup = setup
+        self.max_rows = max_rows
+        self.max_repeat = max_repeat
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(
+    name: str, max_rows: Optional[int] = None, max_repeat: Optional[int] = None
+) -> Callable:
+    """Registers a setup function as a Benchmark.
+
+    Args:
+        name (str): Benchmark name.
+        max_rows (Optional[int], optional): See Benchmark. Defaults to None.
+        max_repeat (Optional[int], optional): See Benchmark. Defaults to None.
+
+    Returns:
+        Callable: Decorator returning the setup function unchanged.
+    """
+
+    def register(setup: Callable) -> Callable:
+        if name in BENCHMARKS:
+            raise ValueError(f"Benchmark {name} already exists.")
+        BENCHMARKS[name] = Benchmark(name, setup, max_rows, max_repeat)
+        return setup
+
+    return register
+
+
+def synthetic_prices(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Price data following a geometric Brownian motion, in the
+    df_columns() schema and ASCENDING order by date.
+
+    Rows are days from 1700 while they fit in the range pandas
+    timestamps can hold, and minutes beyond that, starting at midnight
+    so every day still has a row at midnight for the date lookups.
+
+    Args:
+        rows (int): Number of rows.
+        seed (int, optional): Generator seed. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: Synthetic prices.
+    """
+    rng = np.random.default_rng(seed)
+    freq = "D" if rows <= 100_000 else "min"
+    close = 100 * np.exp(np.cumsum(0.0003 + 0.02 * rng.standard_normal(rows)))
+    spread = np.abs(0.01 * rng.standard_normal(rows)) * close
+    return pd.DataFrame(
+        {
+            ColumnController.date.value: pd.date_range(
+                "1700-01-01", periods=rows, freq=freq
+            ),
+            ColumnController.open.value: close + spread / 2,
+            ColumnController.high.value: close + spread,
+            ColumnController.low.value: close - spread,
+            ColumnController.close.value: close,
+            ColumnController.adj_close.value: close,
+            ColumnController.volume.value: rng.integers(1_000, 1_000_000, rows),
+        }
+    )
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Times fn repeat times after one untimed warm up call.
+
+    Args:
+        fn (Callable[[], Any]): Call to time.
+        repeat (int): Timed calls.
+
+    Returns:
+        Dict[str, Any]: best, median and mean seconds, and every run.
+    """
+    fn()
+    runs = []
+    for _ in range(repeat):
+        start = perf_counter()
+        fn()
+        runs.append(perf_counter() - start)
+    return {
+        "best": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.mean(runs),
+        "runs": runs,
+    }
+
+
+def run(
+    benchmarks: List[Benchmark],
+    datasets: Dict[str, pd.DataFrame],
+    repeat: int,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """Runs every benchmark over every dataset it accepts.
+
+    Args:
+        benchmarks (List[Benchmark]): Benchmarks to run.
+        datasets (Dict[str, pd.DataFrame]): Price data keyed by dataset name.
+        repeat (int): Timed calls per benchmark and dataset.
+        log (Callable[[str], None], optional): Progress output. Defaults to print.
+
+    Returns:
+        Dict[str, Any]: Run metadata and the results, one per benchmark and
+                        dataset, keyed "{benchmark}[{dataset}]".
+    """
+    results = {}
+    for bench in benchmarks:
+        for dataset, df in datasets.items():
+            if bench.max_rows is not None and len(df) > bench.max_rows:
+                continue
+            fn = bench.setup(df.copy())
+            timing = time_call(fn, min(repeat, bench.max_repeat or repeat))
+            key = f"{bench.name}[{dataset}]"
+            results[key] = {
+                "benchmark": bench.name,
+                "dataset": dataset,
+                "rows": len(df),
+                **timing,
+            }
+            log(
+                f"{key:<48} {timing['best'] * 1000:>12.3f} ms  "
+                + f"{len(df) / timing['best']:>14,.0f} rows/s"
+            )
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> List[Dict[str, Any]]:
+    """Compares the best times of the results both runs share.
+
+    Args:
+        baseline (Dict[str, Any]): Results of run() to compare against.
+        current (Dict[str, Any]): Results of run() to check.
+        threshold (float): Slowdown, as a fraction, that counts as a regression.
+
+    Returns:
+        List[Dict[str, Any]]: One row per shared result with both times,
+                              the ratio current / baseline and whether
+                              it regressed.
+    """
+    rows = []
+    for key, result in current["results"].items():
+        if key not in baseline["results"]:
+            continue
+        before = baseline["results"][key]["best"]
+        ratio = result["best"] / before if before else float("inf")
+        rows.append(
+            {
+                "key": key,
+                "baseline": before,
+                "current": result["best"],
+                "ratio": ratio,
+                "regression": ratio > 1 + threshold,
+            }
+        )
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['key']:<48} {row['baseline'] * 1000:>12.3f} ms -> "
+            + f"{row['current'] * 1000:>12.3f} ms  x{row['ratio']:.2f}{flag}"
+        )
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def write(results: Dict[str, Any], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Compares two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    rows = compare(load(args.baseline), load(args.current), args.threshold)
+    print_comparison(rows)
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
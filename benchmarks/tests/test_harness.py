@@ -0,0 +1,64 @@
+import pandas as pd
+
+from algo_trading.config.controllers import ColumnController
+
+from benchmarks.harness import Benchmark, compare, run, synthetic_prices
+
+"""
+Functions tested in this module:
+- synthetic_prices()
+- run()
+- compare()
+"""
+
+
+def _result(best: float) -> dict:
+    return {"best": best}
+
+
+class TestHarness:
+    def test_synthetic_prices(self):
+        df = synthetic_prices(1_000)
+        assert list(df.columns) == ColumnController.df_columns()
+        assert df[ColumnController.date.value].is_monotonic_increasing
+        assert (df[ColumnController.close.value] > 0).all()
+        pd.testing.assert_frame_equal(df, synthetic_prices(1_000))
+
+        # Past the daily range the rows are minutes.
+        big = synthetic_prices(200_000)
+        assert big[ColumnController.date.value].iloc[1] - big[
+            ColumnController.date.value
+        ].iloc[0] == pd.Timedelta(minutes=1)
+
+    def test_run_skips_large_datasets(self):
+        calls = []
+        benchmarks = [
+            Benchmark("all", lambda df: lambda: calls.append(("all", len(df)))),
+            Benchmark(
+                "small",
+                lambda df: lambda: calls.append(("small", len(df))),
+                max_rows=10,
+                max_repeat=1,
+            ),
+        ]
+        datasets = {"tiny": synthetic_prices(10), "big": synthetic_prices(100)}
+
+        results = run(benchmarks, datasets, repeat=2, log=lambda line: None)
+
+        assert set(results["results"]) == {"all[tiny]", "all[big]", "small[tiny]"}
+        assert len(results["results"]["all[big]"]["runs"]) == 2
+        assert results["results"]["all[big]"]["rows"] == 100
+        # One warm up call before the timed ones.
+        assert calls.count(("all", 100)) == 3
+        assert calls.count(("small", 10)) == 2
+
+    def test_compare(self):
+        baseline = {"results": {"a": _result(1.0), "b": _result(1.0)}}
+        current = {"results": {"a": _result(1.05), "b": _result(1.5), "c": _result(1)}}
+
+        rows = {row["key"]: row for row in compare(baseline, current, 0.1)}
+
+        assert set(rows) == {"a", "b"}
+        assert not rows["a"]["regression"]
+        assert rows["b"]["regression"]
+        assert rows["b"]["ratio"] == 1.5
@@ -2,7 +2,9 @@ from os import getenv
 from dotenv import load_dotenv
 import yaml
 
-from algo_trading.config.controllers import Config
+from algo_trading.config.controllers import Config, DataHandlerController
+from algo_trading.utils.instrumentation import INSTRUMENTATION
+from algo_trading.repositories.connection_registry import CONNECTIONS
 
 
 load_dotenv()
@@ -30,6 +32,36 @@ DB_NAME = getenv("POSTGRES_DB")
 DB_USER = getenv("POSTGRES_USER")
 DB_PASSWORD = getenv("POSTGRES_PASSWORD")
 
+# Loading in local price cache info
+PRICE_CACHE_DIR = getenv("PRICE_CACHE_DIR")
+
+# Loading in raw data response cache info. Setting RESPONSE_CACHE_OFFLINE
+# replays the DAGs from the cache without hitting the data provider.
+RESPONSE_CACHE_DIR = getenv("RESPONSE_CACHE_DIR")
+RESPONSE_CACHE_OFFLINE = getenv("RESPONSE_CACHE_OFFLINE", "false").lower() == "true"
+
+# Opt-in timing of every repository call and DAG step. Each DAG
+# uploads a JSON report beside its log. Enabled before any handler
+# is built, since handlers are only wrapped when it is on.
+INSTRUMENT = getenv("INSTRUMENT", "false").lower() == "true"
+INSTRUMENTATION.enable(INSTRUMENT)
+
+# Connection pool settings shared by every handler of the process.
+# Configured before any handler is built, since pools are created
+# with the settings current at the time.
+DB_POOL_SIZE = getenv("DB_POOL_SIZE", "5")
+DB_MAX_OVERFLOW = getenv("DB_MAX_OVERFLOW", "10")
+DB_PRE_PING = getenv("DB_PRE_PING", "true").lower() == "true"
+HEALTH_CHECK_INTERVAL = getenv("HEALTH_CHECK_INTERVAL", "30")
+REDIS_MAX_CONNECTIONS = getenv("REDIS_MAX_CONNECTIONS", "0")
+CONNECTIONS.configure(
+    pool_size=int(DB_POOL_SIZE),
+    max_overflow=int(DB_MAX_OVERFLOW),
+    pre_ping=DB_PRE_PING,
+    health_check_interval=float(HEALTH_CHECK_INTERVAL),
+    redis_max_connections=int(REDIS_MAX_CONNECTIONS),
+)
+
 # Loading in IN MEMORY info
 KV_HOST = getenv("REDIS_HOST")
 KV_PORT = getenv("REDIS_PORT")
@@ -51,6 +83,21 @@ DB_INFO = {
     "password": DB_PASSWORD,
     "port": DB_PORT,
 }
+PRICE_CACHE_INFO = {"cache_dir": PRICE_CACHE_DIR} if PRICE_CACHE_DIR else None
+RESPONSE_CACHE_INFO = (
+    {
+        "cache_dir": RESPONSE_CACHE_DIR,
+        "offline": RESPONSE_CACHE_OFFLINE,
+        **CONFIG.response_cache,
+    }
+    if RESPONSE_CACHE_DIR
+    else None
+)
+# Extra kwargs for every data repo instance. Only the network
+# handlers know about the response cache.
+DATA_REPO_INFO = dict(CONFIG.data_repo_info)
+if RESPONSE_CACHE_INFO and CONFIG.data_repo == DataHandlerController.yahoo_finance:
+    DATA_REPO_INFO["cache_info"] = RESPONSE_CACHE_INFO
 KV_INFO = {
     "host": KV_HOST,
     "port": KV_PORT,
@@ -65,3 +112,6 @@ OBJ_STORE_INFO = {
 }
 
 DATE_FORMAT = "%Y-%m-%d"
+
+# Key value store key for each ticker's IndicatorState
+INDICATOR_KEY = "indicators:{ticker}"
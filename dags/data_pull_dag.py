@@ -5,20 +5,34 @@ import pandas as pd
 
 from algo_trading.logger.default_logger import get_main_logger
 from algo_trading.logger.controllers import LogLevelController
-from algo_trading.repositories.data_repository import DataRepository
+from algo_trading.repositories.data_repository import get_stock_data_many
 from algo_trading.repositories.db_repository import DBRepository
+from algo_trading.repositories.key_val_repository import KeyValueRepository
 from algo_trading.repositories.obj_store_repository import ObjStoreRepository
 from algo_trading.config.controllers import (
+    BulkLoadController,
     ColumnController,
     DBHandlerController,
+    IndicatorState,
+    KeyValueController,
     ObjStoreController,
 )
+from algo_trading.utils.calculations import Calculator
+from algo_trading.utils.instrumentation import (
+    INSTRUMENTATION,
+    report_path,
+    timed,
+)
 from algo_trading.utils.utils import clean_df, str_to_dt, dt_to_str
 
 from config import (
     DB_INFO,
+    KV_INFO,
     DATE_FORMAT,
+    INDICATOR_KEY,
     OBJ_STORE_INFO,
+    DATA_REPO_INFO,
+    PRICE_CACHE_INFO,
     CONFIG,
     LOG_BUCKET,
     LOG_KEY,
@@ -37,6 +51,21 @@ DB_HANDLER = DBRepository(
     LOG_INFO,
 ).handler
 
+# Full history reads go through the local price cache when PRICE_CACHE_DIR
+# is set, writes always go straight to DB_HANDLER.
+DB_READER = DBRepository(
+    DB_INFO,
+    DBHandlerController[CONFIG.db_repo],
+    LOG_INFO,
+    PRICE_CACHE_INFO,
+).handler
+
+KV_HANDLER = KeyValueRepository(
+    KV_INFO,
+    KeyValueController[CONFIG.kv_repo],
+    LOG_INFO,
+).handler
+
 OBJ_STORE_HANDLER = ObjStoreRepository(
     OBJ_STORE_INFO,
     ObjStoreController[CONFIG.obj_store_repo],
@@ -44,6 +73,7 @@ OBJ_STORE_HANDLER = ObjStoreRepository(
 ).handler
 
 
+@timed
 def create_bucket(bucket_name: str) -> None:
     """Creates bucket if not exists.
 
@@ -56,6 +86,7 @@ def create_bucket(bucket_name: str) -> None:
         OBJ_STORE_HANDLER.create_bucket(bucket_name)
 
 
+@timed
 def create_new_tables(tickers: List) -> List:
     """
     Initializes the config DBInterface instance and creates new tables
@@ -68,6 +99,7 @@ def create_new_tables(tickers: List) -> List:
     return new_tickers
 
 
+@timed
 def get_new_ticker_data(
     data_handler: str,
     new_tickers: List,
@@ -86,16 +118,22 @@ def get_new_ticker_data(
     """
     new_ticker_data = dict()
     data_pull_params = {
-        "start_date": "max",
-        "end_date": dt_to_str(datetime.today()),
-        "log_info": LOG_INFO,
+        ticker: {
+            "ticker": ticker,
+            "start_date": "max",
+            "end_date": dt_to_str(datetime.today()),
+            "log_info": LOG_INFO,
+            **DATA_REPO_INFO,
+        }
+        for ticker in new_tickers
     }
 
-    for ticker in new_tickers:
-        data_pull_params["ticker"] = ticker
-        stock_df = DataRepository(
-            data_pull_params, data_handler
-        ).handler.get_stock_data()
+    pulled = get_stock_data_many(
+        data_pull_params, data_handler, CONFIG.data_pull_workers
+    )
+    for ticker, stock_df in pulled.items():
+        if len(stock_df) == 0:
+            continue
         stock_df = clean_df(stock_df)
         stock_df = stock_df.sort_values([ColumnController.date.value], ascending=True)
 
@@ -103,17 +141,26 @@ def get_new_ticker_data(
     return new_ticker_data
 
 
-def persist_ticker_data(ticker_data: Dict[str, pd.DataFrame]) -> None:
+@timed
+def persist_ticker_data(
+    ticker_data: Dict[str, pd.DataFrame], upsert: bool = False
+) -> None:
     """
-    Slaps the historical data from pd.DataFrame into the DB.
+    Slaps the historical data from pd.DataFrame into the DB
+    with COPY FROM STDIN.
 
     Args:
         ticker_data (Dict): Data to be loaded to the DB
+        upsert (bool, optional): Replace rows for dates that are
+            already loaded, so re-runs are idempotent. Defaults to False.
     """
     for ticker, df in ticker_data.items():
-        DB_HANDLER.append_df_to_sql(ticker, df)
+        DB_HANDLER.append_df_to_sql(
+            ticker, df, method=BulkLoadController.copy, upsert=upsert
+        )
 
 
+@timed
 def get_existing_ticker_data(
     data_handler: str,
     tickers: List,
@@ -135,9 +182,15 @@ def get_existing_ticker_data(
         Dict: Existing data with key: ticker, val: pd.DataFrame
     """
     updated_ticker_data = dict()
+    pulled_ticker_data = dict()
+
+    existing_tickers = [t for t in tickers if t not in new_tickers]
+    last_date_entries = DB_HANDLER.get_most_recent_dates(existing_tickers)
 
-    for ticker in [t for t in tickers if t not in new_tickers]:
-        last_date_entry_str = DB_HANDLER.get_most_recent_date(ticker)
+    data_pull_params = dict()
+    query_dates = dict()
+    for ticker in existing_tickers:
+        last_date_entry_str = last_date_entries[ticker]
         last_date_entry = str_to_dt(last_date_entry_str)
 
         query_date = last_date_entry + timedelta(days=1)
@@ -158,19 +211,23 @@ def get_existing_ticker_data(
 
         LOG.info(f"Pulling {ticker} from {query_date_str} to {end_date_str}")
 
-        data_pull_params = {
+        query_dates[ticker] = query_date
+        data_pull_params[ticker] = {
             "ticker": ticker,
             "start_date": query_date_str,
             "end_date": end_date_str,
             "log_info": LOG_INFO,
+            **DATA_REPO_INFO,
         }
 
-        stock_df = DataRepository(
-            data_pull_params, data_handler
-        ).handler.get_stock_data()
+    pulled = get_stock_data_many(
+        data_pull_params, data_handler, CONFIG.data_pull_workers
+    )
+    for ticker, stock_df in pulled.items():
         if len(stock_df) == 0:
             continue
 
+        query_date = query_dates[ticker]
         stock_df = clean_df(stock_df)
         stock_df = stock_df.sort_values([ColumnController.date.value], ascending=True)
         stock_df_first_date = stock_df[ColumnController.date.value][0]
@@ -181,7 +238,7 @@ def get_existing_ticker_data(
         if str_to_dt(stock_df_first_date) < query_date:
             LOG.error(
                 f"First date of stock_df {stock_df_first_date} is "
-                + f"less than query date: {query_date_str} for {ticker}"
+                + f"less than query date: {dt_to_str(query_date)} for {ticker}"
             )
             continue
 
@@ -190,9 +247,14 @@ def get_existing_ticker_data(
             + f"{stock_df[ColumnController.date.value].iloc[0]}"
             + f" -> {stock_df[ColumnController.date.value].iloc[-1]}"
         )
+        pulled_ticker_data[ticker] = stock_df
+
+    # Getting rows 199 days back from the earliest row of each DF
+    hist_ticker_data = DB_HANDLER.get_days_back_many(list(pulled_ticker_data), 199)
 
-        # Getting rows 199 days back from the earliest row of the DF
-        hist_df = DB_HANDLER.get_days_back(ticker, 199)
+    for ticker, stock_df in pulled_ticker_data.items():
+        stock_df_first_date = stock_df[ColumnController.date.value][0]
+        hist_df = hist_ticker_data[ticker]
         full_df = pd.concat([hist_df, stock_df], axis=0).reset_index(drop=True)
         full_df[ColumnController.date.value] = pd.to_datetime(
             full_df[ColumnController.date.value]
@@ -204,14 +266,106 @@ def get_existing_ticker_data(
     return updated_ticker_data
 
 
+@timed
+def update_indicator_state(
+    new_ticker_data: Dict[str, pd.DataFrame],
+    existing_ticker_data: Dict[str, pd.DataFrame],
+) -> None:
+    """
+    Keeps each ticker's IndicatorState in the KV store up to date
+    with the rows just persisted. New tickers are initialized from
+    their full history, existing tickers are advanced one bar at a
+    time so the daily cost does not depend on the history length.
+
+    Args:
+        new_ticker_data (Dict[str, pd.DataFrame]): Full history of new tickers.
+        existing_ticker_data (Dict[str, pd.DataFrame]): New rows of existing tickers.
+    """
+    close_col = ColumnController.close.value
+    date_col = ColumnController.date.value
+
+    with KV_HANDLER.pipeline() as kv:
+        for ticker, df in new_ticker_data.items():
+            df = df.copy()
+            df[date_col] = pd.to_datetime(df[date_col])
+            state = Calculator.init_indicator_state(df, close_col)
+            kv.set(INDICATOR_KEY.format(ticker=ticker), state.dict())
+            LOG.info(f"Initialized indicator state for {ticker} as of {state.date}")
+
+        kv.mget([INDICATOR_KEY.format(ticker=t) for t in existing_ticker_data])
+        for ticker, df in existing_ticker_data.items():
+            state = kv.get(INDICATOR_KEY.format(ticker=ticker))
+            if state is None:
+                LOG.info(f"No indicator state for {ticker}, building it from the DB.")
+                state = Calculator.init_indicator_state(
+                    DB_READER.get_all(ticker), close_col
+                )
+            else:
+                state = IndicatorState.parse_raw(state)
+                for row in df.to_dict("records"):
+                    if dt_to_str(row[date_col]) > state.date:
+                        state = Calculator.advance_indicator_state(
+                            state, row[date_col], row[close_col]
+                        )
+            kv.set(INDICATOR_KEY.format(ticker=ticker), state.dict())
+            LOG.info(f"Advanced indicator state for {ticker} to {state.date}")
+
+
+@timed
+def load_ticker_frames(
+    tickers: List[str], new_tickers: List[str]
+) -> Dict[str, pd.DataFrame]:
+    """
+    Loads each ticker once for every strategy DAG, with all of the
+    indicators from Calculator.calculate_all(). New tickers get their
+    full history to backfill from, existing tickers the last two rows
+    kept in their IndicatorState, which is all the daily checks need.
+
+    Args:
+        tickers (List[str]): Tickers to load.
+        new_tickers (List[str]): New tickers, loaded in full.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Indicator frames keyed by ticker, in
+                                 ASCENDING order by date.
+    """
+    close_col = ColumnController.close.value
+    existing_tickers = [t for t in tickers if t not in new_tickers]
+    states = dict(
+        zip(
+            existing_tickers,
+            KV_HANDLER.mget([INDICATOR_KEY.format(ticker=t) for t in existing_tickers]),
+        )
+    )
+
+    ticker_frames = dict()
+    for ticker in tickers:
+        if ticker in new_tickers:
+            data = Calculator.calculate_all(DB_READER.get_all(ticker), close_col)
+        else:
+            state = states[ticker]
+            if state is None:
+                LOG.error(f"No indicator state for ticker {ticker}...")
+                continue
+            data = Calculator.indicator_frame(IndicatorState.parse_raw(state))
+
+        if len(data) == 0:
+            LOG.error(f"No data for ticker {ticker}...")
+            continue
+        ticker_frames[ticker] = data
+    return ticker_frames
+
+
 def persist_log() -> None:
-    OBJ_STORE_HANDLER.upload_file(
-        LOG_INFO.file_name,
-        LOG_BUCKET,
-        LOG_KEY.format(
-            log_name=LOG_INFO.log_name, run_date=dt_to_str(datetime.today())
-        ),
+    log_key = LOG_KEY.format(
+        log_name=LOG_INFO.log_name, run_date=dt_to_str(datetime.today())
     )
+    OBJ_STORE_HANDLER.upload_file(LOG_INFO.file_name, LOG_BUCKET, log_key)
+    if INSTRUMENTATION.enabled:
+        report_file = INSTRUMENTATION.write_report(
+            report_path(LOG_INFO.file_name), prefix=LOG_INFO.log_name
+        )
+        OBJ_STORE_HANDLER.upload_file(report_file, LOG_BUCKET, report_path(log_key))
 
 
 def finish_log() -> None:
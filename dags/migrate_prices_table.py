@@ -0,0 +1,52 @@
+import os
+from datetime import datetime
+from argparse import ArgumentParser
+
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.repositories.db_repository import DBRepository
+from algo_trading.config.controllers import DBHandlerController
+from algo_trading.utils.utils import dt_to_str
+
+from config import DB_INFO, CONFIG
+
+"""
+One off migration from the legacy table per ticker layout to the
+single prices table. Safe to re-run, rows that already exist in
+prices are skipped and the legacy tables are left in place.
+
+Once it has run, set db_repo: postgres_prices in config.yml.
+
+    python migrate_prices_table.py           # tickers in config.yml
+    python migrate_prices_table.py --all     # every table with the price columns
+"""
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="migrate_prices_table",
+    file_name=os.path.join(
+        "logs", f"migrate_prices_table_{dt_to_str(datetime.today())}.log"
+    ),
+    log_level=LogLevelController.info,
+)
+
+DB_HANDLER = DBRepository(
+    DB_INFO,
+    DBHandlerController.postgres_prices,
+    LOG_INFO,
+).handler
+
+
+def migrate(all_tables: bool) -> None:
+    tickers = None if all_tables else CONFIG.ticker_list
+    migrated = DB_HANDLER.migrate_from_legacy(tickers)
+    for ticker, rows in migrated.items():
+        LOG.info(f"{ticker}: {rows} rows -> prices")
+    LOG.info(f"Migrated {len(migrated)} ticker(s) to the prices table.")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Migrates ticker tables to prices.")
+    parser.add_argument(
+        "--all", action="store_true", help="Migrate every legacy table."
+    )
+    migrate(parser.parse_args().all)
@@ -0,0 +1,46 @@
+import os
+from datetime import datetime
+
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.repositories.key_val_repository import KeyValueRepository
+from algo_trading.repositories.strategy_info_repository import StrategyInfoRepository
+from algo_trading.config.controllers import KeyValueController
+from algo_trading.utils.utils import dt_to_str
+
+from config import KV_INFO, CONFIG
+
+"""
+One off migration of each ticker's StrategyInfo from a JSON string
+under the bare ticker key to a strategy_info:{ticker} hash. Safe to
+re-run, tickers that already have a hash are skipped and the JSON
+keys are left in place. orchestrate.py runs it before the
+strategy DAGs.
+
+    python migrate_strategy_info.py
+"""
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="migrate_strategy_info",
+    file_name=os.path.join(
+        "logs", f"migrate_strategy_info_{dt_to_str(datetime.today())}.log"
+    ),
+    log_level=LogLevelController.info,
+)
+
+KV_HANDLER = KeyValueRepository(
+    KV_INFO,
+    KeyValueController[CONFIG.kv_repo],
+    LOG_INFO,
+).handler
+
+
+def migrate() -> None:
+    migrated = StrategyInfoRepository(KV_HANDLER).migrate_from_json(CONFIG.ticker_list)
+    for ticker in migrated:
+        LOG.info(f"{ticker} -> {StrategyInfoRepository.key(ticker)}")
+    LOG.info(f"Migrated {len(migrated)} ticker(s) to StrategyInfo hashes.")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -1,52 +1,155 @@
-from typing import List
+import os
+import json
+from datetime import datetime
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
 
 from algo_trading.config.events import TradeEvent
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+from algo_trading.utils.utils import dt_to_str
 
 from config import CONFIG, LOG_BUCKET
+from task_graph import TaskGraph
 import data_pull_dag
 import sma_cross_dag
 import macd_cross_dag
+import migrate_strategy_info
 
 
-def orchestrate_data_pull_dag() -> List[str]:
-    data_pull_dag.create_bucket(LOG_BUCKET)
+LOG, LOG_INFO = get_main_logger(
+    log_name="orchestrate",
+    file_name=os.path.join("logs", f"orchestrate_{dt_to_str(datetime.today())}.log"),
+    log_level=LogLevelController.info,
+)
 
-    new_tickers = data_pull_dag.create_new_tables(CONFIG.ticker_list)
-    new_ticker_data = data_pull_dag.get_new_ticker_data(
-        CONFIG.data_repo,
-        new_tickers,
+
+# Strategy DAG modules and their run function, each sharing the
+# frames loaded once by the data pull DAG.
+STRATEGY_DAGS = {
+    "sma": (sma_cross_dag, sma_cross_dag.run_sma),
+    "macd": (macd_cross_dag, macd_cross_dag.run_macd),
+}
+
+
+def _ticker_frames(results: Dict, new: Optional[bool] = None) -> List[Tuple]:
+    """
+    Merges the chunks of the load_frames task into (ticker, frame)
+    items, optionally only the new (or existing) tickers.
+    """
+    new_tickers = results["pull_data"]
+    return [
+        (ticker, frame)
+        for chunk in results["load_frames"]
+        for ticker, frame in chunk.items()
+        if new is None or (ticker in new_tickers) == new
+    ]
+
+
+def add_data_pull_dag(graph: TaskGraph) -> None:
+    def pull_data(results: Dict) -> List[str]:
+        new_tickers = results["create_tables"]
+        new_ticker_data = data_pull_dag.get_new_ticker_data(
+            CONFIG.data_repo,
+            new_tickers,
+        )
+        data_pull_dag.persist_ticker_data(new_ticker_data)
+        existing_ticker_data = data_pull_dag.get_existing_ticker_data(
+            CONFIG.data_repo,
+            CONFIG.ticker_list,
+            new_tickers,
+        )
+        data_pull_dag.persist_ticker_data(existing_ticker_data, upsert=True)
+        data_pull_dag.update_indicator_state(new_ticker_data, existing_ticker_data)
+        return new_tickers
+
+    def finish(results: Dict) -> None:
+        data_pull_dag.finish_log()
+        data_pull_dag.persist_log()
+
+    graph.add("create_bucket", lambda _: data_pull_dag.create_bucket(LOG_BUCKET))
+    graph.add(
+        "create_tables",
+        lambda _: data_pull_dag.create_new_tables(CONFIG.ticker_list),
+        deps=["create_bucket"],
+    )
+    # The pulls are already concurrent within get_*_ticker_data.
+    graph.add("pull_data", pull_data, deps=["create_tables"])
+    graph.add(
+        "load_frames",
+        lambda chunk, results: data_pull_dag.load_ticker_frames(
+            chunk, results["pull_data"]
+        ),
+        deps=["pull_data"],
+        fan_out=lambda _: CONFIG.ticker_list,
+        chunk_size=CONFIG.dag_chunk_size,
     )
-    data_pull_dag.persist_ticker_data(new_ticker_data)
-    existing_ticker_data = data_pull_dag.get_existing_ticker_data(
-        CONFIG.data_repo,
-        CONFIG.ticker_list,
-        new_tickers,
+    graph.add("data_pull_log", finish, deps=["load_frames"])
+
+
+def add_strategy_dag(graph: TaskGraph, name: str, dag, run) -> None:
+    """
+    Adds the backfill -> update -> run tasks of a cross strategy DAG,
+    fanned out over chunks of the shared ticker frames.
+    """
+
+    def finish(results: Dict) -> None:
+        dag.finish_log()
+        dag.persist_log()
+
+    graph.add(
+        f"{name}_backfill",
+        lambda chunk, _: dag.backfill_redis(dict(chunk)),
+        deps=["pull_data", "load_frames", "migrate_strategy_info"],
+        fan_out=lambda results: _ticker_frames(results, new=True),
+        chunk_size=CONFIG.dag_chunk_size,
     )
-    data_pull_dag.persist_ticker_data(existing_ticker_data)
-    data_pull_dag.finish_log()
-    data_pull_dag.persist_log()
-    return new_tickers
+    graph.add(
+        f"{name}_update",
+        lambda chunk, _: dag.update_redis(dict(chunk)),
+        deps=["pull_data", "load_frames", "migrate_strategy_info"],
+        fan_out=lambda results: _ticker_frames(results, new=False),
+        chunk_size=CONFIG.dag_chunk_size,
+    )
+    graph.add(
+        f"{name}_run",
+        lambda chunk, _: run(dict(chunk)),
+        deps=["pull_data", "load_frames", f"{name}_backfill", f"{name}_update"],
+        fan_out=_ticker_frames,
+        chunk_size=CONFIG.dag_chunk_size,
+    )
+    graph.add(f"{name}_log", finish, deps=[f"{name}_run"])
 
 
-def orchestrate_sma_cross_dag(new_tickers: List) -> List[TradeEvent]:
-    sma_cross_dag.backfill_redis(new_tickers)
-    sma_cross_dag.update_redis(CONFIG.ticker_list, new_tickers)
-    events = sma_cross_dag.run_sma(CONFIG.ticker_list)
-    sma_cross_dag.finish_log()
-    sma_cross_dag.persist_log()
-    return events
+def orchestrate() -> Dict[str, List[TradeEvent]]:
+    """
+    Runs the data pull, loads every ticker's indicators once, then
+    runs the strategy DAGs side by side on the shared frames. Writes
+    the per-task timings next to the log.
 
+    Returns:
+        Dict[str, List[TradeEvent]]: Events keyed by strategy.
+    """
+    graph = TaskGraph(CONFIG.dag_workers, LOG_INFO)
+    add_data_pull_dag(graph)
+    # Copies any StrategyInfo still under the old JSON keys into hashes,
+    # a no-op once every ticker has one.
+    graph.add("migrate_strategy_info", lambda _: migrate_strategy_info.migrate())
+    for name, (dag, run) in STRATEGY_DAGS.items():
+        add_strategy_dag(graph, name, dag, run)
+    results = graph.run()
+
+    timings_path = os.path.join(
+        "logs", f"orchestrate_timings_{dt_to_str(datetime.today())}.json"
+    )
+    with open(timings_path, "w") as f:
+        json.dump(graph.timings, f, indent=2)
 
-def orchestrate_macd_cross_dag(new_tickers: List) -> List[TradeEvent]:
-    macd_cross_dag.backfill_redis(new_tickers)
-    macd_cross_dag.update_redis(CONFIG.ticker_list, new_tickers)
-    events = macd_cross_dag.run_macd(CONFIG.ticker_list)
-    macd_cross_dag.finish_log()
-    macd_cross_dag.persist_log()
-    return events
+    return {
+        name: list(chain.from_iterable(results[f"{name}_run"]))
+        for name in STRATEGY_DAGS
+    }
 
 
 if __name__ == "__main__":
-    new_tickers = orchestrate_data_pull_dag()
-    sma_events = orchestrate_sma_cross_dag(new_tickers)
-    macd_events = orchestrate_macd_cross_dag(new_tickers)
+    events = orchestrate()
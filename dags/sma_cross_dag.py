@@ -1,29 +1,31 @@
 import os
 import json
-from typing import List
+from typing import Dict, List
 from datetime import datetime
-import copy
+import pandas as pd
 
 from algo_trading.logger.default_logger import get_main_logger
 from algo_trading.logger.controllers import LogLevelController
 from algo_trading.strategies.sma_cross_strat import SMACross, SMACrossUtils
-from algo_trading.repositories.db_repository import DBRepository
 from algo_trading.repositories.key_val_repository import KeyValueRepository
+from algo_trading.repositories.strategy_info_repository import StrategyInfoRepository
 from algo_trading.repositories.obj_store_repository import ObjStoreRepository
 from algo_trading.config.controllers import (
     ColumnController,
     StockStatusController,
     ObjStoreController,
-    DBHandlerController,
     KeyValueController,
     StrategyInfo,
 )
 from algo_trading.config.events import TradeEvent
-from algo_trading.utils.calculations import Calculator
-from algo_trading.utils.utils import str_to_dt, dt_to_str
+from algo_trading.utils.instrumentation import (
+    INSTRUMENTATION,
+    report_path,
+    timed,
+)
+from algo_trading.utils.utils import dt_to_str
 
 from config import (
-    DB_INFO,
     KV_INFO,
     OBJ_STORE_INFO,
     CONFIG,
@@ -38,12 +40,6 @@ LOG, LOG_INFO = get_main_logger(
     log_level=LogLevelController.info,
 )
 
-DB_HANDLER = DBRepository(
-    DB_INFO,
-    DBHandlerController[CONFIG.db_repo],
-    LOG_INFO,
-).handler
-
 KV_HANDLER = KeyValueRepository(
     KV_INFO,
     KeyValueController[CONFIG.kv_repo],
@@ -57,110 +53,87 @@ OBJ_STORE_HANDLER = ObjStoreRepository(
 ).handler
 
 
-def backfill_redis(new_tickers: List[str]) -> None:
+@timed
+def backfill_redis(ticker_frames: Dict[str, pd.DataFrame]) -> None:
     """Gets up to date redis data for new tickers to indicate last
     cross dates and status.
 
     Args:
-        new_tickers (List[str]): New tickers to backfill.
+        ticker_frames (Dict[str, pd.DataFrame]): Full history with indicators
+                                                 of the new tickers to backfill.
     """
 
-    for ticker in new_tickers:
-        data = DB_HANDLER.get_all(ticker)
-        data = Calculator.calculate_sma(data, ColumnController.close.value)
-
-        # if KV_HANDLER.get(ticker) is not None:
-        #     LOG.info(f"Redis data for {ticker} already exists bum!")
-        #     continue
-
-        if KV_HANDLER.get(ticker) is not None:
-            init_cross_info = KV_HANDLER.get(ticker)
-        else:
-            init_cross_info = StrategyInfo()
-
-        LOG.info(f"Backfilling cross up/down info for {ticker}")
-
-        cross_info = copy.deepcopy(init_cross_info)
-
-        # TODO: Dirty way of finding out last cross up and cross down - can def do better
-        for i in range(len(data.index) - 1, 1, -1):
-            cross_info = SMACrossUtils.check_cross_up(data, i, cross_info)
-            if cross_info.sma_last_cross_up != init_cross_info.sma_last_cross_up:
-                LOG.info(f"Last cross up: {cross_info.sma_last_cross_up}")
-                break
-
-        for i in range(len(data.index) - 1, 1, -1):
-            cross_info = SMACrossUtils.check_cross_down(data, i, cross_info)
-            if cross_info.sma_last_cross_down != init_cross_info.sma_last_cross_down:
-                LOG.info(f"Last cross down: {cross_info.sma_last_cross_down}")
-                break
-
-        if str_to_dt(cross_info.sma_last_cross_down) < str_to_dt(
-            cross_info.sma_last_cross_up
-        ):
-            cross_info.sma_last_status = StockStatusController.buy
-        else:
-            cross_info.sma_last_status = StockStatusController.sell
-
-        KV_HANDLER.set(ticker, cross_info.dict())
-        LOG.info(
-            f"Backfilled Redis for {ticker}: {json.dumps(cross_info.dict(), indent=2)}"
-        )
+    with KV_HANDLER.pipeline() as kv:
+        strategy_info = StrategyInfoRepository(kv)
+        infos = strategy_info.get_many(list(ticker_frames))
+        for ticker, data in ticker_frames.items():
+            # if infos[ticker] is not None:
+            #     LOG.info(f"Redis data for {ticker} already exists bum!")
+            #     continue
+
+            LOG.info(f"Backfilling cross up/down info for {ticker}")
+
+            init_cross_info = infos[ticker] or StrategyInfo()
+            cross_info = SMACrossUtils.backfill_cross_info(data, init_cross_info.copy())
+            changed = strategy_info.update(ticker, infos[ticker], cross_info)
 
+            LOG.info(f"Last cross up: {cross_info.sma_last_cross_up}")
+            LOG.info(f"Last cross down: {cross_info.sma_last_cross_down}")
+            LOG.info(f"Backfilled Redis for {ticker}: {json.dumps(changed, indent=2)}")
 
-def update_redis(tickers: List, new_tickers: List) -> None:
+
+@timed
+def update_redis(ticker_frames: Dict[str, pd.DataFrame]) -> None:
     """
     Updates redis information for existing tickers. Includes
     last cross up date and last cross down date.
 
     Args:
-        tickers (List): All tickers
-        new_tickers (List): New tickers. Used for exclusion.
-
-    Raises:
-        ValueError: Error raised if no redis data for the ticker.
+        ticker_frames (Dict[str, pd.DataFrame]): Last two rows with indicators
+                                                 of the existing tickers.
     """
 
-    for ticker in [t for t in tickers if t not in new_tickers]:
-        data = DB_HANDLER.get_days_back(ticker, 201)
-        data = Calculator.calculate_sma(data, ColumnController.close.value)
+    with KV_HANDLER.pipeline() as kv:
+        strategy_info = StrategyInfoRepository(kv)
+        infos = strategy_info.get_many(list(ticker_frames))
+        for ticker, data in ticker_frames.items():
+            if len(data) < 2:
+                continue
 
-        cross_info = KV_HANDLER.get(ticker)
+            # A backfill that found no crosses writes no fields, so a
+            # missing hash reads as the defaults.
+            info = infos[ticker] or StrategyInfo()
+            cross_info = SMACrossUtils.check_cross_up(data, 1, info.copy())
+            cross_info = SMACrossUtils.check_cross_down(data, 1, cross_info)
 
-        if cross_info is None:
-            LOG.error(f"No Redis data for ticker {ticker}...")
-            continue
+            changed = strategy_info.update(ticker, infos[ticker], cross_info)
+            LOG.info(f"Updated Redis for {ticker}: {json.dumps(changed, indent=2)}")
 
-        cross_info = StrategyInfo(**json.loads(cross_info))
 
-        cross_info = SMACrossUtils.check_cross_up(data, 0, cross_info)
-        cross_info = SMACrossUtils.check_cross_down(data, 0, cross_info)
-
-        KV_HANDLER.set(ticker, cross_info.dict())
-        LOG.info(
-            f"Updated Redis for {ticker}: {json.dumps(cross_info.dict(), indent=2)}"
-        )
-
-
-def run_sma(tickers: List) -> List[TradeEvent]:
+@timed
+def run_sma(ticker_frames: Dict[str, pd.DataFrame]) -> List[TradeEvent]:
     """Runs the SMA strategy for the given tickers.
 
     Args:
-        tickers (List): Tickers to analyze with SMA.
+        ticker_frames (Dict[str, pd.DataFrame]): Indicator frames of the tickers
+                                                 to analyze, run as of their last date.
 
     Returns:
         List[TradeEvent]: TradeEvents based off of algorithm.
     """
     events = []
-    for ticker in tickers:
-        date = DB_HANDLER.get_days_back(ticker, 1).to_dict("records")[0][
-            ColumnController.date.value
-        ]
-        sma = SMACross(ticker, KV_HANDLER, date)
-        result = sma.run()
-        if result.signal in [StockStatusController.buy, StockStatusController.sell]:
-            events.append(result)
-        LOG.info(f"{ticker.upper()} {result.signal.value} Event on {result.date}")
+    date_col = ColumnController.date.value
+    with KV_HANDLER.pipeline() as kv:
+        StrategyInfoRepository(kv).get_many(list(ticker_frames))
+        for ticker, data in ticker_frames.items():
+            date = pd.Timestamp(data[date_col].iloc[-1]).to_pydatetime()
+            result = SMACross(ticker, kv, date).run()
+            if result.signal in [
+                StockStatusController.buy,
+                StockStatusController.sell,
+            ]:
+                events.append(result)
+            LOG.info(f"{ticker.upper()} {result.signal.value} Event on {result.date}")
     return events
 
 
@@ -169,10 +142,12 @@ def finish_log() -> None:
 
 
 def persist_log() -> None:
-    OBJ_STORE_HANDLER.upload_file(
-        LOG_INFO.file_name,
-        LOG_BUCKET,
-        LOG_KEY.format(
-            log_name=LOG_INFO.log_name, run_date=dt_to_str(datetime.today())
-        ),
+    log_key = LOG_KEY.format(
+        log_name=LOG_INFO.log_name, run_date=dt_to_str(datetime.today())
     )
+    OBJ_STORE_HANDLER.upload_file(LOG_INFO.file_name, LOG_BUCKET, log_key)
+    if INSTRUMENTATION.enabled:
+        report_file = INSTRUMENTATION.write_report(
+            report_path(LOG_INFO.file_name), prefix=LOG_INFO.log_name
+        )
+        OBJ_STORE_HANDLER.upload_file(report_file, LOG_BUCKET, report_path(log_key))
@@ -0,0 +1,194 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from logging import Logger
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from algo_trading.logger.controllers import LogConfig
+from algo_trading.logger.default_logger import get_child_logger
+
+
+class Task:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        deps: Sequence[str],
+        fan_out: Optional[Callable[[Dict[str, Any]], List]],
+        chunk_size: int,
+    ) -> None:
+        """A node of the TaskGraph. See TaskGraph.add() for the args."""
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.fan_out = fan_out
+        self.chunk_size = chunk_size
+
+
+class TaskGraph:
+    def __init__(self, max_workers: int, log_info: LogConfig) -> None:
+        """Runs tasks on a thread pool as soon as their dependencies
+        have finished, with no scheduler beyond this process.
+
+        A fan out task is split into chunks of items (usually tickers)
+        and every chunk runs as its own job on the pool, so the chunks
+        of independent tasks are interleaved across the workers.
+
+        Args:
+            max_workers (int): Size of the worker pool.
+            log_info (LogConfig): Info to create a log.
+        """
+        self.max_workers = max_workers
+        self.log_info = log_info
+        self.tasks: Dict[str, Task] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def log(self) -> Logger:
+        try:
+            return self._log
+        except AttributeError:
+            self._log = get_child_logger(
+                self.log_info.log_name, self.__class__.__name__
+            )
+            return self._log
+
+    def add(
+        self,
+        name: str,
+        fn: Callable,
+        deps: Sequence[str] = (),
+        fan_out: Optional[Callable[[Dict[str, Any]], List]] = None,
+        chunk_size: int = 100,
+    ) -> "TaskGraph":
+        """Adds a task to the graph.
+
+        Args:
+            name (str): Unique task name, also the key of its result.
+            fn (Callable): Called with the results of its deps keyed by
+                           name, or with (chunk, results) for fan out tasks.
+            deps (Sequence[str], optional): Tasks to finish first. Defaults to ().
+            fan_out (Optional[Callable[[Dict[str, Any]], List]], optional): Given
+                the results of deps, returns the items to split into chunks.
+                The task's result is the list of chunk results. Defaults to None.
+            chunk_size (int, optional): Items per fan out chunk. Defaults to 100.
+
+        Raises:
+            ValueError: Duplicate task name or unknown dependency.
+
+        Returns:
+            TaskGraph: The graph, to chain calls.
+        """
+        if name in self.tasks:
+            raise ValueError(f"Task {name} already exists.")
+        for dep in deps:
+            if dep not in self.tasks:
+                raise ValueError(f"Unknown dependency {dep} for task {name}.")
+        self.tasks[name] = Task(name, fn, deps, fan_out, chunk_size)
+        return self
+
+    def _jobs(self, task: Task, results: Dict[str, Any]) -> List[Callable]:
+        dep_results = {dep: results[dep] for dep in task.deps}
+        if task.fan_out is None:
+            return [lambda: task.fn(dep_results)]
+
+        items = list(task.fan_out(dep_results))
+        chunks = [
+            items[i : i + task.chunk_size]
+            for i in range(0, len(items), task.chunk_size)
+        ]
+        return [lambda chunk=chunk: task.fn(chunk, dep_results) for chunk in chunks]
+
+    @staticmethod
+    def _ready(pending: Dict[str, Task], results: Dict[str, Any]) -> List[Task]:
+        return [t for t in pending.values() if all(d in results for d in t.deps)]
+
+    @staticmethod
+    def _timed(job: Callable) -> Callable:
+        def run():
+            return job(), perf_counter()
+
+        return run
+
+    def run(self) -> Dict[str, Any]:
+        """Runs every task, stopping at the first failure.
+
+        Raises:
+            Exception: The first exception raised by a task, once
+                       the jobs already running have finished.
+
+        Returns:
+            Dict[str, Any]: Results keyed by task name.
+        """
+        results: Dict[str, Any] = {}
+        chunk_results: Dict[str, List] = {}
+        remaining_jobs: Dict[str, int] = {}
+        pending = dict(self.tasks)
+        running: Dict[Future, tuple] = {}
+        graph_start = perf_counter()
+
+        def finish(name: str) -> None:
+            task = self.tasks[name]
+            results[name] = chunk_results.pop(name)
+            if task.fan_out is None:
+                results[name] = results[name][0]
+            timing = self.timings[name]
+            self.log.info(
+                f"Task {name} finished in {timing['seconds']:.3f}s "
+                + f"({timing['chunks']:.0f} chunks)"
+            )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                # Tasks with nothing to fan out finish straight away, which
+                # can make their dependents ready in the same pass.
+                ready = self._ready(pending, results)
+                while ready:
+                    task = ready.pop(0)
+                    del pending[task.name]
+                    jobs = self._jobs(task, results)
+                    chunk_results[task.name] = [None] * len(jobs)
+                    remaining_jobs[task.name] = len(jobs)
+                    self.timings[task.name] = {
+                        "start": perf_counter() - graph_start,
+                        "seconds": 0.0,
+                        "chunks": len(jobs),
+                    }
+                    self.log.info(f"Starting task {task.name}")
+                    if not jobs:
+                        finish(task.name)
+                        ready = self._ready(pending, results)
+                    for idx, job in enumerate(jobs):
+                        running[executor.submit(self._timed(job))] = (task.name, idx)
+
+                if not running:
+                    if pending:
+                        raise ValueError(f"Tasks never became ready: {list(pending)}")
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, idx = running.pop(future)
+                    try:
+                        result, end = future.result()
+                    except Exception:
+                        self.log.exception(f"Task {name} failed.")
+                        for other in running:
+                            other.cancel()
+                        raise
+
+                    chunk_results[name][idx] = result
+                    timing = self.timings[name]
+                    timing["seconds"] = max(
+                        timing["seconds"], end - graph_start - timing["start"]
+                    )
+                    remaining_jobs[name] -= 1
+                    if remaining_jobs[name] == 0:
+                        finish(name)
+
+        self.timings["total"] = {
+            "start": 0.0,
+            "seconds": perf_counter() - graph_start,
+            "chunks": 0,
+        }
+        self.log.info(f"Task graph finished in {self.timings['total']['seconds']:.3f}s")
+        return results
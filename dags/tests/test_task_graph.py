@@ -0,0 +1,77 @@
+import threading
+import pytest
+
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+
+from dags.task_graph import TaskGraph
+
+"""
+Functions tested in this module:
+- TaskGraph.add()
+- TaskGraph.run()
+"""
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="test_task_graph",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+
+class TestTaskGraph:
+    def test_results_follow_dependencies(self):
+        graph = TaskGraph(4, LOG_INFO)
+        graph.add("tickers", lambda _: ["a", "b", "c", "d", "e"])
+        graph.add(
+            "upper",
+            lambda chunk, _: [t.upper() for t in chunk],
+            deps=["tickers"],
+            fan_out=lambda results: results["tickers"],
+            chunk_size=2,
+        )
+        graph.add("count", lambda results: sum(map(len, results["upper"])), ["upper"])
+        results = graph.run()
+
+        assert results["upper"] == [["A", "B"], ["C", "D"], ["E"]]
+        assert results["count"] == 5
+        assert graph.timings["upper"]["chunks"] == 3
+        assert set(graph.timings) == {"tickers", "upper", "count", "total"}
+
+    def test_independent_tasks_run_concurrently(self):
+        # Both tasks only finish once the other has started.
+        barrier = threading.Barrier(2, timeout=5)
+        graph = TaskGraph(2, LOG_INFO)
+        graph.add("pull", lambda _: None)
+        graph.add("sma", lambda _: barrier.wait(), deps=["pull"])
+        graph.add("macd", lambda _: barrier.wait(), deps=["pull"])
+        graph.run()
+
+    def test_empty_fan_out(self):
+        graph = TaskGraph(2, LOG_INFO)
+        graph.add("new_tickers", lambda _: [])
+        graph.add(
+            "backfill",
+            lambda chunk, _: chunk,
+            deps=["new_tickers"],
+            fan_out=lambda results: results["new_tickers"],
+        )
+        graph.add("after", lambda results: "done", deps=["backfill"])
+        assert graph.run() == {"new_tickers": [], "backfill": [], "after": "done"}
+
+    def test_failure_stops_dependents(self):
+        ran = []
+
+        def fail(_):
+            raise ValueError("boom")
+
+        graph = TaskGraph(2, LOG_INFO)
+        graph.add("pull", fail)
+        graph.add("sma", lambda _: ran.append("sma"), deps=["pull"])
+        with pytest.raises(ValueError, match="boom"):
+            graph.run()
+        assert ran == []
+
+    def test_unknown_dependency(self):
+        with pytest.raises(ValueError):
+            TaskGraph(2, LOG_INFO).add("sma", lambda _: None, deps=["pull"])
@@ -15,19 +15,34 @@ https://stackoverflow.com/questions/12310442/how-to-design-rest-api-for-email-se
 app = FastAPI()
 
 
+@app.on_event("shutdown")
+def shutdown() -> None:
+    """
+    Sends any queued notifications before the process exits, since
+    the sender's worker threads are daemons.
+    """
+    implementation.SENDER.close()
+
+
 @app.get("/tickers")
-def list_tickers() -> Dict:
+def list_tickers(cursor: int = 0, count: int = 100) -> Dict:
     """
-    Gets a list of all tickers.
+    Gets a page of tickers. Keep requesting with the returned
+    cursor until it comes back as 0. A page may be empty before
+    the end.
+
+    Args:
+        cursor (int): Cursor of the page, 0 for the first one.
+        count (int): Hint of tickers per page.
 
     Returns:
-        Dict: Status and list of tickers
+        Dict: Status, next cursor and a page of tickers
     """
 
-    # TODO: implement pagination if we have too many keys https://stackoverflow.com/questions/22255589/get-all-keys-in-redis-database-with-python
+    cursor, tickers = implementation.list_tickers(cursor, count)
     return {
         "status": 200,
-        "body": implementation.list_tickers(),
+        "body": {"cursor": cursor, "tickers": tickers},
     }
 
 
@@ -117,10 +132,11 @@ def send_notification(
         date=payload.date,
     )
 
-    for email in implementation.list_users(ticker, payload.test):
-        implementation.send_notification(message, email)
+    users = implementation.list_users(ticker, payload.test)
+    implementation.send_notification(message, users)
 
     return {
         "status": 200,
-        "body": f"Successfully sent {payload.signal} notification for ticker {ticker}",
+        "body": f"Queued {payload.signal} notification for ticker {ticker} "
+        + f"to {len(users)} users",
     }
@@ -0,0 +1,14 @@
+from src.implementation import LOG, migrate_subscribers
+
+"""
+One off migration of the subscriber lists from a JSON list under
+the bare ticker key to a ticker:{ticker} marker and a
+subscribers:{ticker} set. Run from this directory:
+
+    python migrate_subscribers.py
+"""
+
+
+if __name__ == "__main__":
+    migrated = migrate_subscribers()
+    LOG.info(f"Migrated {len(migrated)} ticker(s) to subscriber sets: {migrated}")
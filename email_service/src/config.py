@@ -11,6 +11,17 @@ SMTP_SERVER = getenv("SMTP_SERVER")
 SSL_PORT = getenv("SSL_PORT")
 SENDER_EMAIL = getenv("SENDER_EMAIL")
 SENDER_EMAIL_PASSWORD = getenv("SENDER_EMAIL_PASSWORD")
+SMTP_SSL = getenv("SMTP_SSL", "true").lower() == "true"
+SMTP_WORKERS = int(getenv("SMTP_WORKERS", 2))
+SMTP_BATCH_SIZE = int(getenv("SMTP_BATCH_SIZE", 50))
+
+SMTP_INFO = {
+    "host": SMTP_SERVER,
+    "port": SSL_PORT,
+    "user": SENDER_EMAIL,
+    "password": SENDER_EMAIL_PASSWORD,
+    "ssl": SMTP_SSL,
+}
 
 # Loading in IN MEMORY info
 EMAIL_MANAGER_HOST = getenv("EMAIL_MANAGER_HOST")
@@ -1,19 +1,18 @@
 import os
-import smtplib
-import ssl
 import json
-from typing import List
+from typing import List, Tuple
 
 from algo_trading.logger.default_logger import get_main_logger
 from algo_trading.logger.controllers import LogLevelController
 from algo_trading.repositories.key_val_repository import KeyValueRepository
 from algo_trading.config.controllers import KeyValueController
 
+from .sender import SMTPSender
 from .config import (
-    SMTP_SERVER,
-    SSL_PORT,
+    SMTP_INFO,
+    SMTP_WORKERS,
+    SMTP_BATCH_SIZE,
     SENDER_EMAIL,
-    SENDER_EMAIL_PASSWORD,
     EMAIL_MANAGER_INFO,
     EMAIL_MANAGER_STORE,
     LOG_LEVEL,
@@ -32,20 +31,39 @@ EMAIL_MANAGER = KeyValueRepository(
     LOG_INFO,
 ).handler
 
-# Create a secure SSL context
-CONTEXT = ssl.create_default_context()
+# Every tracked ticker has a marker key, and its subscribers are a
+# set, so adding users never rewrites the whole list.
+TICKER_KEY = "ticker:{ticker}"
+SUBSCRIBERS_KEY = "subscribers:{ticker}"
+
+# One sender for the whole service, so connections are logged in
+# once and reused across requests.
+SENDER = SMTPSender(
+    SMTP_INFO,
+    LOG_INFO,
+    workers=SMTP_WORKERS,
+    batch_size=SMTP_BATCH_SIZE,
+)
 
 
-def list_tickers() -> List[str]:
+def list_tickers(cursor: int = 0, count: int = 100) -> Tuple[int, List[str]]:
     """
-    Implementation for API.
+    Implementation for API. Pages through the tickers with SCAN
+    rather than KEYS, so Redis is never blocked for the whole
+    keyspace.
+
+    Args:
+        cursor (int, optional): Cursor of the page, 0 for the first one.
+        count (int, optional): Hint of keys to look at per page.
 
     Returns:
-        List[str]: All tickers in the k/v store
+        Tuple[int, List[str]]: Cursor of the next page (0 when done)
+                               and the tickers in this page.
     """
 
-    # TODO: add this to the KeyValueRepository
-    return EMAIL_MANAGER.conn.keys()
+    prefix = TICKER_KEY.format(ticker="")
+    cursor, keys = EMAIL_MANAGER.scan(cursor, f"{prefix}*", count)
+    return cursor, [key[len(prefix) :] for key in keys]
 
 
 def add_ticker(ticker: str) -> None:
@@ -56,7 +74,7 @@ def add_ticker(ticker: str) -> None:
         ticker (str): New ticker to add.
     """
 
-    EMAIL_MANAGER.set(ticker, [])
+    EMAIL_MANAGER.set(TICKER_KEY.format(ticker=ticker), ticker)
 
 
 def list_users(ticker: str, test: bool) -> List[str]:
@@ -74,11 +92,7 @@ def list_users(ticker: str, test: bool) -> List[str]:
     if test:
         return ["algotrading.consumer@gmail.com"]
 
-    users = EMAIL_MANAGER.get(ticker)
-    if users is None:
-        users = "[]"
-
-    return json.loads(users)
+    return EMAIL_MANAGER.smembers(SUBSCRIBERS_KEY.format(ticker=ticker))
 
 
 def add_users(ticker: str, new_users: List[str]) -> None:
@@ -87,53 +101,44 @@ def add_users(ticker: str, new_users: List[str]) -> None:
 
     Args:
         ticker (str): Ticker to add user.
-        user (str): User (email) to add.
+        new_users (List[str]): Users (emails) to add.
     """
 
-    current_users = json.loads(EMAIL_MANAGER.get(ticker))
-    new_users = current_users + new_users
-    EMAIL_MANAGER.set(ticker, new_users)
+    add_ticker(ticker)
+    EMAIL_MANAGER.sadd(SUBSCRIBERS_KEY.format(ticker=ticker), new_users)
 
 
-def create_server() -> smtplib.SMTP_SSL:
+def migrate_subscribers() -> List[str]:
     """
-    Instead of using a "with" context manager, we want to only
-    login one time, so we persist the server object.
-
-    **NOTE**
-    It needs to be closed with server.quit() later.
+    Moves tickers stored the old way, a JSON list of users under
+    the bare ticker key, to a ticker marker and a subscriber set.
+    The old keys are left in place, so it is safe to re-run.
 
     Returns:
-        smtplib.SMTP_SSL: SMTP server to send emails.
-    """
-
-    server = smtplib.SMTP_SSL(SMTP_SERVER, SSL_PORT, context=CONTEXT)
-    server.login(SENDER_EMAIL, SENDER_EMAIL_PASSWORD)
-    return server
-
-
-def quit_server(server: smtplib.SMTP_SSL) -> None:
+        List[str]: Tickers migrated.
     """
-    Closes the SMTP email server.
 
-    Args:
-        server (smtplib.SMTP_SSL): Server to close
-    """
+    migrated = []
+    for key in EMAIL_MANAGER.scan_iter():
+        if ":" in key:
+            continue
+        users = json.loads(EMAIL_MANAGER.get(key) or "[]")
+        add_users(key, users)
+        migrated.append(key)
+    return migrated
 
-    server.quit()
 
-
-def send_notification(message: str, receiver_email: str) -> None:
+def send_notification(message: str, receiver_emails: List[str]) -> int:
     """
-    Implementation for API.
+    Implementation for API. Queues the message for every
+    receiver; the sender's workers deliver it in batches.
 
     Args:
         message (str): Message to send
-        receiver_email (str): Receiving email address
+        receiver_emails (List[str]): Receiving email addresses
+
+    Returns:
+        int: Number of batches queued.
     """
 
-    server = create_server()
-    try:
-        server.sendmail(SENDER_EMAIL, receiver_email, message)
-    finally:
-        quit_server(server)
+    return SENDER.submit(SENDER_EMAIL, message, receiver_emails)
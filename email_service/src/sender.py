@@ -0,0 +1,221 @@
+import re
+import smtplib
+import ssl
+from logging import Logger
+from queue import Queue
+from threading import Lock, Thread
+from time import monotonic
+from typing import Dict, List, Optional, Union
+
+from algo_trading.logger.controllers import LogConfig
+from algo_trading.logger.default_logger import get_child_logger
+
+
+# Errors where the connection is gone and a fresh one is worth a retry.
+# SMTPException is an OSError too, so OSError itself is not listed.
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+def _encode(message: str) -> bytes:
+    # sendmail() encodes str messages as ASCII, which fails on any
+    # non ASCII character, so messages are sent as UTF-8 bytes with
+    # the CRLF line endings it would otherwise have fixed up.
+    return re.sub(r"\r\n|\r|\n", "\r\n", message).encode("utf-8")
+
+
+class SMTPSender:
+    def __init__(
+        self,
+        smtp_info: Dict,
+        log_info: LogConfig,
+        workers: int = 2,
+        batch_size: int = 50,
+        idle_check: float = 60.0,
+    ) -> None:
+        """Sends emails from a queue drained by worker threads. Each
+        worker keeps one long-lived, logged in SMTP connection, checks
+        it with NOOP after it sat idle, and reconnects when it drops.
+        Recipients of a message are sent in batches of batch_size per
+        SMTP transaction, as envelope recipients only.
+
+        Args:
+            smtp_info (Dict): host, port, and optionally user, password and
+                              ssl (bool, defaults to True).
+            log_info (LogConfig): Info to create a log.
+            workers (int, optional): Worker threads, and so connections.
+                                     Defaults to 2.
+            batch_size (int, optional): Recipients per transaction. Defaults to 50.
+            idle_check (float, optional): Seconds idle before a connection is
+                                          checked with NOOP. Defaults to 60.0.
+        """
+        self.smtp_info = smtp_info
+        self.log_info = log_info
+        self.workers = workers
+        self.batch_size = batch_size
+        self.idle_check = idle_check
+
+        self.queue: Queue = Queue()
+        self._threads: List[Thread] = []
+        self._lock = Lock()
+        self.sent = 0
+        self.failed: List[str] = []
+
+    @property
+    def log(self) -> Logger:
+        try:
+            return self._log
+        except AttributeError:
+            self._log = get_child_logger(
+                self.log_info.log_name, self.__class__.__name__
+            )
+            return self._log
+
+    def _connect(self) -> Union[smtplib.SMTP, smtplib.SMTP_SSL]:
+        host, port = self.smtp_info["host"], int(self.smtp_info["port"])
+        if self.smtp_info.get("ssl", True):
+            server = smtplib.SMTP_SSL(host, port, context=ssl.create_default_context())
+        else:
+            server = smtplib.SMTP(host, port)
+        if self.smtp_info.get("user"):
+            server.login(self.smtp_info["user"], self.smtp_info["password"])
+        self.log.debug(f"Opened SMTP connection to {host}:{port}")
+        return server
+
+    @staticmethod
+    def _close(server: Optional[smtplib.SMTP]) -> None:
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _alive(self, server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except RECONNECT_ERRORS:
+            return False
+
+    def _batches(self, recipients: List[str]) -> List[List[str]]:
+        return [
+            recipients[i : i + self.batch_size]
+            for i in range(0, len(recipients), self.batch_size)
+        ]
+
+    def submit(self, sender: str, message: str, recipients: List[str]) -> int:
+        """Queues a message for every recipient and returns straight away.
+
+        Args:
+            sender (str): Envelope sender address.
+            message (str): Full message, headers included.
+            recipients (List[str]): Receiving email addresses.
+
+        Returns:
+            int: Number of batches queued.
+        """
+        self._start()
+        data = _encode(message)
+        batches = self._batches(list(dict.fromkeys(recipients)))
+        for batch in batches:
+            self.queue.put((sender, data, batch))
+        return len(batches)
+
+    def join(self) -> None:
+        """Blocks until every queued batch has been handled."""
+        self.queue.join()
+
+    def close(self) -> None:
+        """Drains the queue, then stops the workers and their connections."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self.queue.put(None)
+        for thread in threads:
+            thread.join()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for idx in range(self.workers):
+                thread = Thread(
+                    target=self._work, name=f"smtp-sender-{idx}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self) -> None:
+        server = None
+        last_used = monotonic()
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                if server is not None and monotonic() - last_used > self.idle_check:
+                    if not self._alive(server):
+                        self._close(server)
+                        server = None
+                server = self._send(server, *job)
+                last_used = monotonic()
+            except Exception as e:
+                # Anything _send did not expect fails the batch, not the
+                # worker. The connection is in an unknown state, so drop it.
+                self.log.exception(f"Unexpected error sending a batch: {e}")
+                self._record(job[2], job[2])
+                self._close(server)
+                server = None
+            finally:
+                if job is None:
+                    self._close(server)
+                self.queue.task_done()
+
+    def _send(
+        self,
+        server: Optional[smtplib.SMTP],
+        sender: str,
+        message: bytes,
+        batch: List[str],
+    ) -> Optional[smtplib.SMTP]:
+        """Sends one batch, reconnecting once if the connection dropped.
+
+        Returns:
+            Optional[smtplib.SMTP]: Connection to reuse for the next batch.
+        """
+        for attempt in range(2):
+            try:
+                if server is None:
+                    server = self._connect()
+                refused = server.sendmail(sender, batch, message)
+                self._record(batch, list(refused))
+                return server
+            except smtplib.SMTPRecipientsRefused as e:
+                self._record(batch, list(e.recipients))
+                return server
+            except RECONNECT_ERRORS as e:
+                self._close(server)
+                server = None
+                if attempt == 1:
+                    self.log.error(f"Failed to send to {len(batch)} recipients: {e}")
+                    self._record(batch, batch)
+                else:
+                    self.log.warning(f"SMTP connection lost ({e}), reconnecting.")
+            except smtplib.SMTPException as e:
+                self.log.error(f"Failed to send to {len(batch)} recipients: {e}")
+                self._record(batch, batch)
+                return server
+            except OSError as e:
+                # Could not connect at all, e.g. DNS or TLS failures. The
+                # batch fails but the worker stays up for the next one.
+                self._close(server)
+                self.log.error(f"Failed to send to {len(batch)} recipients: {e}")
+                self._record(batch, batch)
+                return None
+        return server
+
+    def _record(self, batch: List[str], refused: List[str]) -> None:
+        with self._lock:
+            self.sent += len(batch) - len(refused)
+            self.failed += refused
+        if refused:
+            self.log.error(f"Refused recipients: {refused}")
@@ -0,0 +1,199 @@
+import base64
+import socketserver
+from threading import Lock, Thread
+
+import pytest
+
+from algo_trading.logger.default_logger import get_main_logger
+from algo_trading.logger.controllers import LogLevelController
+
+from email_service.src.sender import SMTPSender
+
+"""
+Functions tested in this module:
+- SMTPSender.submit()
+- SMTPSender.join()
+- SMTPSender.close()
+"""
+
+LOG, LOG_INFO = get_main_logger(
+    log_name="test_sender",
+    file_name=None,
+    log_level=LogLevelController.info,
+)
+
+SENDER = "algotrading.producer@test.com"
+MESSAGE = "Subject: AlgoTrading BUY Alert for AAPL\n\nBuy it."
+
+
+class SMTPStub(socketserver.StreamRequestHandler):
+    """
+    Just enough SMTP to stand in for the server: EHLO with AUTH
+    PLAIN, MAIL, RCPT, DATA, NOOP, RSET and QUIT. Records logins,
+    every delivered transaction and its message on the server. The server drops a
+    connection after `drop_after` transactions when set.
+    """
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        rcpts, transactions = [], 0
+        self.reply("220 stub ESMTP")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            cmd = line.split(" ", 1)[0].upper()
+            if cmd in ("EHLO", "HELO"):
+                self.reply("250-stub")
+                self.reply("250 AUTH PLAIN")
+            elif cmd == "AUTH":
+                user = base64.b64decode(line.split()[2]).split(b"\0")[1].decode()
+                with server.lock:
+                    server.logins.append(user)
+                self.reply("235 ok")
+            elif cmd == "MAIL":
+                rcpts = []
+                self.reply("250 ok")
+            elif cmd == "RCPT":
+                rcpt = line.split(":", 1)[1].strip("<> ")
+                if rcpt.startswith("bounce"):
+                    self.reply("550 no such user")
+                else:
+                    rcpts.append(rcpt)
+                    self.reply("250 ok")
+            elif cmd == "DATA":
+                self.reply("354 go ahead")
+                lines = []
+                while True:
+                    data = self.rfile.readline().rstrip(b"\r\n")
+                    if data == b".":
+                        break
+                    lines.append(data)
+                with server.lock:
+                    server.transactions.append(rcpts)
+                    server.messages.append(b"\r\n".join(lines))
+                transactions += 1
+                self.reply("250 queued")
+                if server.drop_after and transactions >= server.drop_after:
+                    return
+            elif cmd in ("NOOP", "RSET"):
+                self.reply("250 ok")
+            elif cmd == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 unknown")
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPStub)
+    server.daemon_threads = True
+    server.lock = Lock()
+    server.logins = []
+    server.transactions = []
+    server.messages = []
+    server.drop_after = None
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _sender(server, **kwargs) -> SMTPSender:
+    smtp_info = {
+        "host": "127.0.0.1",
+        "port": server.server_address[1],
+        "user": SENDER,
+        "password": "password",
+        "ssl": False,
+    }
+    return SMTPSender(smtp_info, LOG_INFO, **kwargs)
+
+
+class TestSMTPSender:
+    def test_batches_over_pooled_connections(self, smtp_server):
+        sender = _sender(smtp_server, workers=2, batch_size=10)
+        recipients = [f"user{i}@test.com" for i in range(95)]
+
+        assert sender.submit(SENDER, MESSAGE, recipients) == 10
+        sender.join()
+
+        delivered = [r for batch in smtp_server.transactions for r in batch]
+        assert sorted(delivered) == sorted(recipients)
+        assert max(map(len, smtp_server.transactions)) == 10
+        # One login per worker, not per recipient.
+        assert len(smtp_server.logins) <= 2
+        assert sender.sent == 95
+        sender.close()
+
+    def test_reconnects_after_drop(self, smtp_server):
+        smtp_server.drop_after = 1
+        sender = _sender(smtp_server, workers=1, batch_size=5)
+        recipients = [f"user{i}@test.com" for i in range(15)]
+
+        sender.submit(SENDER, MESSAGE, recipients)
+        sender.join()
+
+        assert len(smtp_server.transactions) == 3
+        assert sender.sent == 15
+        assert sender.failed == []
+        sender.close()
+
+    def test_refused_recipients(self, smtp_server):
+        sender = _sender(smtp_server, workers=1)
+        sender.submit(SENDER, MESSAGE, ["a@test.com", "bounce@test.com", "a@test.com"])
+        sender.join()
+
+        assert smtp_server.transactions == [["a@test.com"]]
+        assert sender.sent == 1
+        assert sender.failed == ["bounce@test.com"]
+        sender.close()
+
+    def test_worker_survives_failed_connection(self, smtp_server):
+        # TLS against the plain text stub fails with an ssl.SSLError.
+        sender = _sender(smtp_server, workers=1)
+        sender.smtp_info["ssl"] = True
+        sender.submit(SENDER, MESSAGE, ["a@test.com"])
+        sender.join()
+        assert sender.failed == ["a@test.com"]
+
+        sender.smtp_info["ssl"] = False
+        sender.submit(SENDER, MESSAGE, ["b@test.com"])
+        sender.join()
+        assert smtp_server.transactions == [["b@test.com"]]
+        assert sender.sent == 1
+        sender.close()
+
+    def test_worker_survives_unexpected_error(self, smtp_server):
+        sender = _sender(smtp_server, workers=1, batch_size=1)
+        connect = sender._connect
+        calls = []
+
+        def flaky_connect():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return connect()
+
+        sender._connect = flaky_connect
+        sender.submit(SENDER, MESSAGE, ["a@test.com", "b@test.com"])
+        sender.join()
+
+        assert sender.failed == ["a@test.com"]
+        assert smtp_server.transactions == [["b@test.com"]]
+        assert sender.sent == 1
+        sender.close()
+
+    def test_utf8_message(self, smtp_server):
+        sender = _sender(smtp_server, workers=1)
+        message = "Subject: AlgoTrading BUY Alert for NESN\n\nKaufen für 100 €."
+        sender.submit(SENDER, message, ["a@test.com"])
+        sender.join()
+
+        assert sender.sent == 1
+        assert smtp_server.messages == [message.replace("\n", "\r\n").encode()]
+        sender.close()